@@ -0,0 +1,66 @@
+"""Benchmark the Dask computation of a map-reduce task with a cheap `map`, with one
+node per item, with batches of items, and with a wider reduction tree.
+
+Usage: python benchmarks/dask_batching.py [n_items] [batch_size] [fan_in]"""
+
+import sys
+import time
+
+from dask.distributed import LocalCluster
+
+from aqueduct import MapReduceTask
+from aqueduct.backend.dask import DaskBackend
+
+
+class SumTask(MapReduceTask):
+    def __init__(self, n_items: int):
+        self.n_items = n_items
+
+    def items(self):
+        return range(self.n_items)
+
+    def map(self, item, requirements=None):
+        return item
+
+    def accumulator(self, requirements=None):
+        return 0
+
+    def reduce(self, lhs, rhs, requirements=None):
+        return lhs + rhs
+
+    def post(self, acc, requirements=None):
+        return acc
+
+
+def bench(name: str, backend: DaskBackend, n_items: int):
+    start = time.perf_counter()
+    result = backend.run(SumTask(n_items))
+    elapsed = time.perf_counter() - start
+
+    assert result == n_items * (n_items - 1) // 2
+    print(f"{name:>32}: {elapsed:7.3f}s")
+
+
+def main():
+    n_items = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    fan_in = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+
+    with LocalCluster(n_workers=4, threads_per_worker=1) as cluster:
+        client = cluster.get_client()
+
+        bench("one node per item", DaskBackend(client), n_items)
+        bench(
+            f"batches of {batch_size}",
+            DaskBackend(client, chunk_size=batch_size),
+            n_items,
+        )
+        bench(
+            f"batches of {batch_size}, fan-in {fan_in}",
+            DaskBackend(client, chunk_size=batch_size, fan_in=fan_in),
+            n_items,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Benchmark successive `aq run` invocations on Dask, with a new local cluster for each
+run, and with the local cluster shared between invocations. Importing this module
+stands for a task module that imports heavy libraries, in the CLI and on the workers.
+
+Usage: python benchmarks/dask_cli_startup.py [n_runs] [n_workers] [import_ms]"""
+
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+import time
+
+from aqueduct import Task
+
+time.sleep(float(os.environ.get("BENCH_IMPORT_MS", 0)) / 1000)
+
+
+class Leaf(Task):
+    def __init__(self, index: int):
+        self.index = index
+
+    def run(self, requirements=None):
+        return self.index
+
+
+class Root(Task):
+    def requirements(self):
+        return [Leaf(i) for i in range(100)]
+
+    def run(self, requirements=None):
+        return sum(requirements)
+
+
+def aq(*args: str, env: dict[str, str]):
+    subprocess.run(
+        [sys.executable, "-c", "from aqueduct.cli.cli import cli; cli()", *args],
+        env=env,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def bench(name: str, backend_args: list[str], n_runs: int, env: dict[str, str]):
+    module = pathlib.Path(__file__).stem
+
+    start = time.perf_counter()
+    for _ in range(n_runs):
+        aq("--module", module, "run", "Root", *backend_args, env=env)
+    elapsed = time.perf_counter() - start
+
+    print(f"{name:>16}: {elapsed:7.3f}s for {n_runs} runs")
+
+
+def main():
+    n_runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    n_workers = sys.argv[2] if len(sys.argv) > 2 else "4"
+    import_ms = sys.argv[3] if len(sys.argv) > 3 else "1000"
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        python_path = [str(pathlib.Path(__file__).parent), os.environ.get("PYTHONPATH")]
+        env = dict(
+            os.environ,
+            AQ_CACHE_DIR=cache_dir,
+            BENCH_IMPORT_MS=import_ms,
+            PYTHONPATH=os.pathsep.join(p for p in python_path if p),
+        )
+
+        bench("new cluster", ["--dask", n_workers], n_runs, env)
+        try:
+            bench("shared cluster", ["--dask-cluster", n_workers], n_runs, env)
+        finally:
+            aq("cluster", "stop", env=env)
+
+
+if __name__ == "__main__":
+    main()
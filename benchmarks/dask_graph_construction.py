@@ -0,0 +1,59 @@
+"""Benchmark the construction and optimization of the Dask graph of a map-reduce
+task, with one node per item, and with a fixed number of partitions.
+
+Usage: python benchmarks/dask_graph_construction.py [n_items] [n_partitions]"""
+
+import sys
+import time
+
+from aqueduct import MapReduceTask
+from aqueduct.backend.dask import add_work_to_dask_graph, optimize_dask_graph
+
+
+class SumTask(MapReduceTask):
+    def __init__(self, n_items: int):
+        self.n_items = n_items
+
+    def items(self):
+        return range(self.n_items)
+
+    def map(self, item, requirements=None):
+        return item
+
+    def accumulator(self, requirements=None):
+        return 0
+
+    def reduce(self, lhs, rhs, requirements=None):
+        return lhs + rhs
+
+    def post(self, acc, requirements=None):
+        return acc
+
+
+def bench(name: str, n_items: int, spec: dict, optimize: bool):
+    start = time.perf_counter()
+    computation, graph = add_work_to_dask_graph(SumTask(n_items), {}, spec)
+    built = time.perf_counter()
+
+    if optimize:
+        graph = optimize_dask_graph(graph, computation, [])
+    optimized = time.perf_counter()
+
+    print(
+        f"{name:>28}: {len(graph):>8} entries, built in {built - start:7.3f}s, "
+        f"optimized in {optimized - built:7.3f}s"
+    )
+
+
+def main():
+    n_items = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n_partitions = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+
+    partitioned = {"n_partitions": n_partitions}
+    bench("one node per item", n_items, {"chunk_size": 1}, optimize=True)
+    bench(f"{n_partitions} partitions", n_items, partitioned, optimize=True)
+    bench(f"{n_partitions} partitions, no optimize", n_items, partitioned, False)
+
+
+if __name__ == "__main__":
+    main()
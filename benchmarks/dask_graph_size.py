@@ -0,0 +1,76 @@
+"""Benchmark the serialized size of the Dask graph of a map-reduce task, with tasks
+that refer to the configuration by key, against embedding the configuration in every
+task of the graph. Tasks are pickled one at a time, like the distributed scheduler
+ships them to workers.
+
+Usage: python benchmarks/dask_graph_size.py [n_items] [config_entries]"""
+
+import sys
+import time
+
+import cloudpickle
+
+from aqueduct import MapReduceTask
+from aqueduct.backend.dask import (
+    AQ_DASK_CONFIGS,
+    add_work_to_dask_graph,
+    wrap_in_context,
+)
+from aqueduct.config import use_config
+
+
+class SumTask(MapReduceTask):
+    def __init__(self, n_items: int):
+        self.n_items = n_items
+
+    def items(self):
+        return range(self.n_items)
+
+    def map(self, item, requirements=None):
+        return item
+
+    def accumulator(self, requirements=None):
+        return 0
+
+    def reduce(self, lhs, rhs, requirements=None):
+        return lhs + rhs
+
+    def post(self, acc, requirements=None):
+        return acc
+
+
+def embed_config(graph: dict) -> dict:
+    """The graph as it was built when every task carried the configuration."""
+    embedded = {}
+    for key, entry in graph.items():
+        if isinstance(entry, tuple) and entry and entry[0] is wrap_in_context:
+            entry = (entry[0], AQ_DASK_CONFIGS[entry[1]], *entry[2:])
+        embedded[key] = entry
+
+    return embedded
+
+
+def measure(graph: dict) -> tuple[int, float]:
+    start = time.perf_counter()
+    size = sum(len(cloudpickle.dumps(entry)) for entry in graph.values())
+    return size, time.perf_counter() - start
+
+
+def main():
+    n_items = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    config_entries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    cfg = {
+        f"Task{i}": {"path": f"/data/{i}", "threshold": i}
+        for i in range(config_entries)
+    }
+    with use_config(cfg):
+        _, graph = add_work_to_dask_graph(SumTask(n_items), {}, {"chunk_size": 1})
+
+    for name, g in [("by key", graph), ("embedded", embed_config(graph))]:
+        size, elapsed = measure(g)
+        print(f"{name:>9}: {size / 2**20:8.2f} MB pickled in {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
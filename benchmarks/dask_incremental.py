@@ -0,0 +1,59 @@
+"""Benchmark a Dask pipeline whose tasks are slow to plan and to compute, with the
+whole graph built before it is computed, and with incremental submission.
+
+Usage: python benchmarks/dask_incremental.py [n_tasks] [plan_ms] [run_ms] [batch]"""
+
+import sys
+import time
+
+from dask.distributed import LocalCluster
+
+from aqueduct import Task
+from aqueduct.backend.dask import DaskBackend
+
+
+class SlowTask(Task):
+    def __init__(self, index: int, plan_ms: float, run_ms: float):
+        self.index = index
+        self.plan_ms = plan_ms
+        self.run_ms = run_ms
+
+    def requirements(self):
+        # Stands for artifact probes and expensive requirement resolution.
+        time.sleep(self.plan_ms / 1000)
+
+    def run(self, requirements=None):
+        time.sleep(self.run_ms / 1000)
+        return self.index
+
+
+def bench(name: str, backend: DaskBackend, work: list):
+    start = time.perf_counter()
+    result = backend.run(work)
+    elapsed = time.perf_counter() - start
+
+    assert result == list(range(len(work)))
+    print(f"{name:>24}: {elapsed:7.3f}s")
+
+
+def main():
+    n_tasks = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    plan_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 5
+    run_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 20
+    batch = int(sys.argv[4]) if len(sys.argv) > 4 else 50
+
+    work = [SlowTask(i, plan_ms, run_ms) for i in range(n_tasks)]
+
+    with LocalCluster(n_workers=4, threads_per_worker=1) as cluster:
+        client = cluster.get_client()
+
+        bench("whole graph", DaskBackend(client), work)
+        bench(
+            f"batches of {batch} tasks",
+            DaskBackend(client, incremental=batch),
+            work,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark repeated Dask runs over overlapping task trees, as in an interactive
+session, with and without a result cache.
+
+Usage: python benchmarks/dask_result_cache.py [n_inputs] [run_ms] [n_runs]"""
+
+import sys
+import time
+
+from dask.distributed import LocalCluster
+
+from aqueduct import Task
+from aqueduct.backend.dask import DaskBackend
+
+
+class SlowInput(Task):
+    def __init__(self, index: int, run_ms: float):
+        self.index = index
+        self.run_ms = run_ms
+
+    def run(self, requirements=None):
+        time.sleep(self.run_ms / 1000)
+        return self.index
+
+
+class Total(Task):
+    def __init__(self, n_inputs: int, run_ms: float, offset: int):
+        self.n_inputs = n_inputs
+        self.run_ms = run_ms
+        self.offset = offset
+
+    def requirements(self):
+        return [SlowInput(i, self.run_ms) for i in range(self.n_inputs)]
+
+    def run(self, requirements=None):
+        return sum(requirements) + self.offset
+
+
+def bench(name: str, backend: DaskBackend, n_inputs: int, run_ms: float, n_runs: int):
+    start = time.perf_counter()
+    for offset in range(n_runs):
+        backend.run(Total(n_inputs, run_ms, offset))
+    elapsed = time.perf_counter() - start
+
+    print(f"{name:>16}: {elapsed:7.3f}s for {n_runs} runs")
+
+    if backend.result_cache is not None:
+        backend.result_cache.clear()
+
+
+def main():
+    n_inputs = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    run_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 20
+    n_runs = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+
+    with LocalCluster(n_workers=4, threads_per_worker=1) as cluster:
+        client = cluster.get_client()
+
+        bench("no cache", DaskBackend(client), n_inputs, run_ms, n_runs)
+        bench(
+            "result cache",
+            DaskBackend(client, result_cache="256MB"),
+            n_inputs,
+            run_ms,
+            n_runs,
+        )
+
+
+if __name__ == "__main__":
+    main()
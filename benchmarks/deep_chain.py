@@ -0,0 +1,56 @@
+"""Benchmark the resolution of long chains of tasks, where every task requires the
+previous one. Resolution time should grow linearly with the length of the chain.
+
+Usage: python benchmarks/deep_chain.py [max_length]"""
+
+import sys
+import time
+
+from aqueduct import Task
+from aqueduct.backend.dask import add_work_to_dask_graph
+from aqueduct.task_tree import _resolve_task_tree
+
+
+class ChainTask(Task):
+    """Requires `ChainTask(length - 1)`, down to `ChainTask(0)`. Returns its length.
+    The tests use it too."""
+
+    def __init__(self, length: int):
+        self.length = length
+
+    def requirements(self):
+        if self.length > 0:
+            return ChainTask(self.length - 1)
+
+    def run(self, reqs=None):
+        return 0 if reqs is None else reqs + 1
+
+
+def time_resolution(length: int) -> float:
+    start = time.perf_counter()
+    _resolve_task_tree(ChainTask(length), lambda t, r=None: t.run(r))
+    return time.perf_counter() - start
+
+
+def time_dask_graph(length: int) -> float:
+    start = time.perf_counter()
+    add_work_to_dask_graph(ChainTask(length), {}, {})
+    return time.perf_counter() - start
+
+
+def main():
+    max_length = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    lengths = [max_length // 100, max_length // 10, max_length]
+    print(f"Recursion limit: {sys.getrecursionlimit()}")
+    for name, fn in [("resolve", time_resolution), ("dask graph", time_dask_graph)]:
+        for length in lengths:
+            elapsed = fn(length)
+            print(
+                f"    {name:<10} length={length:<8} {elapsed:.3f}s "
+                f"({1e6 * elapsed / length:.1f}us/task)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Benchmark task tree resolution on a diamond lattice, where every task requires two
+tasks of the level below, and neighbouring tasks share one requirement.
+
+Usage: python benchmarks/diamond_lattice.py [depth] [width]"""
+
+import sys
+import time
+
+from aqueduct import Task
+from aqueduct.task_tree import _resolve_task_tree
+
+
+class LatticeTask(Task):
+    def __init__(self, level: int, index: int, width: int):
+        self.level = level
+        self.index = index
+        self.width = width
+
+    def requirements(self):
+        if self.level == 0:
+            return None
+
+        return [
+            LatticeTask(self.level - 1, self.index, self.width),
+            LatticeTask(self.level - 1, (self.index + 1) % self.width, self.width),
+        ]
+
+    def run(self, reqs=None):
+        return 1 if reqs is None else sum(reqs)
+
+
+def resolve(depth: int, width: int, deduplicate: bool) -> tuple[int, float]:
+    n_calls = 0
+
+    def fn(task, requirements=None):
+        nonlocal n_calls
+        n_calls += 1
+        return task.run(requirements)
+
+    root = [LatticeTask(depth, i, width) for i in range(width)]
+
+    start = time.perf_counter()
+    _resolve_task_tree(root, fn, deduplicate=deduplicate)
+    return n_calls, time.perf_counter() - start
+
+
+def main():
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    width = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    print(f"Diamond lattice of depth {depth} and width {width}.")
+    for deduplicate in [True, False]:
+        n_calls, elapsed = resolve(depth, width, deduplicate)
+        print(f"    deduplicate={deduplicate}: {n_calls} calls in {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
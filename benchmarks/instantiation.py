@@ -0,0 +1,67 @@
+"""Benchmark the instantiation throughput of tasks, in tasks per second.
+
+Usage: python benchmarks/instantiation.py [n_tasks]"""
+
+import sys
+import time
+
+import numpy as np
+
+from aqueduct import Task, set_config
+from aqueduct.task.hashing import hash_memo
+
+
+class ParametrizedTask(Task):
+    def __init__(self, index: int, scale: float = 1.0, name: str = "default"):
+        self.index = index
+        self.scale = scale
+        self.name = name
+
+    def run(self):
+        return self.index * self.scale
+
+
+class ConfiguredTask(ParametrizedTask):
+    CONFIG = "configured"
+
+
+class InheritedInitTask(ParametrizedTask):
+    pass
+
+
+class ArrayTask(Task):
+    def __init__(self, index: int, array: np.ndarray):
+        self.index = index
+        self.array = array
+
+    def run(self):
+        return self.array[self.index]
+
+
+def throughput(task_class, n_tasks: int, *args) -> float:
+    start = time.perf_counter()
+    for i in range(n_tasks):
+        task_class(i, *args)
+    return n_tasks / (time.perf_counter() - start)
+
+
+def main():
+    n_tasks = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+    set_config({"configured": {"scale": 2.0, "name": "from_config"}})
+
+    for task_class in [ParametrizedTask, ConfiguredTask, InheritedInitTask]:
+        rate = throughput(task_class, n_tasks)
+        print(f"{task_class.__name__:<20} {rate:>10.0f} tasks/s")
+
+    # Every task receives the same read-only 8MB array, which is only hashed once per
+    # run.
+    array = np.random.default_rng(0).random(1_000_000)
+    array.flags.writeable = False
+    with hash_memo():
+        rate = throughput(ArrayTask, n_tasks, array)
+    print(f"{'ArrayTask':<20} {rate:>10.0f} tasks/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Benchmark the IPC volume and wall time of the MultiprocessingBackend on a map-reduce
+task with large requirements, against sending the requirements with every item.
+
+Usage: python benchmarks/multiprocessing_ipc.py [n_items] [requirements_mb]"""
+
+import multiprocessing
+import pickle
+import sys
+import time
+
+import cloudpickle
+import numpy as np
+
+from aqueduct import MapReduceTask, Task
+from aqueduct.backend.multiprocessing import execute_parallel_task
+
+N_WORKERS = 4
+
+
+class LargeRequirement(Task):
+    def __init__(self, megabytes: int):
+        self.megabytes = megabytes
+
+    def run(self):
+        return np.ones(self.megabytes * 2**20 // 8)
+
+
+class SumTask(MapReduceTask):
+    def __init__(self, n_items: int, megabytes: int):
+        self.n_items = n_items
+        self.megabytes = megabytes
+
+    def requirements(self):
+        return LargeRequirement(self.megabytes)
+
+    def items(self):
+        return range(self.n_items)
+
+    def map(self, item, requirements):
+        return float(requirements[item])
+
+    def accumulator(self, requirements=None):
+        return 0.0
+
+    def reduce(self, lhs, rhs, requirements=None):
+        return lhs + rhs
+
+    def post(self, acc, requirements=None):
+        return acc
+
+
+def call_map_fn_per_item(args):
+    map_fn, item, requirements = args
+    return map_fn(item, requirements)
+
+
+def execute_per_item(pool, task, requirements):
+    """Previous behavior: the requirements are pickled with every item."""
+    accumulator = task.accumulator(requirements)
+    for mapped_item in pool.imap_unordered(
+        call_map_fn_per_item, [(task.map, item, requirements) for item in task.items()]
+    ):
+        accumulator = task.reduce(mapped_item, accumulator, requirements)
+    return task.post(accumulator, requirements)
+
+
+def main():
+    n_items = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    megabytes = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+
+    task = SumTask(n_items, megabytes)
+    requirements = LargeRequirement(megabytes).run()
+
+    per_item_bytes = sum(
+        len(pickle.dumps((task.map, item, requirements))) for item in task.items()
+    )
+    broadcast_bytes = len(cloudpickle.dumps((task, requirements))) + sum(
+        len(pickle.dumps(("0" * 32, "/tmp/aqueduct_xxxxxxxx.pkl", item)))
+        for item in task.items()
+    )
+
+    print(f"{n_items} items, {megabytes}MB of requirements, {N_WORKERS} workers.")
+    with multiprocessing.Pool(N_WORKERS) as pool:
+        for name, fn, n_bytes in [
+            ("per item", execute_per_item, per_item_bytes),
+            ("broadcast", execute_parallel_task, broadcast_bytes),
+        ]:
+            start = time.perf_counter()
+            fn(pool, task, requirements)
+            elapsed = time.perf_counter() - start
+            print(f"{name:<10} {n_bytes / 2**20:>10.1f}MB serialized  {elapsed:>7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
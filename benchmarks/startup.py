@@ -0,0 +1,67 @@
+"""Benchmark the startup time of `import aqueduct` and `aq ls`, and list the heavy
+libraries that were imported along the way. Every measurement runs in a fresh
+interpreter.
+
+Usage: python benchmarks/startup.py [n_repeats]"""
+
+import statistics
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = [
+    "dask",
+    "distributed",
+    "hydra",
+    "jupyter_client",
+    "nbclient",
+    "nbconvert",
+    "numpy",
+    "pandas",
+    "requests",
+    "tqdm",
+    "xarray",
+]
+
+IMPORT_AQUEDUCT = "import aqueduct"
+AQ_LS = (
+    "import sys; sys.argv = ['aq', '--module', 'aqueduct.task.download', 'ls']; "
+    "from aqueduct.cli.cli import cli; cli()"
+)
+REPORT_HEAVY_MODULES = (
+    f"import sys; print([m for m in {HEAVY_MODULES} if m in sys.modules])"
+)
+
+
+def startup_time(program: str, n_repeats: int) -> float:
+    times = []
+    for _ in range(n_repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", program], check=True, capture_output=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def heavy_modules_imported(program: str) -> str:
+    output = subprocess.run(
+        [sys.executable, "-c", f"{program}\n{REPORT_HEAVY_MODULES}"],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return output.stdout.splitlines()[-1]
+
+
+def main():
+    n_repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    baseline = startup_time("pass", n_repeats)
+    print(f"{'python':<16} {baseline:.3f}s")
+
+    for name, program in [("import aqueduct", IMPORT_AQUEDUCT), ("aq ls", AQ_LS)]:
+        elapsed = startup_time(program, n_repeats)
+        print(f"{name:<16} {elapsed:.3f}s  heavy: {heavy_modules_imported(program)}")
+
+
+if __name__ == "__main__":
+    main()
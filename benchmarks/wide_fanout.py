@@ -0,0 +1,62 @@
+"""Benchmark the speedup of the ConcurrentBackend on a wide fan-out, where a root task
+requires many independent chains of tasks. The speedup should be close to the number
+of workers.
+
+Usage: python benchmarks/wide_fanout.py [width] [max_workers]"""
+
+import os
+import sys
+import time
+
+from aqueduct import Task
+from aqueduct.backend import ConcurrentBackend
+
+TASK_DURATION = 0.1
+
+
+class BusyTask(Task):
+    def __init__(self, index: int, depth: int = 0):
+        self.index = index
+        self.depth = depth
+
+    def requirements(self):
+        if self.depth > 0:
+            return BusyTask(self.index, self.depth - 1)
+
+    def run(self, reqs=None):
+        time.sleep(TASK_DURATION)
+        return self.index if reqs is None else reqs
+
+
+class FanOutTask(Task):
+    def __init__(self, width: int):
+        self.width = width
+
+    def requirements(self):
+        return [BusyTask(i, depth=2) for i in range(self.width)]
+
+    def run(self, reqs):
+        return sum(reqs)
+
+
+def main():
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+
+    sequential = 3 * width * TASK_DURATION
+    print(f"{width} chains of 3 tasks, {sequential:.1f}s of work.")
+
+    n_workers = 1
+    while n_workers <= max_workers:
+        start = time.perf_counter()
+        ConcurrentBackend(n_workers=n_workers).run(FanOutTask(width))
+        elapsed = time.perf_counter() - start
+
+        print(
+            f"{n_workers:>3} workers {elapsed:>7.2f}s  speedup {sequential / elapsed:.1f}"
+        )
+        n_workers *= 2
+
+
+if __name__ == "__main__":
+    main()
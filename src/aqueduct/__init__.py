@@ -5,9 +5,9 @@ from .artifact import (
     CompositeArtifact,
 )
 from .artifact.util import artifact_report
-from .backend import ImmediateBackend, ConcurrentBackend, DaskBackend
+from .backend import ImmediateBackend, ConcurrentBackend, DaskBackend, ThreadBackend
 from .base import run
-from .config import set_config, get_config
+from .config import set_config, get_config, use_config
 from .task import (
     Task,
     AggregateTask,
@@ -46,4 +46,6 @@ __all__ = [
     "set_config",
     "Task",
     "tasks_in_module",
+    "ThreadBackend",
+    "use_config",
 ]
@@ -12,6 +12,7 @@ from .artifact import (
     TextStreamArtifactSpec,
 )
 from .base import resolve_artifact_from_spec
+from .cache import ArtifactCache, artifact_cache, get_artifact_cache
 from .composite import CompositeArtifact
 from .inmemory import InMemoryArtifact
 from .local import LocalFilesystemArtifact, LocalStoreArtifact
@@ -20,7 +21,10 @@ from .util import artifact_report
 
 __all__ = [
     "Artifact",
+    "ArtifactCache",
+    "artifact_cache",
     "ArtifactSpec",
+    "get_artifact_cache",
     "resolve_artifact_from_spec",
     "LocalFilesystemArtifact",
     "LocalStoreArtifact",
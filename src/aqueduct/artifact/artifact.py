@@ -1,16 +1,29 @@
-from typing import Callable, TypeVar, Generic, TypeAlias, TextIO
+from typing import Callable, TypeVar, Generic, TypeAlias, TextIO, Hashable, Optional
 
 import abc
 import datetime
 import logging
 
+from .cache import CACHED_PROBES, cached_probe
+
 _T = TypeVar("_T")
 
 _logger = logging.getLogger(__name__)
 
 
 class Artifact(abc.ABC):
-    """The location and metadata of a store artifact."""
+    """The location and metadata of a store artifact.
+
+    While a backend is running, the results of `exists`, `last_modified` and `size`
+    are cached for artifacts that provide a `_cache_key`. Subclasses do not need to do
+    anything special for this to happen."""
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        for probe_name in CACHED_PROBES:
+            if probe_name in cls.__dict__:
+                setattr(cls, probe_name, cached_probe(cls.__dict__[probe_name]))
 
     @abc.abstractmethod
     def exists(self) -> bool:
@@ -23,6 +36,12 @@ class Artifact(abc.ABC):
     def last_modified(self) -> datetime.datetime:
         return datetime.datetime.fromtimestamp(0)
 
+    def _cache_key(self) -> Optional[Hashable]:
+        """Key that identifies the stored resource in the artifact cache. Two artifact
+        objects that point to the same resource should have the same key. If `None`,
+        probes of the artifact are never cached."""
+        return None
+
     @abc.abstractmethod
     def size(self) -> int:
         """The size of the stored artifact, in bytes."""
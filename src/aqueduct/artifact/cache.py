@@ -0,0 +1,123 @@
+"""Run-scoped cache for the results of artifact probes (`exists`, `last_modified` and
+`size`). On network filesystems, each probe can cost milliseconds, and the same
+artifact is typically probed several times while a task tree is resolved."""
+
+from typing import Any, Callable, Hashable, Iterator, Optional, TYPE_CHECKING
+
+import contextlib
+import contextvars
+import functools
+import logging
+import threading
+
+if TYPE_CHECKING:
+    from .artifact import Artifact
+
+_logger = logging.getLogger(__name__)
+
+CACHED_PROBES = ("exists", "last_modified", "size")
+
+AQ_ARTIFACT_CACHE: contextvars.ContextVar[
+    Optional["ArtifactCache"]
+] = contextvars.ContextVar("AQ_ARTIFACT_CACHE", default=None)
+
+
+class ArtifactCache:
+    """Remember the result of artifact probes, keyed by `Artifact._cache_key`.
+
+    Attributes:
+        hits: Number of probes that were answered from the cache.
+        misses: Number of probes that had to be forwarded to the artifact."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict[Hashable, dict[Callable, Any]] = {}
+        self._lock = threading.Lock()
+
+    def probe(self, artifact: "Artifact", probe_fn: Callable[["Artifact"], Any]) -> Any:
+        key = artifact._cache_key()
+        if key is None:
+            return probe_fn(artifact)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and probe_fn in entry:
+                self.hits += 1
+                return entry[probe_fn]
+
+            self.misses += 1
+
+        value = probe_fn(artifact)
+
+        with self._lock:
+            self._entries.setdefault(key, {})[probe_fn] = value
+
+        return value
+
+    def invalidate(self, artifact: "Artifact"):
+        from .composite import CompositeArtifact
+
+        if isinstance(artifact, CompositeArtifact):
+            for a in artifact.artifacts:
+                self.invalidate(a)
+
+        key = artifact._cache_key()
+        if key is not None:
+            with self._lock:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return f"ArtifactCache({len(self)} artifacts, {self.hits} hits, {self.misses} misses)"
+
+
+def get_artifact_cache() -> Optional[ArtifactCache]:
+    """Return the artifact cache of the current run, or `None` if no run is active."""
+    return AQ_ARTIFACT_CACHE.get()
+
+
+@contextlib.contextmanager
+def artifact_cache() -> Iterator[ArtifactCache]:
+    """Activate an artifact cache for the duration of the context. If a cache is
+    already active, for instance when a backend is run from inside a task, it is
+    reused."""
+    active = AQ_ARTIFACT_CACHE.get()
+    if active is not None:
+        yield active
+        return
+
+    cache = ArtifactCache()
+    token = AQ_ARTIFACT_CACHE.set(cache)
+    try:
+        yield cache
+    finally:
+        AQ_ARTIFACT_CACHE.reset(token)
+        _logger.debug(f"Artifact cache: {cache.hits} hits, {cache.misses} misses.")
+
+
+def invalidate_artifact(artifact: Optional["Artifact"]):
+    """Forget the probes of an artifact, typically because it was just written."""
+    cache = AQ_ARTIFACT_CACHE.get()
+    if cache is not None and artifact is not None:
+        cache.invalidate(artifact)
+
+
+def cached_probe(probe_fn: Callable[["Artifact"], Any]) -> Callable[["Artifact"], Any]:
+    """Route an artifact probe through the active artifact cache, if there is one."""
+
+    @functools.wraps(probe_fn)
+    def wrapped(self):
+        cache = AQ_ARTIFACT_CACHE.get()
+        if cache is None:
+            return probe_fn(self)
+        else:
+            return cache.probe(self, probe_fn)
+
+    return wrapped
@@ -4,6 +4,7 @@ from typing import BinaryIO, Callable, TextIO, TypeAlias, TypeVar
 
 from ..config import get_aqueduct_config
 from .artifact import StreamArtifact, TextStreamArtifact
+from .cache import invalidate_artifact
 
 _T = TypeVar("_T")
 PathSpec: TypeAlias = pathlib.Path | str
@@ -33,6 +34,9 @@ class LocalFilesystemArtifact(TextStreamArtifact, StreamArtifact):
     def last_modified(self):
         return datetime.datetime.fromtimestamp(self.path.stat().st_mtime)
 
+    def _cache_key(self):
+        return ("file", str(self.path))
+
     def __repr__(self):
         return f"LocalFilesystemArtifact({self.path})"
 
@@ -47,6 +51,7 @@ class LocalFilesystemArtifact(TextStreamArtifact, StreamArtifact):
         self.path.parent.mkdir(parents=True, exist_ok=True)
         with self.path.open("wb") as f:
             writer(object, f)
+        invalidate_artifact(self)
 
     def load_text(self, reader: Callable[[TextIO], _T] = read_str) -> _T:
         with self.path.open("r") as f:
@@ -56,6 +61,7 @@ class LocalFilesystemArtifact(TextStreamArtifact, StreamArtifact):
         self.path.parent.mkdir(parents=True, exist_ok=True)
         with self.path.open("w") as f:
             writer(object, f)
+        invalidate_artifact(self)
 
 
 class LocalStoreArtifact(LocalFilesystemArtifact):
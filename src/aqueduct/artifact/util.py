@@ -1,16 +1,32 @@
+import concurrent.futures
 import dataclasses
-from typing import MutableMapping, Type, TYPE_CHECKING, Sequence, List
+import logging
+import time
+from typing import MutableMapping, Optional, Type, TYPE_CHECKING, Sequence, List
 
 from .artifact import Artifact
 from .base import resolve_artifact_from_spec
+from .cache import get_artifact_cache
 from .composite import CompositeArtifact
-from ..task_tree import reduce_type_in_tree, _resolve_task_tree
+from ..config import get_aqueduct_config
+from ..context import bind_context
+from ..task_tree import (
+    reduce_type_in_tree,
+    gather_tasks_in_tree,
+    _is_forced,
+    _resolve_task_tree,
+)
 
 if TYPE_CHECKING:
     from ..task import AbstractTask
     from ..task_tree import TaskTree
 
 
+_logger = logging.getLogger(__name__)
+
+DEFAULT_PROBE_WORKERS = 16
+
+
 @dataclasses.dataclass
 class ArtifactStatistics:
     count: int = 0
@@ -87,3 +103,102 @@ def head_artifacts(task_tree: "TaskTree") -> Sequence[Artifact]:
     return reduce_type_in_tree(
         head_artifacts, Artifact, flatten_composite_artifacts, []  # type: ignore
     )
+
+
+@dataclasses.dataclass
+class PlanningStatistics:
+    n_tasks: int = 0
+    n_artifacts: int = 0
+    elapsed: float = 0.0
+
+
+def _probe_exists(artifact: Artifact) -> bool:
+    return artifact.exists()
+
+
+def prefetch_artifact_probes(
+    work: "TaskTree",
+    ignore_cache: bool = False,
+    force_tasks: Optional[set[Type["AbstractTask"]]] = None,
+    max_workers: Optional[int] = None,
+) -> PlanningStatistics:
+    """Check the existence of all the artifacts of a task tree in bulk, using a pool of
+    threads, and store the answers in the active artifact cache. The tree is expanded
+    one level at a time, so that the requirements of cached tasks are not expanded.
+
+    Does nothing if no artifact cache is active.
+
+    Arguments:
+        work: The task tree to plan.
+        ignore_cache: If `True`, expand the requirements of cached tasks too.
+        force_tasks: Expand the requirements of these task classes even if they are
+            cached.
+        max_workers: Number of threads used to probe the artifacts. Defaults to the
+            `aqueduct.probe_workers` configuration option, or 16. If 0, nothing is
+            done.
+
+    Returns:
+        Statistics about the planning phase."""
+    from ..task import AbstractTask
+
+    statistics = PlanningStatistics()
+
+    if max_workers is None:
+        max_workers = get_aqueduct_config().get("probe_workers", DEFAULT_PROBE_WORKERS)
+
+    if get_artifact_cache() is None or max_workers == 0:
+        return statistics
+
+    start = time.perf_counter()
+
+    seen_tasks = set()
+    seen_artifacts = set()
+    frontier = gather_tasks_in_tree(work)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while frontier:
+            level: list[AbstractTask] = []
+            for task in frontier:
+                key = task._unique_key()
+                if key not in seen_tasks:
+                    seen_tasks.add(key)
+                    level.append(task)
+
+            to_probe = []
+            for task in level:
+                artifact = resolve_artifact_from_spec(task.artifact())
+                for a in flatten_artifact(artifact):
+                    cache_key = a._cache_key()
+                    if cache_key is not None and cache_key not in seen_artifacts:
+                        seen_artifacts.add(cache_key)
+                        to_probe.append(a)
+
+            # Consuming the results forwards any exception raised by a probe.
+            list(executor.map(bind_context(_probe_exists), to_probe))
+
+            frontier = []
+            for task in level:
+                requirements = task._resolve_requirements(
+                    ignore_cache=ignore_cache or _is_forced(task, force_tasks)
+                )
+                frontier.extend(gather_tasks_in_tree(requirements))
+
+    statistics.n_tasks = len(seen_tasks)
+    statistics.n_artifacts = len(seen_artifacts)
+    statistics.elapsed = time.perf_counter() - start
+
+    return statistics
+
+
+def flatten_artifact(artifact: Optional[Artifact]) -> list[Artifact]:
+    """List the leaf artifacts of a possibly composite artifact."""
+    if artifact is None:
+        return []
+    elif isinstance(artifact, CompositeArtifact):
+        artifacts = []
+        for a in artifact.artifacts:
+            artifacts.extend(flatten_artifact(a))
+
+        return artifacts
+    else:
+        return [artifact]
@@ -6,24 +6,37 @@ from typing import TypeAlias, Literal, Mapping, cast
 import collections.abc
 
 from aqueduct.config import get_aqueduct_config
+from .asyncio import AsyncioBackend
 from .backend import Backend
+from .base import parse_bool_option
 from .concurrent import ConcurrentBackend
 from .dask import DaskBackend, resolve_dask_backend_dict_spec
 from .immediate import ImmediateBackend
 from .multiprocessing import MultiprocessingBackend
-import hydra
+from .submission import Submission
+from .thread import ThreadBackend
 
 NAMES_OF_BACKENDS = {
+    "asyncio": AsyncioBackend,
     "immediate": ImmediateBackend,
     "concurrent": ConcurrentBackend,
     "dask": DaskBackend,
     "multiprocessing": MultiprocessingBackend,
+    "thread": ThreadBackend,
 }
 
 BackendDictSpec: TypeAlias = Mapping[str, int | str]
 
 BackendSpec: TypeAlias = (
-    Literal["immediate", "concurrent", "dask", "dask_graph", "multiprocessing"]
+    Literal[
+        "asyncio",
+        "immediate",
+        "concurrent",
+        "dask",
+        "dask_graph",
+        "multiprocessing",
+        "thread",
+    ]
     | Backend
     | BackendDictSpec
     | None
@@ -41,6 +54,8 @@ def resolve_backend_from_spec(spec: BackendSpec) -> Backend:
         cfg = get_aqueduct_config()
 
         if "backend" in cfg:
+            import hydra.utils
+
             backend = cast(Backend, hydra.utils.instantiate(cfg["backend"]))
             return backend
         else:
@@ -50,14 +65,34 @@ def resolve_backend_from_spec(spec: BackendSpec) -> Backend:
 
 
 def resolve_dict_backend_spec(spec: BackendDictSpec) -> Backend:
-    if spec["type"] == "dask":
+    if spec["type"] == "asyncio":
+        n_workers = spec.get("n_workers")
+        max_in_flight = spec.get("max_in_flight")
+        return AsyncioBackend(
+            max_concurrency=int(spec.get("max_concurrency", 64)),
+            n_workers=int(n_workers) if n_workers is not None else None,
+            max_in_flight=int(max_in_flight) if max_in_flight is not None else None,
+        )
+    elif spec["type"] == "dask":
         return resolve_dask_backend_dict_spec(spec)
     elif spec["type"] == "concurrent":
         return ConcurrentBackend(n_workers=int(spec["n_workers"]))
     elif spec["type"] == "immediate":
         return ImmediateBackend()
     elif spec["type"] == "multiprocessing":
-        return MultiprocessingBackend(n_workers=int(spec["n_workers"]))
+        max_in_flight = spec.get("max_in_flight")
+        return MultiprocessingBackend(
+            n_workers=int(spec["n_workers"]),
+            chunk_size=int(spec.get("chunk_size", 1)),
+            max_in_flight=int(max_in_flight) if max_in_flight is not None else None,
+            reduce_in_workers=parse_bool_option(spec.get("reduce_in_workers", False)),
+            fan_in=int(spec.get("fan_in", 2)),
+        )
+    elif spec["type"] == "thread":
+        n_workers = spec.get("n_workers")
+        return ThreadBackend(
+            n_workers=int(n_workers) if n_workers is not None else None
+        )
     else:
         raise KeyError("Unrecognized backend spec")
 
@@ -67,6 +102,7 @@ def get_default_backend() -> Backend:
 
 
 __all__ = [
+    "AsyncioBackend",
     "ConcurrentBackend",
     "DaskBackend",
     "ImmediateBackend",
@@ -75,4 +111,6 @@ __all__ = [
     "Backend",
     "get_default_backend",
     "MultiprocessingBackend",
+    "Submission",
+    "ThreadBackend",
 ]
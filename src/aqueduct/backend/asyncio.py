@@ -0,0 +1,263 @@
+"""Backend that runs tasks on an `asyncio` event loop.
+
+Tasks whose `run` method (or `map` method, for map-reduce tasks) is a coroutine
+function are awaited on the loop, so that many of them can wait on I/O at the same time
+without holding a thread or a process each. Regular tasks, as well as artifact probes,
+loads and saves, are handed to a thread pool so that they do not block the loop."""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Literal,
+    Optional,
+    Type,
+    TypedDict,
+    TypeVar,
+)
+
+import asyncio
+import functools
+import inspect
+import itertools
+import logging
+
+from ..artifact import resolve_artifact_from_spec
+from ..artifact.cache import invalidate_artifact
+from ..context import bind_context
+from ..task import AbstractTask
+from ..task.mapreduce import AbstractMapReduceTask
+from ..task.task import Task
+from ..task_tree import (
+    TaskTree,
+    _is_forced,
+    _map_tasks_in_tree,
+    build_task_graph,
+)
+from .backend import Backend
+from .base import TaskError
+from .concurrent import map_requirements
+from .immediate import execute_task
+from .submission import Submission
+
+_T = TypeVar("_T")
+
+_logger = logging.getLogger(__name__)
+
+
+class AsyncioBackendDictSpec(TypedDict, total=False):
+    type: Literal["asyncio"]
+    max_concurrency: int
+    n_workers: int
+    max_in_flight: int
+
+
+class AsyncioBackend(Backend):
+    """Execute tasks on a single `asyncio` event loop. Every task is started as soon
+    as its requirements are computed.
+
+    Coroutine `run` and `map` methods are awaited on the loop. Synchronous tasks are
+    run in a pool of threads.
+
+    Arguments:
+        max_concurrency: Maximum number of tasks that are executed at the same time.
+        n_workers: Number of threads that execute synchronous tasks and artifact
+            operations. Defaults to the default of `ThreadPoolExecutor`.
+        max_in_flight: Maximum number of items of a map-reduce task that are mapped
+            and not yet reduced at any time. Defaults to `max_concurrency`."""
+
+    def __init__(
+        self,
+        max_concurrency: int = 64,
+        n_workers: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1.")
+
+        self.max_concurrency = max_concurrency
+        self.n_workers = n_workers
+        self.max_in_flight = max_in_flight or max_concurrency
+
+    def _run(
+        self,
+        work: TaskTree,
+        force_tasks: Optional[set[Type[AbstractTask]]] = None,
+        submission: Optional[Submission] = None,
+    ) -> Any:
+        self._plan(work, force_tasks=force_tasks)
+
+        coroutine = self.run_graph(work, force_tasks, submission)
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coroutine)
+
+        # An event loop is already running in this thread, for instance in a notebook.
+        # The graph gets an event loop of its own in another thread.
+        with ThreadPoolExecutor(1) as executor:
+            return executor.submit(bind_context(asyncio.run), coroutine).result()
+
+    async def run_graph(
+        self,
+        work: TaskTree,
+        force_tasks: Optional[set[Type[AbstractTask]]] = None,
+        submission: Optional[Submission] = None,
+    ) -> Any:
+        """Compute a task tree on the running event loop."""
+        graph = build_task_graph(work, force_tasks=force_tasks)
+        _logger.info(f"Task graph has {len(graph)} unique tasks.")
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        futures: dict[str, asyncio.Future] = {}
+
+        with ThreadPoolExecutor(
+            self.n_workers, thread_name_prefix="aqueduct_asyncio"
+        ) as executor:
+
+            async def compute(key: str):
+                node = graph[key]
+                dependencies = await asyncio.gather(
+                    *(futures[d] for d in node.dependencies)
+                )
+                results = dict(zip(node.dependencies, dependencies))
+
+                async with semaphore:
+                    result = await self.check_artifact_and_execute(
+                        executor,
+                        node.task,
+                        map_requirements(node.requirements, results),
+                        force_tasks,
+                    )
+
+                if submission is not None:
+                    submission._set_task_result(node.task, result)
+
+                return result
+
+            # The graph is in topological order, the futures of the dependencies of a
+            # task are always created before the task itself.
+            for key in graph:
+                futures[key] = asyncio.ensure_future(compute(key))
+
+            try:
+                await asyncio.gather(*futures.values())
+            finally:
+                for future in futures.values():
+                    future.cancel()
+
+        return _map_tasks_in_tree(work, lambda t: futures[t._unique_key()].result())
+
+    async def check_artifact_and_execute(
+        self,
+        executor: ThreadPoolExecutor,
+        task: AbstractTask[_T],
+        requirements=None,
+        force_tasks: Optional[set[Type[AbstractTask]]] = None,
+    ) -> _T:
+        """Asynchronous counterpart of
+        :meth:`ImmediateBackend.check_artifact_and_execute`."""
+        loop = asyncio.get_running_loop()
+
+        def in_executor(fn: Callable[..., _T], *args) -> Awaitable[_T]:
+            return loop.run_in_executor(executor, bind_context(fn), *args)
+
+        force_run = getattr(task, "_aq_force_root", False) or _is_forced(
+            task, force_tasks
+        )
+        artifact = resolve_artifact_from_spec(task.artifact())
+
+        if (
+            artifact is not None
+            and not force_run
+            and task.AQ_AUTOLOAD
+            and await in_executor(artifact.exists)
+        ):
+            _logger.info(f"Loading result of {task} from {artifact}")
+            return await in_executor(task.load)
+
+        _logger.info(f"Running task {task}")
+        try:
+            if isinstance(task, Task):
+                if inspect.iscoroutinefunction(task.run):
+                    task_result = await execute_task(task, requirements)
+                else:
+                    task_result = await in_executor(execute_task, task, requirements)
+            elif isinstance(task, AbstractMapReduceTask):
+                task_result = await self.execute_map_reduce_task(
+                    executor, task, requirements
+                )
+            else:
+                raise RuntimeError("Unhandled task type.")
+        except Exception as e:
+            raise TaskError(f"Error while executing task {task}") from e
+
+        if task.AQ_AUTOSAVE and task_result is not None:
+            _logger.info(f"Saving result of {task} to {artifact}")
+            await in_executor(task.save, task_result)
+
+        invalidate_artifact(artifact)
+
+        return task_result
+
+    async def execute_map_reduce_task(
+        self,
+        executor: ThreadPoolExecutor,
+        task: AbstractMapReduceTask[Any, Any, _T],
+        requirements=None,
+    ) -> _T:
+        """Map the items of a task concurrently, and reduce them on the event loop as
+        they are mapped. At most `max_in_flight` items are pending at any time."""
+        loop = asyncio.get_running_loop()
+
+        if inspect.iscoroutinefunction(task.map):
+            map_item = functools.partial(task.map, requirements=requirements)
+        else:
+            map_fn = bind_context(task.map)
+
+            def map_item(item):
+                return loop.run_in_executor(executor, map_fn, item, requirements)
+
+        accumulator = task.accumulator(requirements)
+        items = iter(task.items())
+        pending: set[asyncio.Future] = set()
+
+        def submit_next_items():
+            n_missing = self.max_in_flight - len(pending)
+            for item in itertools.islice(items, n_missing):
+                pending.add(asyncio.ensure_future(map_item(item)))
+
+        try:
+            submit_next_items()
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                pending.difference_update(done)
+                submit_next_items()
+
+                for future in done:
+                    accumulator = task.reduce(
+                        future.result(), accumulator, requirements
+                    )
+        finally:
+            for future in pending:
+                future.cancel()
+
+        return task.post(accumulator, requirements)
+
+    def _spec(self) -> AsyncioBackendDictSpec:
+        spec: AsyncioBackendDictSpec = {
+            "type": "asyncio",
+            "max_concurrency": self.max_concurrency,
+            "max_in_flight": self.max_in_flight,
+        }
+        if self.n_workers is not None:
+            spec["n_workers"] = self.n_workers
+
+        return spec
+
+    def __str__(self):
+        return f"AsyncioBackend({self.max_concurrency})"
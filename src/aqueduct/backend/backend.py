@@ -1,13 +1,43 @@
 import abc
-from typing import Type, Any, TYPE_CHECKING, Optional
+import contextlib
+import contextvars
+import logging
+import threading
+from typing import Type, Any, TYPE_CHECKING, Iterator, Optional
 
+from ..artifact.cache import artifact_cache
+from ..artifact.util import PlanningStatistics, prefetch_artifact_probes
+from ..context import bind_context
 from ..task_tree import TaskTree
 from ..task import AbstractTask
+from ..task.hashing import hash_memo, log_hashing_report
+from .submission import Submission
 
 if TYPE_CHECKING:
     from . import BackendSpec
 
-AQ_CURRENT_BACKEND: Optional["Backend"] = None
+AQ_CURRENT_BACKEND: contextvars.ContextVar[
+    Optional["Backend"]
+] = contextvars.ContextVar("AQ_CURRENT_BACKEND", default=None)
+"""Backend that is computing the current task, if any. It is local to the current
+thread or `asyncio` task, see :func:`current_backend`."""
+
+_logger = logging.getLogger(__name__)
+
+
+def get_current_backend() -> Optional["Backend"]:
+    return AQ_CURRENT_BACKEND.get()
+
+
+@contextlib.contextmanager
+def current_backend(backend: Optional["Backend"]) -> Iterator[Optional["Backend"]]:
+    """Make `backend` the current backend for the duration of the context, in the
+    current thread or `asyncio` task only."""
+    token = AQ_CURRENT_BACKEND.set(backend)
+    try:
+        yield backend
+    finally:
+        AQ_CURRENT_BACKEND.reset(token)
 
 
 class TaskException(RuntimeError):
@@ -16,20 +46,90 @@ class TaskException(RuntimeError):
 
 class Backend(abc.ABC):
     @abc.abstractmethod
-    def _run(self, work: TaskTree, force_tasks=None) -> Any:
+    def _run(self, work: TaskTree, force_tasks=None, submission=None) -> Any:
+        """Compute a task tree. If `submission` is not `None`, backends report the
+        result of every task to it with `submission._set_task_result` as soon as it is
+        computed."""
         raise NotImplemented("Backend must implement _run.")
 
     def run(
         self, work: TaskTree, force_tasks: Optional[set[Type[AbstractTask]]] = None
     ) -> Any:
-        """Execute a :class:`Task` by resolving all its requirements."""
-        global AQ_CURRENT_BACKEND
-        AQ_CURRENT_BACKEND = self
+        """Execute a :class:`Task` by resolving all its requirements.
+
+        Artifact probes are cached for the duration of the run. See
+        :func:`aqueduct.artifact.artifact_cache`. So are the hashes of large task
+        arguments, see :func:`aqueduct.task.hashing.hash_memo`."""
+        return self._run_in_context(work, force_tasks)
+
+    def submit(
+        self,
+        work: TaskTree,
+        force_tasks: Optional[set[Type[AbstractTask]]] = None,
+        watch: Optional[TaskTree] = None,
+    ) -> Submission:
+        """Start computing a task tree in the background and return immediately.
+
+        Returns:
+            A :class:`Submission`, which holds a future of the result of the tree, and
+            futures of the results of the individual tasks of the tree. See
+            :class:`Submission` for the meaning of `watch`."""
+        submission = Submission(work, watch)
+
+        def run_submission():
+            try:
+                result = self._run_in_context(work, force_tasks, submission)
+            except BaseException as e:
+                submission._set_exception(e)
+            else:
+                submission._set_result(result)
+
+        # The run sees the configuration of the context that submitted it.
+        thread = threading.Thread(
+            target=bind_context(run_submission),
+            name="aqueduct_submission",
+            daemon=True,
+        )
+        thread.start()
+
+        return submission
 
-        result = self._run(work, force_tasks=force_tasks)
-        AQ_CURRENT_BACKEND = None
+    async def run_async(
+        self, work: TaskTree, force_tasks: Optional[set[Type[AbstractTask]]] = None
+    ) -> Any:
+        """Compute a task tree without blocking the running event loop."""
+        return await self.submit(work, force_tasks=force_tasks)
+
+    def _run_in_context(
+        self,
+        work: TaskTree,
+        force_tasks: Optional[set[Type[AbstractTask]]] = None,
+        submission: Optional[Submission] = None,
+    ) -> Any:
+        # Backends written before submissions existed don't take a `submission`.
+        options = {} if submission is None else {"submission": submission}
+
+        with current_backend(self), artifact_cache(), hash_memo():
+            result = self._run(work, force_tasks=force_tasks, **options)
+
+        log_hashing_report()
         return result
 
+    def _plan(
+        self, work: TaskTree, force_tasks: Optional[set[Type[AbstractTask]]] = None
+    ) -> PlanningStatistics:
+        """Probe the artifacts of the whole tree in bulk before it is expanded for
+        execution, so that expansion reads the answers from the artifact cache."""
+        statistics = prefetch_artifact_probes(work, force_tasks=force_tasks)
+
+        if statistics.n_artifacts > 0:
+            _logger.info(
+                f"Planning: probed {statistics.n_artifacts} artifacts of "
+                f"{statistics.n_tasks} tasks in {statistics.elapsed:.2f}s."
+            )
+
+        return statistics
+
     @abc.abstractmethod
     def _spec(self) -> "BackendSpec":
         raise NotImplementedError("Backend must implement BackendSpec")
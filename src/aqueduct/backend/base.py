@@ -1,8 +1,25 @@
+from typing import Any
+
 
 class TaskError(RuntimeError):
     pass
 
 
+_TRUE_STRINGS = {"true", "yes", "on", "1"}
+_FALSE_STRINGS = {"false", "no", "off", "0", ""}
 
 
+def parse_bool_option(value: Any) -> bool:
+    """Read a boolean option of a backend spec. Spec values may be strings, for
+    instance when they come from environment variables, and `bool("false")` is
+    `True`."""
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in _TRUE_STRINGS:
+            return True
+        elif lowered in _FALSE_STRINGS:
+            return False
+        else:
+            raise ValueError(f"Could not parse {value!r} as a boolean.")
 
+    return bool(value)
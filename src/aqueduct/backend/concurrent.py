@@ -1,15 +1,42 @@
-from concurrent.futures import Executor, Future, ProcessPoolExecutor, wait
-from typing import Optional, TypeVar, Any, Literal, TypedDict
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Literal,
+    Mapping,
+    Optional,
+    Type,
+    TypeVar,
+    TypedDict,
+)
 
 import cloudpickle
+import dataclasses
+import functools
+import logging
+import queue
 
+from ..artifact import InMemoryArtifact, resolve_artifact_from_spec
+from ..artifact.util import flatten_artifact
+from ..config import get_config, set_config
 from ..task import AbstractTask
-from ..util import TypeTree
-from ..task_tree import _map_type_in_tree, _resolve_task_tree
+from ..task_tree import (
+    TaskGraph,
+    TaskNode,
+    TaskTree,
+    _is_forced,
+    _map_tasks_in_tree,
+    build_task_graph,
+    gather_tasks_in_tree,
+)
 from .backend import Backend
+from .immediate import ImmediateBackend
+from .submission import Submission
 
 T = TypeVar("T")
 
+_logger = logging.getLogger(__name__)
+
 
 def undill_and_run(serialized_fn, *args, **kwargs):
     fn = cloudpickle.loads(serialized_fn)
@@ -20,46 +47,263 @@ def undill_and_run(serialized_fn, *args, **kwargs):
         raise
 
 
-def task_to_future_resolve(task: AbstractTask[T], executor: Executor) -> Future[T]:
-    def map_task_to_future(
-        task: AbstractTask[T], requirements: Optional[TypeTree[Future]] = None
-    ) -> Future[T]:
-        if requirements is not None:
-            requirement_futures = []
+@dataclasses.dataclass
+class ArtifactReference:
+    """Stands for the result of a task that can be loaded from its artifact. Workers
+    return it instead of the result, so that the result is not sent back to the parent
+    process only to be sent to another worker.
 
-            def acc_reqs(f: Future) -> Future:
-                requirement_futures.append(f)
-                return f
+    Attributes:
+        serialized_task: The task whose result is referenced, serialized with
+            `cloudpickle`."""
 
-            def future_to_value(f: Future[T]) -> T:
-                return f.result()
+    serialized_task: bytes
 
-            _map_type_in_tree(requirements, Future, acc_reqs)
+    def load(self) -> Any:
+        return cloudpickle.loads(self.serialized_task).load()
 
-            wait(requirement_futures)
 
-            mapped_requirements = _map_type_in_tree(
-                requirements, Future, future_to_value
-            )
+def is_reloadable(task: AbstractTask) -> bool:
+    """Whether the result of a task can be loaded from its artifact, from any
+    process."""
+    artifact = resolve_artifact_from_spec(task.artifact())
+    leaves = flatten_artifact(artifact)
 
-            return executor.submit(
-                undill_and_run, cloudpickle.dumps(task), mapped_requirements
-            )
+    return (
+        task.AQ_AUTOLOAD
+        and len(leaves) > 0
+        and not any(isinstance(a, InMemoryArtifact) for a in leaves)
+        and artifact.exists()
+    )
+
+
+def map_requirements(
+    requirements: TaskTree, results: Mapping[str, Any], load_references=False
+) -> Any:
+    """Replace the tasks of a requirements tree by their results.
+
+    Arguments:
+        requirements: The requirements tree of a task.
+        results: The results of the required tasks, by key.
+        load_references: Load the results that are :class:`ArtifactReference`."""
+    if requirements is None:
+        return None
+
+    def lookup_result(task: AbstractTask) -> Any:
+        result = results[task._unique_key()]
+
+        if load_references and isinstance(result, ArtifactReference):
+            return result.load()
         else:
-            return executor.submit(undill_and_run, cloudpickle.dumps(task))
+            return result
+
+    return _map_tasks_in_tree(requirements, lookup_result)
+
+
+def execute_serialized_task(
+    serialized_task: bytes,
+    serialized_requirements: Optional[bytes] = None,
+    results: Optional[Mapping[str, Any]] = None,
+    force_tasks: Optional[set[Type[AbstractTask]]] = None,
+    return_reference: bool = False,
+) -> Any:
+    """Check the artifact of a task, then load or run it, and save its result. Runs in
+    the workers.
+
+    Arguments:
+        serialized_task: The task, serialized with `cloudpickle`.
+        serialized_requirements: The requirements tree of the task, serialized with
+            `cloudpickle`, or `None` if the task was not expanded.
+        results: The results of the required tasks, by key. Some of them can be
+            :class:`ArtifactReference`, which are loaded before running the task.
+        force_tasks: Run these task classes even if their artifact exists.
+        return_reference: Return an :class:`ArtifactReference` instead of the result,
+            if the result can be loaded from the artifact of the task."""
+    task: AbstractTask = cloudpickle.loads(serialized_task)
+
+    if serialized_requirements is None:
+        mapped_requirements = None
+    else:
+        mapped_requirements = map_requirements(
+            cloudpickle.loads(serialized_requirements),
+            results or {},
+            load_references=True,
+        )
+
+    result = ImmediateBackend().check_artifact_and_execute(
+        task, mapped_requirements, force_tasks=force_tasks or set()
+    )
+
+    if return_reference and is_reloadable(task):
+        return ArtifactReference(serialized_task)
+    else:
+        return result
+
+
+def schedule_task_graph(
+    graph: TaskGraph,
+    submit: Callable[[TaskNode, Mapping[str, Any]], Future],
+    keep: Optional[set[str]] = None,
+    on_result: Optional[Callable[[TaskNode, Any], None]] = None,
+) -> dict[str, Any]:
+    """Compute every task of a graph, submitting each task as soon as all its
+    requirements are computed.
+
+    Completion callbacks notify the scheduling loop, which runs in the calling thread
+    and is the only place where tasks are submitted. Independent subtrees are
+    therefore computed in parallel, regardless of the order in which they appear in
+    the graph.
+
+    Arguments:
+        graph: The graph to compute.
+        submit: Called as `submit(node, results)` to start the computation of a task.
+            `results` holds the results of at least all the dependencies of the node,
+            by key. See :func:`map_requirements`.
+        keep: Keys of the tasks whose results are returned. The results of the other
+            tasks are dropped as soon as all the tasks that require them are
+            submitted. Defaults to all the tasks.
+        on_result: Called as `on_result(node, result)` in the calling thread as soon as
+            a task is computed.
+
+    Returns:
+        The results of the tasks in `keep`, by key."""
+    dependents: dict[str, list[str]] = {key: [] for key in graph}
+    n_waiting_on: dict[str, int] = {}
+    for key, node in graph.items():
+        n_waiting_on[key] = len(node.dependencies)
+        for dependency in node.dependencies:
+            dependents[dependency].append(key)
+
+    n_consumers_left = {key: len(dependents[key]) for key in graph}
+
+    results: dict[str, Any] = {}
+    completed: queue.SimpleQueue[tuple[str, Future]] = queue.SimpleQueue()
+    running: dict[str, Future] = {}
+
+    def start(key: str, node: TaskNode):
+        future = submit(node, results)
+        running[key] = future
+        future.add_done_callback(functools.partial(_notify, completed, key))
 
-    return _resolve_task_tree(task, map_task_to_future)
+        # Drop the results that no other task is going to need.
+        for dependency in node.dependencies:
+            n_consumers_left[dependency] -= 1
+            if n_consumers_left[dependency] == 0 and (
+                keep is not None and dependency not in keep
+            ):
+                del results[dependency]
+
+    try:
+        for key, node in graph.items():
+            if n_waiting_on[key] == 0:
+                start(key, node)
+
+        n_left = len(graph)
+        while n_left > 0:
+            key, future = completed.get()
+            del running[key]
+            n_left -= 1
+
+            # Raises the exception of the task, if there was one.
+            results[key] = future.result()
+
+            if on_result is not None:
+                on_result(graph[key], results[key])
+
+            for dependent in dependents[key]:
+                n_waiting_on[dependent] -= 1
+                if n_waiting_on[dependent] == 0:
+                    start(dependent, graph[dependent])
+    finally:
+        for future in running.values():
+            future.cancel()
+
+    return results
+
+
+def _notify(completed: queue.SimpleQueue, key: str, future: Future):
+    completed.put((key, future))
 
 
 class ConcurrentBackend(Backend):
+    """Execute tasks in a pool of processes, using `concurrent.futures`. Every task is
+    submitted to the pool as soon as its requirements are computed.
+
+    Workers check artifacts, load or run tasks and save their results, like the
+    :class:`ImmediateBackend` does. Results that downstream tasks can load from an
+    artifact are not sent back to the main process."""
+
     def __init__(self, n_workers=1):
         self.n_workers = n_workers
 
-    def _run(self, task: AbstractTask[T]) -> T:
-        with ProcessPoolExecutor(max_workers=self.n_workers) as executor:
-            future = task_to_future_resolve(task, executor)
+    def _run(
+        self,
+        work: TaskTree,
+        force_tasks: Optional[set[Type[AbstractTask]]] = None,
+        submission: Optional[Submission] = None,
+    ) -> Any:
+        self._plan(work, force_tasks=force_tasks)
+        graph = build_task_graph(work, force_tasks=force_tasks)
+        _logger.info(f"Task graph has {len(graph)} unique tasks.")
+
+        root_keys = set(t._unique_key() for t in gather_tasks_in_tree(work))
+
+        def on_result(node: TaskNode, result: Any):
+            if submission is not None and submission.wants(node.task):
+                if isinstance(result, ArtifactReference):
+                    result = result.load()
+                submission._set_task_result(node.task, result)
+
+        with ProcessPoolExecutor(
+            max_workers=self.n_workers, initializer=set_config, initargs=(get_config(),)
+        ) as executor:
+
+            def submit(node: TaskNode, results: Mapping[str, Any]) -> Future:
+                return self._submit(executor, node, results, force_tasks, root_keys)
+
+            results = schedule_task_graph(
+                graph, submit, keep=root_keys, on_result=on_result
+            )
+
+        return _map_tasks_in_tree(work, lambda t: results[t._unique_key()])
+
+    def _submit(
+        self,
+        executor: Executor,
+        node: TaskNode,
+        results: Mapping[str, Any],
+        force_tasks: Optional[set[Type[AbstractTask]]],
+        root_keys: set[str],
+    ) -> Future:
+        task = node.task
+        return_reference = task._unique_key() not in root_keys
+        force_run = getattr(task, "_aq_force_root", False) or _is_forced(
+            task, force_tasks
+        )
+
+        # Downstream tasks can load the result of a cached task themselves, there is
+        # no need to involve a worker.
+        if return_reference and not force_run and is_reloadable(task):
+            future: Future = Future()
+            future.set_result(ArtifactReference(cloudpickle.dumps(task)))
+            return future
+
+        # Only send the results of the dependencies of the task.
+        requirement_results = {key: results[key] for key in node.dependencies}
+
+        if node.requirements is None:
+            serialized_requirements = None
+        else:
+            serialized_requirements = cloudpickle.dumps(node.requirements)
 
-            return future.result()
+        return executor.submit(
+            execute_serialized_task,
+            cloudpickle.dumps(task),
+            serialized_requirements,
+            requirement_results,
+            force_tasks,
+            return_reference,
+        )
 
     def _spec(self):
         return self
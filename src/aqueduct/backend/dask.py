@@ -1,7 +1,15 @@
 import functools
+import hashlib
+import itertools
+import math
+import uuid
 from typing import (
+    TYPE_CHECKING,
     Any,
     Callable,
+    Iterable,
+    Iterator,
+    Sized,
     Type,
     cast,
     Optional,
@@ -12,23 +20,41 @@ from typing import (
 )
 
 import logging
+import threading
+import time
 import omegaconf as oc
 
-import aqueduct.backend.backend
-from dask.optimization import fuse, inline_functions
-from dask.distributed import Client, LocalCluster
+from aqueduct.artifact import Artifact
 from aqueduct.artifact.base import resolve_artifact_from_spec
 
+from aqueduct.backend.backend import current_backend
+from aqueduct.backend.base import parse_bool_option
 from aqueduct.backend.immediate import ImmediateBackend
+from aqueduct.backend.submission import Submission
+from aqueduct.backend.dask_result_cache import DaskResultCache, resident_key
+from aqueduct.backend.dask_cluster import resolve_local_cluster_address
+from aqueduct.backend.map_statistics import (
+    MapStatistics,
+    collect_map_statistics,
+    drain_recorded_map_times,
+    record_map_time,
+    task_class_name,
+)
 
-from ..config import set_config, get_config
+from ..config import get_config, use_config
 from ..task import AbstractTask
 from ..task.task import Task
 from ..task.mapreduce import AbstractMapReduceTask
 from ..task_tree import (
     TaskTree,
+    gather_tasks_in_tree,
+    _is_forced,
 )
 
+if TYPE_CHECKING:
+    from dask.distributed import Client, Future
+    from dask.highlevelgraph import HighLevelGraph
+
 _logger = logging.getLogger(__name__)
 
 DaskComputation: TypeAlias = Any  # Must be any because of literal types.
@@ -36,82 +62,684 @@ DaskGraph: TypeAlias = MutableMapping[Hashable, DaskComputation]
 
 DaskBackendDictSpec: TypeAlias = Mapping[str, int | str]
 
+DaskAnnotations: TypeAlias = dict[Hashable, dict[str, Any]]
+"""Dask annotations of the entries of a graph, by key."""
+
+AQ_DASK_CONFIGS: dict[str, oc.DictConfig] = {}
+"""Configurations that the tasks of Dask graphs refer to, by key. On workers, it is
+populated by :class:`aqueduct.backend.dask_plugin.ConfigPlugin`."""
+
+AQ_DASK_BACKENDS: dict[tuple, "DaskBackend"] = {}
+"""Backends resolved by the tasks of Dask graphs, by spec. See
+:func:`resolve_cached_dask_backend`."""
+_backends_lock = threading.Lock()
+
 
 class DaskBackend(ImmediateBackend):
     """Execute :class:`Task` on a Dask cluster.
 
     Arguments:
-        client (`dask.Client`): Client pointing to the desired Dask cluster."""
+        client (`dask.Client`): Client pointing to the desired Dask cluster.
+        chunk_size: Number of items of a map-reduce task that are mapped by the same
+            node of the graph.
+        n_partitions: Split the items of every map-reduce task into this many nodes of
+            the graph, whatever the number of items. Takes precedence over
+            `chunk_size`. The items are still embedded in these nodes, so the size of
+            the graph grows with the number of items. Items given by an iterator are
+            also copied into a list to be counted.
+        optimize_graph: Fuse linear chains and inline small functions of the graph
+            before it is computed. Disable it for very large graphs, where the
+            optimization can take longer than the computation.
+        fan_in: Number of partial accumulators combined by each node of the reduction
+            tree of map-reduce tasks.
+        incremental: Submit the graph to the scheduler every `incremental` tasks,
+            while the rest of the task tree is still being expanded, rather than
+            building the whole graph first. Workers start computing while the client
+            plans, and the client never holds the whole graph. The results of the
+            tasks are kept by the cluster until the tree is fully expanded.
+        result_cache: Keep the results of tasks in the memory of the cluster between
+            runs, up to this many bytes (an `int`, or a string such as `"4GB"`).
+            Later runs use the results that are still in the cache rather than
+            computing the tasks again, as long as the tasks are not forced. The
+            least recently used results are released first. Cached results keep
+            their own entry in the graph, which limits graph optimization.
+
+    Map-reduce task classes can override `chunk_size` and `fan_in` with their
+    `AQ_BATCH_SIZE` and `AQ_FAN_IN` attributes."""
+
+    def __init__(
+        self,
+        client: Optional["Client"] = None,
+        chunk_size: int = 1,
+        n_partitions: Optional[int] = None,
+        optimize_graph: bool = True,
+        fan_in: int = 2,
+        incremental: Optional[int] = None,
+        result_cache: int | str | None = None,
+    ):
+        if n_partitions is not None and n_partitions < 1:
+            raise ValueError("n_partitions must be at least 1.")
+        if fan_in < 2:
+            raise ValueError("Reduction trees need a fan-in of at least 2.")
+        if incremental is not None and incremental < 1:
+            raise ValueError("incremental must be at least 1.")
+
+        self.chunk_size = chunk_size
+        self.n_partitions = n_partitions
+        self.optimize_graph = optimize_graph
+        self.fan_in = fan_in
+        self.incremental = incremental
+        # The configuration of the latest run is installed on the workers by a plugin
+        # of this backend, which replaces the plugin of the previous configuration.
+        self._config_plugin_name = f"aqueduct-config-{uuid.uuid4().hex}"
+        self._installed_config_key: Optional[str] = None
 
-    def __init__(self, client: Optional[Client] = None):
         if client is None:
-            cluster = LocalCluster()
-            self.client = cluster.get_client()
+            from dask.distributed import LocalCluster
+
+            # The backend owns the cluster it starts, it is closed with the backend.
+            self._cluster = LocalCluster()
+            self.client = self._cluster.get_client()
         else:
+            self._cluster = None
             self.client = client
 
-    def _run(self, task: TaskTree, force_tasks: set[Type[AbstractTask]] = set()):
+        self.result_cache: Optional[DaskResultCache] = None
+        if result_cache is not None:
+            from dask.utils import parse_bytes
+
+            self.result_cache = DaskResultCache(self.client, parse_bytes(result_cache))
+
+    def _run(
+        self,
+        task: TaskTree,
+        force_tasks: Optional[set[Type[AbstractTask]]] = None,
+        submission: Optional[Submission] = None,
+    ):
+        self._plan(task, force_tasks=force_tasks)
+        self._install_config(get_config())
+
+        # Tasks that run in this process use this backend rather than connecting again.
+        AQ_DASK_BACKENDS.setdefault(_backend_spec_key(self._spec()), self)
+
+        tasks: dict[str, AbstractTask] = {}
+        try:
+            if self.incremental is None:
+                return self._run_graph(task, force_tasks, submission, tasks)
+            else:
+                return self._run_incremental(task, force_tasks, submission, tasks)
+        finally:
+            if any(
+                isinstance(t, AbstractMapReduceTask) and t.AQ_BATCH_SIZE == "auto"
+                for t in tasks.values()
+            ):
+                self._collect_map_statistics()
+
+    def _run_graph(
+        self,
+        task: TaskTree,
+        force_tasks: Optional[set[Type[AbstractTask]]],
+        submission: Optional[Submission],
+        tasks: dict[str, AbstractTask],
+    ) -> Any:
+        """Build the whole graph, then compute it."""
         _logger.info("Computing Dask graph...")
+        annotations: DaskAnnotations = {}
         computation, graph = add_work_to_dask_graph(
-            task, {}, self._spec(), ignore_cache=False, force_tasks=force_tasks
+            task,
+            {},
+            self._spec(),
+            ignore_cache=False,
+            force_tasks=force_tasks,
+            tasks=tasks,
+            annotations=annotations,
+            resident=self.result_cache,
         )
         _logger.info(f"Dask Graph has {len(graph)} unique tasks.")
 
-        _logger.info("Optimizing graph...")
-        optimized, dependencies = fuse(graph, keys=computation)
-        optimized = inline_functions(optimized, computation, [tuple])
-        _logger.info(f"Optimized graph has {len(optimized)} tasks.")
+        # The entries of the tasks watched by the submission must survive
+        # optimization, so that their results can be fetched.
+        watched: dict[str, AbstractTask] = {}
+        if submission is not None:
+            for key, t in tasks.items():
+                if submission.wants(t):
+                    watched[final_key_of_task(key, graph)] = t
+
+        # So must the entries whose results go into the result cache.
+        cached: dict[str, str] = {}
+        if self.result_cache is not None:
+            cached = {final_key_of_task(key, graph): key for key in tasks}
+
+        if self.optimize_graph:
+            optimized = optimize_dask_graph(
+                graph, computation, [*watched, *cached], annotations
+            )
+        else:
+            optimized = graph
+
+        return self._compute(
+            annotate_dask_graph(optimized, annotations),
+            computation,
+            watched,
+            submission,
+            cached,
+        )
+
+    def _run_incremental(
+        self,
+        work: TaskTree,
+        force_tasks: Optional[set[Type[AbstractTask]]],
+        submission: Optional[Submission],
+        tasks: dict[str, AbstractTask],
+    ) -> Any:
+        """Submit the graph in batches of `incremental` tasks, as it is expanded."""
+        graph = IncrementalDaskGraph(self.client, optimize=self.optimize_graph)
+        watched: dict[str, AbstractTask] = {}
+        cached: dict[str, str] = {}
+
+        def forward_results(futures: dict[Hashable, "Future"]):
+            if submission is None:
+                return
+
+            for key, future in futures.items():
+                if key in watched:
+                    future.add_done_callback(
+                        functools.partial(
+                            forward_result_to_submission, submission, watched[key]
+                        )
+                    )
+
+        def on_task_added(key: str):
+            final_key = final_key_of_task(key, graph)
+            graph.request(final_key)
+
+            if submission is not None and submission.wants(tasks[key]):
+                watched[final_key] = tasks[key]
+            if self.result_cache is not None:
+                cached[final_key] = key
+
+            if len(graph.requested) >= cast(int, self.incremental):
+                forward_results(graph.flush())
+
+        _logger.info("Submitting Dask graph incrementally...")
+        computation, graph = add_work_to_dask_graph(
+            work,
+            graph,
+            self._spec(),
+            ignore_cache=False,
+            force_tasks=force_tasks,
+            tasks=tasks,
+            annotations=graph.annotations,
+            resident=self.result_cache,
+            on_task_added=on_task_added,
+        )
+
+        result_key = f"aqueduct_result_{uuid.uuid4().hex}"
+        graph[result_key] = computation
+        graph.request(result_key)
+        forward_results(graph.flush())
+        _logger.info(
+            f"Dask Graph has {len(tasks)} unique tasks, submitted in "
+            f"{graph.n_batches} batches."
+        )
+
+        result_future = graph.futures[result_key]
+        watched_futures = {k: graph.futures[k] for k in watched}
+        cached_futures = {key: graph.futures[k] for k, key in cached.items()}
+
+        # The scheduler keeps the results that are still needed by other entries.
+        graph.release()
+
+        result = result_future.result()
+
+        # Callbacks may still be pending, the submission must be complete when the
+        # result of the tree is set.
+        if submission is not None:
+            for key, future in watched_futures.items():
+                submission._set_task_result(watched[key], future.result())
+
+        if self.result_cache is not None:
+            self.result_cache.update(cached_futures)
+
+        return result
+
+    def _compute(
+        self,
+        graph: "DaskGraph | HighLevelGraph",
+        computation: DaskComputation,
+        watched: dict[str, AbstractTask],
+        submission: Optional[Submission],
+        cached: dict[str, str],
+    ) -> Any:
+        """Compute a graph. The results of the `watched` entries are forwarded to the
+        submission, the results of the `cached` entries are put in the result cache,
+        by task key."""
+        fetched = list(dict.fromkeys([*watched, *cached]))
+        if not fetched:
+            return self.client.get(graph, computation)
+
+        futures = dict(zip(fetched, self.client.get(graph, fetched, sync=False)))
+        for key, t in watched.items():
+            futures[key].add_done_callback(
+                functools.partial(
+                    forward_result_to_submission, cast(Submission, submission), t
+                )
+            )
+
+        # The scheduler shares the entries of both computations.
+        result = self.client.get(graph, computation)
+
+        # Callbacks may still be pending, the submission must be complete when the
+        # result of the tree is set.
+        for key, t in watched.items():
+            cast(Submission, submission)._set_task_result(t, futures[key].result())
+
+        if self.result_cache is not None:
+            self.result_cache.update({cached[k]: futures[k] for k in cached})
+
+        return result
+
+    def _collect_map_statistics(self):
+        """Gather the time per item measured by the workers and persist it, to tune
+        the batch size of the next runs."""
+        try:
+            recorded = list(self.client.run(drain_recorded_map_times).values())
+        except Exception as e:
+            _logger.warning(f"Could not collect map statistics from workers: {e}")
+            recorded = []
 
-        return self.client.get(optimized, computation)
+        # Batches that ran in this process, for instance on an inline worker.
+        recorded.append(drain_recorded_map_times())
+        collect_map_statistics(recorded)
+
+    def _install_config(self, cfg: oc.DictConfig):
+        """Send a configuration to the workers, unless it was the last one sent."""
+        key = config_key(cfg, refresh=True)
+
+        if key != self._installed_config_key:
+            from .dask_plugin import ConfigPlugin
+
+            self.client.register_plugin(
+                ConfigPlugin(key, cfg), name=self._config_plugin_name
+            )
+            self._installed_config_key = key
 
     def _scheduler_address(self):
         return self.client.scheduler_info()["address"]
 
     def _spec(self) -> DaskBackendDictSpec:
         scheduler_address = cast(str, self._scheduler_address())
-        return {"type": "dask", "address": scheduler_address}
+        spec = {
+            "type": "dask",
+            "address": scheduler_address,
+            "chunk_size": self.chunk_size,
+        }
+        if self.n_partitions is not None:
+            spec["n_partitions"] = self.n_partitions
+        if not self.optimize_graph:
+            spec["optimize_graph"] = False
+        if self.fan_in != 2:
+            spec["fan_in"] = self.fan_in
+        if self.incremental is not None:
+            spec["incremental"] = self.incremental
+
+        return spec
 
     def __str__(self):
         return f"DaskBackend"
 
     def close(self):
+        if self.result_cache is not None:
+            self.result_cache.clear()
+
+        with _backends_lock:
+            for key, backend in list(AQ_DASK_BACKENDS.items()):
+                if backend is self:
+                    del AQ_DASK_BACKENDS[key]
+
+        if self._installed_config_key is not None:
+            try:
+                self.client.unregister_worker_plugin(self._config_plugin_name)
+            except Exception as e:
+                _logger.warning(f"Could not remove the configuration plugin: {e}")
+
         self.client.close()
 
+        if self._cluster is not None:
+            self._cluster.close()
+
+
+def optimize_dask_graph(
+    graph: DaskGraph,
+    computation: DaskComputation,
+    keep: list[str],
+    annotations: Optional[DaskAnnotations] = None,
+) -> DaskGraph:
+    """Fuse linear chains of the graph and inline small functions. The entries of
+    `computation` and `keep` are preserved.
+
+    Annotated entries, and their dependencies, are preserved too, so that no entry is
+    fused into another one with different annotations."""
+    _logger.info("Optimizing graph...")
+    from dask.core import flatten, get_dependencies
+    from dask.optimization import fuse, inline_functions
+
+    output_keys = list(flatten(computation)) + keep
+    for key in annotations or {}:
+        output_keys.append(key)
+        output_keys.extend(get_dependencies(graph, key))
+
+    optimized, dependencies = fuse(graph, keys=output_keys)
+    optimized = inline_functions(optimized, output_keys, [tuple])
+    _logger.info(f"Optimized graph has {len(optimized)} tasks.")
+
+    return optimized
+
+
+class IncrementalDaskGraph(MutableMapping[Hashable, DaskComputation]):
+    """Dask graph whose entries are submitted to the scheduler in batches, while the
+    rest of the graph is being built. See :meth:`DaskBackend._run_incremental`.
+
+    Entries are pending until :meth:`flush` submits them. Only the futures of the
+    requested keys are kept: entries of later batches refer to entries of previous
+    batches through these futures, so every entry that is referred to by a later
+    batch must be requested. Membership tests cover both pending and submitted
+    entries, iteration and lookups only the pending ones."""
+
+    def __init__(self, client: "Client", optimize: bool = True):
+        self.client = client
+        self.optimize = optimize
+        self.pending: DaskGraph = {}
+        self.requested: list[Hashable] = []
+        self.submitted: set[Hashable] = set()
+        self.futures: dict[Hashable, "Future"] = {}
+        self.annotations: DaskAnnotations = {}
+        self.n_batches = 0
+
+    def __getitem__(self, key: Hashable) -> DaskComputation:
+        return self.pending[key]
+
+    def __setitem__(self, key: Hashable, value: DaskComputation):
+        if key in self.submitted:
+            raise KeyError(f"Entry {key} was already submitted.")
+
+        self.pending[key] = value
+
+    def __delitem__(self, key: Hashable):
+        del self.pending[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.pending or key in self.submitted
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self.pending)
+
+    def __reversed__(self) -> Iterator[Hashable]:
+        return reversed(self.pending)
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def request(self, key: Hashable):
+        """Keep the future of an entry when it is submitted."""
+        self.requested.append(key)
+
+    def flush(self) -> dict[Hashable, "Future"]:
+        """Submit the pending entries.
+
+        Returns:
+            The futures of the requested entries of the batch."""
+        from dask.core import keys_in_tasks
+
+        if not self.pending:
+            return {}
+
+        if self.optimize:
+            graph = optimize_dask_graph(
+                self.pending, [], self.requested, self.annotations
+            )
+        else:
+            graph = dict(self.pending)
+
+        # Entries of previous batches are referred to through their futures.
+        for key in keys_in_tasks(self.futures.keys(), graph.values()):
+            graph[key] = self.futures[key]
+
+        annotated = annotate_dask_graph(graph, self.annotations)
+        futures = dict(
+            zip(
+                self.requested,
+                self.client.get(annotated, self.requested, sync=False),
+            )
+        )
+        _logger.debug(f"Submitted batch of {len(self.pending)} graph entries.")
+
+        self.futures.update(futures)
+        self.submitted.update(self.pending)
+        self.pending = {}
+        self.requested = []
+        self.annotations = {}
+        self.n_batches += 1
+
+        return futures
+
+    def release(self):
+        """Drop the futures of the submitted entries, once no entry will refer to
+        them anymore, so that the cluster can forget their results."""
+        self.futures = {}
+
+
+def dask_annotations_of_task(task: AbstractTask) -> dict[str, Any]:
+    """Dask annotations of the entries of a task, from the `AQ_PRIORITY`,
+    `AQ_RETRIES`, `AQ_RESOURCES` and `AQ_WORKERS` attributes of its class."""
+    annotations: dict[str, Any] = {}
+
+    if task.AQ_PRIORITY is not None:
+        annotations["priority"] = task.AQ_PRIORITY
+    if task.AQ_RETRIES is not None:
+        annotations["retries"] = task.AQ_RETRIES
+    if task.AQ_RESOURCES is not None:
+        annotations["resources"] = dict(task.AQ_RESOURCES)
+    if task.AQ_WORKERS is not None:
+        annotations["workers"] = list(task.AQ_WORKERS)
+
+    return annotations
+
+
+def annotate_dask_graph(
+    graph: DaskGraph, annotations: DaskAnnotations
+) -> "DaskGraph | HighLevelGraph":
+    """Split a graph into layers of entries that share the same annotations, so that
+    the scheduler applies them. The graph is returned as is if nothing is
+    annotated."""
+    if not annotations:
+        return graph
+
+    from dask.highlevelgraph import HighLevelGraph, MaterializedLayer
+
+    entries_of_layer: dict[str, DaskGraph] = {"aqueduct": {}}
+    annotations_of_layer: dict[str, dict[str, Any]] = {}
+    layer_of_annotations: dict[str, str] = {}
+
+    for key, entry in graph.items():
+        key_annotations = annotations.get(key)
+
+        if key_annotations is None:
+            layer = "aqueduct"
+        else:
+            identity = repr(sorted(key_annotations.items()))
+            layer = layer_of_annotations.setdefault(
+                identity, f"aqueduct-annotated-{len(layer_of_annotations)}"
+            )
+            annotations_of_layer[layer] = key_annotations
+
+        entries_of_layer.setdefault(layer, {})[key] = entry
+
+    layers = {
+        name: MaterializedLayer(entries, annotations=annotations_of_layer.get(name))
+        for name, entries in entries_of_layer.items()
+    }
+
+    # Layers are only used to carry annotations, dependencies are between entries.
+    return HighLevelGraph(layers, {name: set() for name in layers})
+
+
+def forward_result_to_submission(submission: Submission, task: AbstractTask, future):
+    if future.status == "finished":
+        submission._set_task_result(task, future.result())
+
+
+_key_of_config: tuple[Any, str] = (None, "")
+
+
+def config_key(cfg: oc.DictConfig, refresh: bool = False) -> str:
+    """Key that identifies a configuration in Dask graphs, computed from its content.
+    The configuration is installed under that key in the current process.
+
+    The key is only computed again when another configuration object is in use, or if
+    `refresh` is `True`. :class:`DaskBackend` refreshes it at the start of every run,
+    so that edits made in place between runs reach the workers. Edits made during a
+    run do not."""
+    global _key_of_config
+
+    cached_cfg, key = _key_of_config
+    if refresh or cached_cfg is not cfg:
+        content = oc.OmegaConf.to_yaml(cfg).encode()
+        key = hashlib.blake2b(content, digest_size=16).hexdigest()
+
+        install_config(key, cfg)
+        _key_of_config = (cfg, key)
+
+    return key
+
+
+def install_config(key: str, cfg: oc.DictConfig):
+    AQ_DASK_CONFIGS[key] = cfg
+
+
+_plugins_of_config: dict[str, int] = {}
+"""Number of plugins that installed each configuration in the current process."""
+
+
+def retain_config(key: str, cfg: oc.DictConfig):
+    """Install a configuration on behalf of a plugin. See :func:`release_config`."""
+    _plugins_of_config[key] = _plugins_of_config.get(key, 0) + 1
+    install_config(key, cfg)
+
+
+def release_config(key: str):
+    """Drop a configuration once no plugin needs it anymore, unless it is the
+    configuration of the current process."""
+    n_plugins = _plugins_of_config.pop(key, 0) - 1
+    if n_plugins > 0:
+        _plugins_of_config[key] = n_plugins
+    elif key != _key_of_config[1]:
+        AQ_DASK_CONFIGS.pop(key, None)
+
 
 def wrap_in_context(
-    cfg: oc.DictConfig,
+    cfg_key: str,
     backend_spec,
     fn: Callable,
     *args,
     **kwargs,
 ):
     """When executing a function on remote, make sure to set up the aqueduct context
-    before."""
-    aqueduct.backend.backend.AQ_CURRENT_BACKEND = resolve_dask_backend_dict_spec(
-        backend_spec
-    )
-    set_config(cfg)
-    return fn(*args, **kwargs)
+    before. The context is scoped to the call, so that tasks of other pipelines that
+    run in the same worker are not affected.
+
+    The configuration is looked up by key, see :func:`config_key`."""
+    cfg = AQ_DASK_CONFIGS.get(cfg_key)
+    if cfg is None:
+        raise RuntimeError(f"Configuration {cfg_key} is not installed on this worker.")
+
+    backend = resolve_cached_dask_backend(backend_spec)
+
+    with use_config(cfg), current_backend(backend):
+        return fn(*args, **kwargs)
 
 
 def build_dask_task(
     cfg: oc.DictConfig, backend_spec: DaskBackendDictSpec, fn: Callable, *args
 ) -> tuple:
-    """Utility function so that we can have type hints when building dask task tuples."""
-    return (wrap_in_context, cfg, backend_spec, fn, *args)
+    """Utility function so that we can have type hints when building dask task tuples.
+
+    The task refers to the configuration by key, rather than embedding it, so that the
+    configuration is not serialized with every task of the graph."""
+    return (wrap_in_context, config_key(cfg), backend_spec, fn, *args)
 
 
 def resolve_dask_backend_dict_spec(
     spec: DaskBackendDictSpec,
 ) -> DaskBackend:
     client = resolve_client_from_dict_spec(spec)
-    return DaskBackend(client)
+    return DaskBackend(client, **dask_backend_options(spec))
+
+
+def dask_backend_options(spec: DaskBackendDictSpec) -> dict[str, Any]:
+    """Arguments of :class:`DaskBackend`, other than the client, from a spec."""
+    n_partitions = spec.get("n_partitions")
+    incremental = spec.get("incremental")
+    return {
+        "chunk_size": int(spec.get("chunk_size", 1)),
+        "n_partitions": int(n_partitions) if n_partitions is not None else None,
+        "optimize_graph": parse_bool_option(spec.get("optimize_graph", True)),
+        "fan_in": int(spec.get("fan_in", 2)),
+        "incremental": int(incremental) if incremental is not None else None,
+    }
+
+
+def _backend_spec_key(spec: DaskBackendDictSpec) -> tuple:
+    return tuple(sorted(spec.items()))
+
+
+def resolve_cached_dask_backend(spec: DaskBackendDictSpec) -> DaskBackend:
+    """Resolve a backend spec once per process. On the workers of the cluster the spec
+    points to, the backend uses the client of the worker, so no connection is made."""
+    key = _backend_spec_key(spec)
+
+    backend = AQ_DASK_BACKENDS.get(key)
+    if backend is None:
+        with _backends_lock:
+            backend = AQ_DASK_BACKENDS.get(key)
+
+            if backend is None:
+                client = resolve_worker_client(spec)
+                backend = DaskBackend(client, **dask_backend_options(spec))
+                AQ_DASK_BACKENDS[key] = backend
+
+    return backend
+
+
+def resolve_worker_client(spec: DaskBackendDictSpec):
+    """Client for a backend spec, that reuses the client of the current worker or the
+    current client when they are connected to the scheduler of the spec."""
+    match spec:
+        case {"type": "dask", "address": str(address)}:
+            from dask.distributed import get_client
+
+            return get_client(address)
+        case _:
+            return resolve_client_from_dict_spec(spec)
 
 
 def resolve_client_from_dict_spec(spec: DaskBackendDictSpec):
+    """Client for a backend spec. With `"cluster": "local"`, the client connects to
+    the local cluster shared by the processes of the machine, which is started with
+    `n_workers` workers if it is not running, see :mod:`aqueduct.backend.dask_cluster`.
+    """
+    from dask.distributed import Client, LocalCluster
+
     match spec:
         case {"type": "dask", "address": str(address)}:
             return Client(address)
+        case {"type": "dask", "cluster": "local"}:
+            n_workers = spec.get("n_workers")
+            return Client(
+                resolve_local_cluster_address(
+                    int(n_workers) if n_workers is not None else None
+                )
+            )
         case {"type": "dask", "n_workers": int(n_workers)}:
             return Client(LocalCluster(processes=n_workers))
         case _:
@@ -128,101 +756,210 @@ def add_task_to_dask_graph(
     graph: DaskGraph,
     backend_spec: DaskBackendDictSpec,
     ignore_cache: bool = False,
-    force_tasks: set[Type[AbstractTask]] = set(),
+    force_tasks: Optional[set[Type[AbstractTask]]] = None,
 ) -> tuple[str, DaskGraph]:
-    # Check if task is already in graph.
-    task_key = task._unique_key()
-    if task_key in graph:
-        return task_key, graph
+    """Add a task and all its requirements to the graph."""
+    return add_work_to_dask_graph(
+        task, graph, backend_spec, ignore_cache=ignore_cache, force_tasks=force_tasks
+    )
+
+
+def final_key_of_task(task_key: str, graph: DaskGraph) -> str:
+    """Key of the graph entry that holds the result of a task that was added to the
+    graph. If the result is saved, it is the key of the saving step. If the result was
+    in the result cache, it is the key of the cached result."""
+    save_key = task_key + "_save_and_return"
+    if save_key in graph:
+        return save_key
+
+    cached_key = resident_key(task_key)
+    return cached_key if cached_key in graph else task_key
 
-    # Prepare context.
-    current_cfg = get_config()
 
-    # Check if the artifact exists and computation is needed.
-    artifact_spec = task.artifact()
-    is_force_task = any([issubclass(task.__class__, x) for x in force_tasks])
+def task_in_graph(task_key: str, graph: DaskGraph) -> bool:
+    return task_key in graph or resident_key(task_key) in graph
+
+
+def expand_task_for_dask_graph(
+    task: AbstractTask,
+    ignore_cache: bool = False,
+    force_tasks: Optional[set[Type[AbstractTask]]] = None,
+) -> tuple[Optional[Artifact], bool, TaskTree]:
+    """Decide how a task will be computed in the graph.
+
+    Returns:
+        The artifact of the task, whether the task is loaded from that artifact, and
+        the requirements that must be computed before the task. If the task is
+        loaded, it has no requirements."""
+    artifact = resolve_artifact_from_spec(task.artifact())
+
+    is_force_task = _is_forced(task, force_tasks)
     force_run = getattr(task, "_aq_force_root", False) or is_force_task
 
-    artifact = resolve_artifact_from_spec(artifact_spec)
     if (
         artifact is not None
         and artifact.exists()
         and not force_run
         and task.AQ_AUTOLOAD
     ):
+        return artifact, True, None
+    else:
+        requirements = task._resolve_requirements(
+            ignore_cache=ignore_cache or force_run
+        )
+        return artifact, False, requirements
+
+
+def add_expanded_task_to_dask_graph(
+    task: AbstractTask,
+    artifact: Optional[Artifact],
+    load: bool,
+    requirements: TaskTree,
+    graph: DaskGraph,
+    backend_spec: DaskBackendDictSpec,
+    statistics: Optional[MapStatistics] = None,
+) -> str:
+    """Add the entries that compute one task to the graph. Its requirements must
+    already be in the graph.
+
+    Returns:
+        The key of the entry that holds the result of the task."""
+    task_key = task._unique_key()
+    current_cfg = get_config()
+
+    if load:
         # The task was in cache, we can just load it.
         _logger.info(f"Loading result of {task} from {artifact}")
         graph[task_key] = build_dask_task(current_cfg, backend_spec, task.load)
-        final_key = task_key
+        return task_key
 
+    if requirements is None:
+        requirements_computation = None
     else:
-        # We need to execute the task.
-        if isinstance(task, Task):
-            task_key, graph = add_single_task_to_dask_graph(
-                task, graph, backend_spec, ignore_cache=force_run
-            )
-        elif isinstance(task, AbstractMapReduceTask):
-            task_key, graph = add_parallel_task_to_dask_graph(
-                task, graph, backend_spec, ignore_cache=force_run
-            )
-        else:
-            raise RuntimeError("Unhandled type when adding task to dask graph.")
-
-        if artifact is not None and task.AQ_AUTOSAVE:
-            # Put a new task in front of the original, which saves the result before returning it.
-            final_key = task_key + "_save_and_return"
-            graph[final_key] = build_dask_task(
-                current_cfg,
-                backend_spec,
-                functools.partial(save_and_return, task),
-                task_key,
-            )
-        else:
-            final_key = task_key
+        requirements_computation = work_to_dask_computation(requirements, graph)
 
-    return final_key, graph
+    # We need to execute the task.
+    if isinstance(task, Task):
+        task_key, graph = add_single_task_to_dask_graph(
+            task, graph, backend_spec, requirements_computation
+        )
+    elif isinstance(task, AbstractMapReduceTask):
+        task_key, graph = add_parallel_task_to_dask_graph(
+            task, graph, backend_spec, requirements_computation, statistics
+        )
+    else:
+        raise RuntimeError("Unhandled type when adding task to dask graph.")
 
+    if artifact is not None and task.AQ_AUTOSAVE:
+        # Put a new task in front of the original, which saves the result before returning it.
+        final_key = task_key + "_save_and_return"
+        graph[final_key] = build_dask_task(
+            current_cfg,
+            backend_spec,
+            functools.partial(save_and_return, task),
+            task_key,
+        )
+    else:
+        final_key = task_key
 
-def add_single_task_to_dask_graph(task: Task, graph, backend_spec, ignore_cache=False):
-    task_key = task._unique_key()
+    return final_key
 
-    requirements = task._resolve_requirements(ignore_cache=ignore_cache)
+
+def add_single_task_to_dask_graph(
+    task: Task, graph, backend_spec, requirements_computation=None
+):
+    task_key = task._unique_key()
 
     current_cfg = get_config()
 
-    if requirements is None:
+    if requirements_computation is None:
         graph[task_key] = build_dask_task(
             current_cfg,
             backend_spec,
             task,
         )
     else:
-        computation, graph = add_work_to_dask_graph(
-            requirements, graph, backend_spec, ignore_cache=ignore_cache
+        graph[task_key] = build_dask_task(
+            current_cfg, backend_spec, task, requirements_computation
         )
-        graph[task_key] = build_dask_task(current_cfg, backend_spec, task, computation)
 
     return task_key, graph
 
 
-def add_parallel_task_to_dask_graph(
-    parallel_task: AbstractMapReduceTask, graph, backend_spec, ignore_cache=False
-):
-    """Expand all the work in a parallel task and add it to the graph."""
-    # Resolve requirements.
-    requirements = parallel_task._resolve_requirements(ignore_cache=ignore_cache)
-    if requirements is not None:
-        requirements_key, graph = add_work_to_dask_graph(
-            requirements, graph, backend_spec, ignore_cache=ignore_cache
-        )
+def map_reduce_chunk(
+    task: AbstractMapReduceTask, chunk: list, children: list, requirements
+) -> Any:
+    """Compute a node of the reduction tree of a map-reduce task: combine the
+    accumulators of the children of the node, then map and reduce its items."""
+    acc = children[0]
+    for child in children[1:]:
+        acc = task.reduce(child, acc, requirements)
+
+    start = time.perf_counter()
+    for item in chunk:
+        acc = task.reduce(task.map(item, requirements), acc, requirements)
+
+    if task.AQ_BATCH_SIZE == "auto" and chunk:
+        elapsed = time.perf_counter() - start
+        record_map_time(task_class_name(type(task)), len(chunk), elapsed)
+
+    return acc
+
+
+def resolve_batch_size(
+    task: AbstractMapReduceTask,
+    backend_spec: DaskBackendDictSpec,
+    statistics: Optional[MapStatistics] = None,
+) -> int:
+    """Number of items of a task that are mapped by each node of the graph, when the
+    items are not split in a fixed number of partitions. `AQ_BATCH_SIZE = "auto"` is
+    resolved from `statistics`, which are loaded if they are not given."""
+    chunk_size = int(backend_spec.get("chunk_size", 1))
+
+    if task.AQ_BATCH_SIZE == "auto":
+        if statistics is None:
+            statistics = MapStatistics.load()
+        batch_size = statistics.batch_size(task_class_name(type(task)))
+
+        # The task was never measured, its first run uses the options of the backend.
+        return chunk_size if batch_size is None else batch_size
+    elif task.AQ_BATCH_SIZE is not None:
+        if task.AQ_BATCH_SIZE < 1:
+            raise ValueError(f"AQ_BATCH_SIZE of {task} must be at least 1.")
+        return task.AQ_BATCH_SIZE
     else:
-        requirements_key = None
+        return chunk_size
 
-    # Define a map_reduce function to avoid adding unnecessary complexity to the graph.
-    def map_reduce(item, acc, requirements):
-        return parallel_task.reduce(
-            parallel_task.map(item, requirements), acc, requirements
-        )
+
+def add_parallel_task_to_dask_graph(
+    parallel_task: AbstractMapReduceTask,
+    graph,
+    backend_spec,
+    requirements_computation=None,
+    statistics: Optional[MapStatistics] = None,
+):
+    """Expand all the work in a parallel task and add it to the graph.
+
+    The items are split in batches of `chunk_size` items (an entry of the backend
+    spec, defaults to 1). Each batch becomes one node of the reduction tree, which maps
+    and reduces its items locally, so the graph has one node per batch rather than one
+    per item. The items themselves are embedded in the nodes, so all of them are read
+    from `items()` before the graph is computed, and the memory of the client grows
+    with their number.
+
+    If the backend spec has an `n_partitions` entry, the items are split in that many
+    batches instead, so that the number of nodes does not depend on the number of
+    items. If `items()` returns an iterator rather than a sized collection, it is read
+    into a list first, to count the items. The `AQ_BATCH_SIZE` attribute of the task
+    takes precedence over both.
+
+    Each node of the tree combines the accumulators of `fan_in` children (an entry of
+    the backend spec, defaults to 2), unless the task sets `AQ_FAN_IN`."""
+    requirements_key = requirements_computation
+    n_partitions = backend_spec.get("n_partitions")
+    fan_in = parallel_task.AQ_FAN_IN or int(backend_spec.get("fan_in", 2))
+    if fan_in < 2:
+        raise ValueError("Reduction trees need a fan-in of at least 2.")
 
     # Gather task context.
     base_task_key = parallel_task._unique_key()
@@ -233,48 +970,41 @@ def add_parallel_task_to_dask_graph(
     graph[accumulator_key] = (parallel_task.accumulator, requirements_key)
 
     # Expand items and perform map reduce.
-    items_list = list(parallel_task.items())
-    for idx, item in enumerate(items_list):
-        reduce_task_key = f"{base_task_key}_reduce_{idx}"
-
-        # We use a binary tree to make a balanced reduce.
-        left_child_idx = idx * 2 + 1
-        right_child_idx = idx * 2 + 2
-
-        if left_child_idx < len(items_list):
-            left_child_key = f"{base_task_key}_reduce_{left_child_idx}"
-        else:
-            left_child_key = accumulator_key
-
-        if right_child_idx < len(items_list):
-            right_child_key = f"{base_task_key}_reduce_{right_child_idx}"
-        else:
-            right_child_key = accumulator_key
+    items: Iterable = parallel_task.items()
+    if n_partitions is not None and parallel_task.AQ_BATCH_SIZE is None:
+        # Partitions only need the number of items, which iterators can't tell.
+        if not isinstance(items, Sized):
+            items = list(items)
+        chunk_size = max(1, math.ceil(len(items) / int(n_partitions)))
+    else:
+        chunk_size = resolve_batch_size(parallel_task, backend_spec, statistics)
+    items = iter(items)
 
-        # Add children together.
-        children_reduce_work_unit = build_dask_task(
-            current_cfg,
-            backend_spec,
-            parallel_task.reduce,
-            left_child_key,
-            right_child_key,
-            requirements_key,
-        )
+    chunks = list(iter(lambda: list(itertools.islice(items, chunk_size)), []))
+    for idx, chunk in enumerate(chunks):
+        reduce_task_key = f"{base_task_key}_reduce_{idx}"
 
-        # Add reduce of children with map of current node.
-        self_reduce_work_unit = build_dask_task(
+        # We use a tree with `fan_in` children per node to make a balanced reduce.
+        children = [
+            f"{base_task_key}_reduce_{child_idx}"
+            for child_idx in range(fan_in * idx + 1, fan_in * idx + fan_in + 1)
+            if child_idx < len(chunks)
+        ]
+        if not children:
+            children = [accumulator_key]
+
+        # Add children together, then map and reduce the chunk of the current node.
+        graph[reduce_task_key] = build_dask_task(
             current_cfg,
             backend_spec,
-            map_reduce,
-            item,
-            children_reduce_work_unit,
+            map_reduce_chunk,
+            parallel_task,
+            chunk,
+            children,
             requirements_key,
         )
 
-        # Add all the tasks implied by this in the graph.
-        graph[reduce_task_key] = self_reduce_work_unit
-
-    if len(items_list) > 0:
+    if len(chunks) > 0:
         root_reduce_key = f"{base_task_key}_reduce_{0}"
     else:
         root_reduce_key = accumulator_key
@@ -291,44 +1021,36 @@ def add_parallel_task_to_dask_graph(
     return post_task_key, graph
 
 
-def add_list_to_dask_graph(
-    work: list, graph: DaskGraph, backend_spec, ignore_cache: bool = False
-) -> tuple[list[str | list], DaskGraph]:
-    new_list = []
-    for x in work:
-        computation, graph = add_work_to_dask_graph(
-            x, graph, backend_spec, ignore_cache=ignore_cache
-        )
-        new_list.append(computation)
-
-    return new_list, graph
-
-
-def add_tuple_to_dask_graph(
-    work: tuple, graph: DaskGraph, backend_spec, ignore_cache: bool = False
-) -> tuple[DaskComputation, DaskGraph]:
-    work_as_list = list(work)
-
-    computation, graph = add_list_to_dask_graph(
-        work_as_list, graph, backend_spec, ignore_cache=ignore_cache
-    )
+def list_to_dask_computation(work: list, graph: DaskGraph) -> list:
+    return [work_to_dask_computation(x, graph) for x in work]
 
-    return (tuple, computation), graph
 
+def tuple_to_dask_computation(work: tuple, graph: DaskGraph) -> DaskComputation:
+    return (tuple, list_to_dask_computation(list(work), graph))
 
-def add_dict_to_dask_graph(
-    work: dict, graph: DaskGraph, backend_spec, ignore_cache: bool = False
-) -> tuple[DaskComputation, DaskGraph]:
-    work_as_list = list(work.values())
 
-    computation, graph = add_list_to_dask_graph(
-        work_as_list, graph, backend_spec, ignore_cache=ignore_cache
-    )
+def dict_to_dask_computation(work: dict, graph: DaskGraph) -> DaskComputation:
+    computation = list_to_dask_computation(list(work.values()), graph)
 
     def rebuild_dict(mapped_values):
         return {k: v for k, v in zip(work.keys(), mapped_values)}
 
-    return (rebuild_dict, computation), graph
+    return (rebuild_dict, computation)
+
+
+def work_to_dask_computation(work: TaskTree, graph: DaskGraph) -> DaskComputation:
+    """Translate a task tree into a Dask computation that refers to the graph entries
+    of its tasks. All the tasks must already be in the graph."""
+    if isinstance(work, AbstractTask):
+        return final_key_of_task(work._unique_key(), graph)
+    elif isinstance(work, list):
+        return list_to_dask_computation(work, graph)
+    elif isinstance(work, tuple):
+        return tuple_to_dask_computation(work, graph)
+    elif isinstance(work, dict):
+        return dict_to_dask_computation(work, graph)
+    else:
+        raise RuntimeError("Unhandled type when adding work to dask graph.")
 
 
 def add_work_to_dask_graph(
@@ -336,30 +1058,110 @@ def add_work_to_dask_graph(
     graph: DaskGraph,
     backend_spec: DaskBackendDictSpec,
     ignore_cache: bool = False,
-    force_tasks: set[Type[AbstractTask]] = set(),
+    force_tasks: Optional[set[Type[AbstractTask]]] = None,
+    tasks: Optional[dict[str, AbstractTask]] = None,
+    annotations: Optional[DaskAnnotations] = None,
+    resident: Optional[DaskResultCache] = None,
+    on_task_added: Optional[Callable[[str], None]] = None,
+    statistics: Optional[MapStatistics] = None,
 ) -> tuple[DaskComputation, DaskGraph]:
+    """Add all the tasks of a task tree to the graph, requirements first.
 
-    if isinstance(work, AbstractTask):
-        computation, graph = add_task_to_dask_graph(
-            work,
-            graph,
-            backend_spec,
-            ignore_cache=ignore_cache,
-            force_tasks=force_tasks,
-        )
-    elif isinstance(work, list):
-        computation, graph = add_list_to_dask_graph(
-            work, graph, backend_spec, ignore_cache=ignore_cache
-        )
-    elif isinstance(work, tuple):
-        computation, graph = add_tuple_to_dask_graph(
-            work, graph, backend_spec, ignore_cache=ignore_cache
+    The tree is explored depth-first with an explicit stack rather than recursively, so
+    that long chains of tasks do not hit the recursion limit. Tasks that are already
+    in the graph are not expanded again.
+
+    If `tasks` is given, the tasks that are added to the graph are recorded in it, by
+    key. If `annotations` is given, the Dask annotations of the entries of tasks whose
+    class declares some are recorded in it, see :func:`dask_annotations_of_task`.
+    Tasks whose result is in `resident` are not expanded, unless they are forced:
+    the future of their result is their only entry. `on_task_added` is called with the key
+    of every task once its entries are in the graph.
+
+    The batch sizes of map-reduce tasks with `AQ_BATCH_SIZE = "auto"` come from
+    `statistics`. They are loaded once for the whole tree if they are not given.
+
+    Returns:
+        The Dask computation that produces the result of `work`, and the graph."""
+    in_progress = set()
+    if statistics is None:
+        statistics = MapStatistics.load()
+
+    def expand(task: AbstractTask, key: str) -> tuple:
+        in_progress.add(key)
+
+        force_run = getattr(task, "_aq_force_root", False) or _is_forced(
+            task, force_tasks
         )
-    elif isinstance(work, dict):
-        computation, graph = add_dict_to_dask_graph(
-            work, graph, backend_spec, ignore_cache=ignore_cache
+        future = None
+        if resident is not None:
+            if force_run:
+                resident.discard(key)
+            else:
+                future = resident.get(key)
+
+        if future is not None:
+            return task, key, None, False, None, [], [0], future
+
+        artifact, load, requirements = expand_task_for_dask_graph(
+            task, ignore_cache=ignore_cache, force_tasks=force_tasks
         )
-    else:
-        raise RuntimeError("Unhandled type when adding work to dask graph.")
-
-    return computation, graph
+        children = gather_tasks_in_tree(requirements)
+
+        return task, key, artifact, load, requirements, children, [0], None
+
+    for root in gather_tasks_in_tree(work):
+        root_key = root._unique_key()
+        if task_in_graph(root_key, graph):
+            continue
+
+        stack = [expand(root, root_key)]
+        while stack:
+            (
+                task,
+                key,
+                artifact,
+                load,
+                requirements,
+                children,
+                cursor,
+                future,
+            ) = stack[-1]
+
+            if cursor[0] < len(children):
+                child = children[cursor[0]]
+                cursor[0] += 1
+
+                child_key = child._unique_key()
+                if child_key in in_progress:
+                    raise ValueError(f"Task {child} depends on itself.")
+                elif not task_in_graph(child_key, graph):
+                    stack.append(expand(child, child_key))
+            else:
+                stack.pop()
+                in_progress.remove(key)
+                n_entries = len(graph)
+                if future is not None:
+                    graph[future.key] = future
+                else:
+                    add_expanded_task_to_dask_graph(
+                        task,
+                        artifact,
+                        load,
+                        requirements,
+                        graph,
+                        backend_spec,
+                        statistics,
+                    )
+
+                task_annotations = dask_annotations_of_task(task)
+                if annotations is not None and task_annotations and future is None:
+                    # The entries of the task are the last ones of the graph.
+                    new_keys = itertools.islice(reversed(graph), len(graph) - n_entries)
+                    annotations.update((k, task_annotations) for k in new_keys)
+                if tasks is not None:
+                    tasks[key] = task
+                if on_task_added is not None:
+                    on_task_added(key)
+
+    return work_to_dask_computation(work, graph), graph
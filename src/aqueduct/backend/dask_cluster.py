@@ -0,0 +1,257 @@
+"""A local Dask cluster that outlives the processes that use it, so that successive
+`aq run` invocations share warm workers instead of starting a cluster each.
+
+The cluster is held by a detached process, which records the address of the scheduler
+in :func:`cluster_file`. Use `aq cluster start`, `aq cluster status` and
+`aq cluster stop` to manage it, or pass `aq run --dask-cluster`, which starts it on
+first use.
+
+Workers keep the modules they imported. Stop the cluster after changing the code of
+tasks so that the next run picks up the changes."""
+
+from typing import Optional
+
+import argparse
+import dataclasses
+import json
+import logging
+import os
+import pathlib
+import signal
+import subprocess
+import sys
+import time
+
+from ..config import aqueduct_cache_dir
+
+_logger = logging.getLogger(__name__)
+
+START_TIMEOUT = 60.0
+"""Seconds to wait for a cluster to start before giving up."""
+
+CONNECT_TIMEOUT = 5.0
+"""Seconds to wait for the scheduler of a recorded cluster to answer."""
+
+
+@dataclasses.dataclass
+class ManagedCluster:
+    """Local cluster recorded in the runtime file."""
+
+    address: str
+    pid: int
+    n_workers: int
+    dashboard_link: Optional[str] = None
+
+
+def cluster_file() -> pathlib.Path:
+    """Runtime file where the local cluster records its address."""
+    return aqueduct_cache_dir() / "dask_cluster.json"
+
+
+def read_cluster_file(path: Optional[pathlib.Path] = None) -> Optional[ManagedCluster]:
+    path = path or cluster_file()
+
+    try:
+        return ManagedCluster(**json.loads(path.read_text()))
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def write_cluster_file(cluster: ManagedCluster, path: Optional[pathlib.Path] = None):
+    path = path or cluster_file()
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Readers never see a partially written file.
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}")
+    tmp_path.write_text(json.dumps(dataclasses.asdict(cluster)))
+    os.replace(tmp_path, path)
+
+
+def _process_is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+    return True
+
+
+def running_cluster(path: Optional[pathlib.Path] = None) -> Optional[ManagedCluster]:
+    """The recorded local cluster, if its scheduler answers. A record left by a cluster
+    that is gone is removed."""
+    from dask.distributed import Client
+
+    path = path or cluster_file()
+    cluster = read_cluster_file(path)
+    if cluster is None:
+        return None
+
+    if _process_is_alive(cluster.pid):
+        try:
+            with Client(cluster.address, timeout=CONNECT_TIMEOUT):
+                return cluster
+        except (OSError, TimeoutError):
+            pass
+
+    _logger.info(f"Removing the record of stopped cluster {cluster.address}.")
+    path.unlink(missing_ok=True)
+    return None
+
+
+def start_local_cluster(
+    n_workers: Optional[int] = None,
+    threads_per_worker: Optional[int] = None,
+    memory_limit: Optional[str] = None,
+    path: Optional[pathlib.Path] = None,
+) -> ManagedCluster:
+    """Start a local cluster in a detached process, unless one is running already,
+    and return it. The output of the cluster goes to `dask_cluster.log`, next to the
+    runtime file."""
+    path = path or cluster_file()
+
+    cluster = running_cluster(path)
+    if cluster is not None:
+        return cluster
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    command = [sys.executable, "-m", __name__, "--file", str(path)]
+    if n_workers is not None:
+        command += ["--n-workers", str(n_workers)]
+    if threads_per_worker is not None:
+        command += ["--threads-per-worker", str(threads_per_worker)]
+    if memory_limit is not None:
+        command += ["--memory-limit", memory_limit]
+
+    # The cluster imports the same modules as the current process, including modules
+    # that are only importable because their directory was added to `sys.path`.
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+
+    log_path = path.with_suffix(".log")
+    with open(log_path, "ab") as log:
+        process = subprocess.Popen(
+            command,
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        cluster = read_cluster_file(path)
+        if cluster is not None and cluster.pid == process.pid:
+            _logger.info(f"Started local Dask cluster at {cluster.address}.")
+            return cluster
+
+        if process.poll() is not None:
+            raise RuntimeError(
+                f"The local Dask cluster exited with code {process.returncode}. "
+                f"See {log_path}."
+            )
+
+        time.sleep(0.1)
+
+    process.terminate()
+    raise TimeoutError(f"The local Dask cluster did not start. See {log_path}.")
+
+
+def stop_local_cluster(path: Optional[pathlib.Path] = None) -> Optional[ManagedCluster]:
+    """Shut down the recorded local cluster, and return it. Return `None` if no cluster
+    is running."""
+    path = path or cluster_file()
+
+    cluster = running_cluster(path)
+    if cluster is None:
+        return None
+
+    # The process of the cluster closes the workers, then removes its record.
+    os.kill(cluster.pid, signal.SIGTERM)
+
+    deadline = time.monotonic() + START_TIMEOUT
+    while _is_recorded(cluster, path):
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"The local Dask cluster {cluster.pid} did not stop.")
+
+        time.sleep(0.1)
+
+    return cluster
+
+
+def _is_recorded(cluster: ManagedCluster, path: pathlib.Path) -> bool:
+    current = read_cluster_file(path)
+    return current is not None and current.pid == cluster.pid
+
+
+def resolve_local_cluster_address(n_workers: Optional[int] = None) -> str:
+    """Address of the local cluster, which is started if it is not running."""
+    cluster = running_cluster()
+
+    if cluster is None:
+        cluster = start_local_cluster(n_workers=n_workers)
+    elif n_workers is not None and n_workers != cluster.n_workers:
+        _logger.warning(
+            f"Reusing the local Dask cluster with {cluster.n_workers} workers, "
+            f"rather than {n_workers}. Run `aq cluster stop` to change them."
+        )
+
+    return cluster.address
+
+
+def serve_local_cluster(
+    path: pathlib.Path,
+    n_workers: Optional[int] = None,
+    threads_per_worker: Optional[int] = None,
+    memory_limit: Optional[str] = None,
+):
+    """Run a local cluster and record it in `path` until its scheduler is shut down,
+    or the process is terminated."""
+    from dask.distributed import LocalCluster
+    from distributed.core import Status
+
+    # Terminating the process closes the workers with the cluster.
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    options = {} if memory_limit is None else {"memory_limit": memory_limit}
+    cluster = LocalCluster(
+        n_workers=n_workers, threads_per_worker=threads_per_worker, **options
+    )
+    record = ManagedCluster(
+        address=cluster.scheduler_address,
+        pid=os.getpid(),
+        n_workers=len(cluster.workers),
+        dashboard_link=cluster.dashboard_link,
+    )
+
+    try:
+        write_cluster_file(record, path)
+
+        while cluster.scheduler.status not in (Status.closing, Status.closed):
+            time.sleep(0.5)
+    finally:
+        # When a client shut down the scheduler, the nannies close their workers
+        # themselves, and closing the cluster would wait for them to time out.
+        if cluster.scheduler.status == Status.running:
+            cluster.close()
+
+        if _is_recorded(record, path):
+            path.unlink(missing_ok=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local Dask cluster.")
+    parser.add_argument("--file", type=pathlib.Path, required=True)
+    parser.add_argument("--n-workers", type=int, default=None)
+    parser.add_argument("--threads-per-worker", type=int, default=None)
+    parser.add_argument("--memory-limit", type=str, default=None)
+    ns = parser.parse_args()
+
+    logging.basicConfig(level="INFO", stream=sys.stdout)
+    serve_local_cluster(ns.file, ns.n_workers, ns.threads_per_worker, ns.memory_limit)
+
+
+if __name__ == "__main__":
+    main()
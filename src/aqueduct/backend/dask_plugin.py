@@ -0,0 +1,26 @@
+"""Dask worker plugins. This module imports `distributed`, it is only imported when a
+:class:`DaskBackend` needs it."""
+
+import omegaconf as oc
+from distributed import WorkerPlugin
+
+from .dask import release_config, retain_config
+
+
+class ConfigPlugin(WorkerPlugin):
+    """Installs a configuration on every worker of a cluster, including the workers
+    that join it later, so that the tasks of Dask graphs can refer to it by key. See
+    :func:`config_key`.
+
+    The configuration is dropped from the workers when the plugin is removed, or
+    replaced by the plugin of another configuration."""
+
+    def __init__(self, key: str, cfg: oc.DictConfig):
+        self.key = key
+        self.cfg = cfg
+
+    def setup(self, worker):
+        retain_config(self.key, self.cfg)
+
+    def teardown(self, worker):
+        release_config(self.key)
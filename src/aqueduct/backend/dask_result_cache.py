@@ -0,0 +1,142 @@
+"""Results of tasks kept in the memory of a Dask cluster between runs. See the
+`result_cache` argument of :class:`aqueduct.backend.dask.DaskBackend`."""
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Optional
+
+import logging
+import threading
+
+if TYPE_CHECKING:
+    from dask.distributed import Client, Future
+
+_logger = logging.getLogger(__name__)
+
+
+def resident_key(task_key: str) -> str:
+    """Key under which the cluster holds the cached result of a task."""
+    return f"{task_key}_resident"
+
+
+class DaskResultCache:
+    """Futures of the results of tasks, by task key, that keep the results alive in
+    the memory of the cluster. When the results take more than `max_bytes`, the
+    least recently used ones are released.
+
+    Results are kept under keys of their own, see :func:`resident_key`, which alias
+    the keys of the tasks. The keys of the tasks are released after each run as
+    usual, so that forced tasks can be computed again under the same key.
+
+    Sizes are those measured by the workers, which may underestimate the memory used
+    by some objects.
+
+    Arguments:
+        client: Client that owns the futures.
+        max_bytes: Memory budget of the cache, in bytes."""
+
+    def __init__(self, client: "Client", max_bytes: int):
+        if max_bytes < 0:
+            raise ValueError("max_bytes must not be negative.")
+
+        self.client = client
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple["Future", int]] = OrderedDict()
+        self._n_bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def n_bytes(self) -> int:
+        return self._n_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        return self.get(key) is not None  # type: ignore[arg-type]
+
+    def __getitem__(self, key: str) -> "Future":
+        future = self.get(key)
+        if future is None:
+            raise KeyError(key)
+
+        return future
+
+    def get(self, key: str) -> Optional["Future"]:
+        """Future of the result of a task, which becomes the most recently used.
+        Results that were lost by the cluster, for instance because their worker
+        died, are dropped from the cache."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            future, _ = entry
+            if future.status != "finished":
+                self._release(key)
+                return None
+
+            self._entries.move_to_end(key)
+            return future
+
+    def update(self, futures: dict[str, "Future"]):
+        """Keep the results of finished tasks, by task key, then release the least
+        recently used results until the cache fits in its budget."""
+        from dask.distributed import wait
+
+        with self._lock:
+            new = {}
+            for key, future in futures.items():
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                elif future.status == "finished":
+                    new[resident_key(key)] = (key, future)
+
+        if not new:
+            return
+
+        # Workers hold the aliases without copying the results.
+        aliases = self.client.get(
+            {alias: future for alias, (_, future) in new.items()}, list(new), sync=False
+        )
+        wait(aliases)
+        sizes = self.client.nbytes(list(new), summary=False)
+
+        with self._lock:
+            for (alias, (key, _)), future in zip(new.items(), aliases):
+                size = int(sizes.get(alias, 0))
+
+                if size > self.max_bytes or key in self._entries:
+                    future.release()
+                    continue
+
+                self._entries[key] = (future, size)
+                self._n_bytes += size
+
+            while self._n_bytes > self.max_bytes:
+                self._release(next(iter(self._entries)))
+
+        _logger.debug(
+            f"Result cache holds {len(self._entries)} results, {self._n_bytes} bytes."
+        )
+
+    def discard(self, key: str):
+        """Drop the result of a task, for instance because it is computed again."""
+        with self._lock:
+            if key in self._entries:
+                self._release(key)
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries):
+                self._release(key)
+
+    def _release(self, key: str):
+        future, size = self._entries.pop(key)
+        self._n_bytes -= size
+        future.release()
+
+    def __repr__(self):
+        return (
+            f"DaskResultCache({len(self._entries)} results, "
+            f"{self._n_bytes}/{self.max_bytes} bytes)"
+        )
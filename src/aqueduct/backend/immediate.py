@@ -1,11 +1,13 @@
-from typing import Type, TypeVar, Any, TypedDict, Literal
+from typing import Type, TypeVar, Any, TypedDict, Literal, Optional
 
 import logging
 
 from aqueduct.backend.base import TaskError
 
 from ..artifact import resolve_artifact_from_spec
+from ..artifact.cache import invalidate_artifact
 from .backend import Backend
+from .submission import Submission
 from ..task import AbstractTask
 from ..task.mapreduce import AbstractMapReduceTask
 from ..task_tree import TaskTree, _resolve_task_tree
@@ -89,6 +91,9 @@ class ImmediateBackend(Backend):
             _logger.info(f"Saving result of {task} to {artifact}")
             task.save(task_result)
 
+        # The task may have written its artifact, either by saving it or by itself.
+        invalidate_artifact(artifact)
+
         return task_result
 
     def execute_task(self, task: Task[T], requirements=None) -> T:
@@ -105,12 +110,23 @@ class ImmediateBackend(Backend):
         except Exception as e:
             raise TaskError(f"Error while executing task {task}") from e
 
-    def _run(self, work: TaskTree, force_tasks: set[Type[AbstractTask]] = set()) -> Any:
+    def _run(
+        self,
+        work: TaskTree,
+        force_tasks: set[Type[AbstractTask]] = set(),
+        submission: Optional[Submission] = None,
+    ) -> Any:
         def fn(task, requirements=None):
-            return self.check_artifact_and_execute(
+            result = self.check_artifact_and_execute(
                 task, requirements, force_tasks=force_tasks
             )
 
+            if submission is not None:
+                submission._set_task_result(task, result)
+
+            return result
+
+        self._plan(work, force_tasks=force_tasks)
         result = _resolve_task_tree(work, fn, force_tasks=force_tasks)
         return result
 
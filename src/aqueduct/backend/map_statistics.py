@@ -0,0 +1,132 @@
+"""Measured time per item of map-reduce tasks, by task class. It is used to choose the
+batch size of tasks whose `AQ_BATCH_SIZE` is `"auto"`, so that every task of a Dask
+graph runs for about `aqueduct.target_batch_duration` seconds (0.2 by default).
+
+Workers record the time they spend mapping and reducing batches. The backend collects
+these records after a run and persists them in :func:`aqueduct_cache_dir`, so that the
+next runs, in any process, can use them."""
+
+from typing import Optional, Type
+
+import json
+import logging
+import os
+import pathlib
+import threading
+
+from ..config import aqueduct_cache_dir, get_aqueduct_config
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_TARGET_BATCH_DURATION = 0.2
+
+MAX_AUTO_BATCH_SIZE = 100_000
+
+SMOOTHING = 0.5
+"""Weight of the latest measurement in the time per item."""
+
+_recorded: dict[str, list[float]] = {}
+_recorded_lock = threading.Lock()
+
+
+def task_class_name(task_class: Type) -> str:
+    return f"{task_class.__module__}.{task_class.__qualname__}"
+
+
+def record_map_time(name: str, n_items: int, elapsed: float):
+    """Record the time spent mapping and reducing `n_items` items of a task class."""
+    with _recorded_lock:
+        record = _recorded.setdefault(name, [0, 0.0])
+        record[0] += n_items
+        record[1] += elapsed
+
+
+def drain_recorded_map_times() -> dict[str, list[float]]:
+    """Return the `[n_items, elapsed]` recorded in this process since the last call,
+    by task class name."""
+    global _recorded
+
+    with _recorded_lock:
+        recorded, _recorded = _recorded, {}
+
+    return recorded
+
+
+class MapStatistics:
+    """Time per item of task classes, in seconds, persisted as JSON."""
+
+    def __init__(self, path: pathlib.Path, time_per_item: dict[str, float]):
+        self.path = path
+        self.time_per_item = time_per_item
+
+    @classmethod
+    def load(cls, path: Optional[pathlib.Path] = None) -> "MapStatistics":
+        path = path or aqueduct_cache_dir() / "map_statistics.json"
+
+        try:
+            time_per_item = json.loads(path.read_text())
+        except (OSError, ValueError):
+            time_per_item = {}
+
+        return cls(path, time_per_item)
+
+    def update(self, recorded: dict[str, list[float]]):
+        for name, (n_items, elapsed) in recorded.items():
+            if n_items == 0:
+                continue
+
+            measured = elapsed / n_items
+            previous = self.time_per_item.get(name)
+            if previous is None:
+                self.time_per_item[name] = measured
+            else:
+                self.time_per_item[name] = (
+                    SMOOTHING * measured + (1.0 - SMOOTHING) * previous
+                )
+
+    def dump(self):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(self.time_per_item))
+            tmp_path.rename(self.path)
+        except OSError as e:
+            _logger.warning(f"Could not save map statistics to {self.path}: {e}")
+
+    def batch_size(self, name: str) -> Optional[int]:
+        """Batch size that makes a batch last about the target duration, or `None` if
+        the task class was never measured."""
+        time_per_item = self.time_per_item.get(name)
+        if time_per_item is None:
+            return None
+
+        target = float(
+            get_aqueduct_config().get(
+                "target_batch_duration", DEFAULT_TARGET_BATCH_DURATION
+            )
+        )
+        if time_per_item <= 0.0:
+            return MAX_AUTO_BATCH_SIZE
+
+        return max(1, min(MAX_AUTO_BATCH_SIZE, round(target / time_per_item)))
+
+
+def collect_map_statistics(recorded: list[dict[str, list[float]]]):
+    """Merge the records of several processes into the persisted statistics."""
+    merged: dict[str, list[float]] = {}
+    for r in recorded:
+        for name, (n_items, elapsed) in r.items():
+            record = merged.setdefault(name, [0, 0.0])
+            record[0] += n_items
+            record[1] += elapsed
+
+    if not merged:
+        return
+
+    statistics = MapStatistics.load()
+    statistics.update(merged)
+    statistics.dump()
+
+    for name, time_per_item in statistics.time_per_item.items():
+        if name in merged:
+            _logger.debug(f"Map time of {name}: {1e6 * time_per_item:.1f}us per item.")
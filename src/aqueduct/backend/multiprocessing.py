@@ -1,7 +1,13 @@
-from typing import TypedDict, Literal, Any, TypeVar
+from typing import TypedDict, Literal, Any, Optional, TypeVar
 
+import cloudpickle
 import functools
+import itertools
 import multiprocessing
+import os
+import queue
+import tempfile
+import uuid
 
 from ..task import AbstractTask, Task
 from ..task.mapreduce import AbstractMapReduceTask
@@ -10,23 +16,210 @@ from .immediate import ImmediateBackend, execute_task
 _T = TypeVar("_T")
 
 
-class MultiprocessingBackendDictSpec(TypedDict):
+class MultiprocessingBackendDictSpec(TypedDict, total=False):
     type: Literal["multiprocessing"]
     n_workers: int
+    chunk_size: int
+    max_in_flight: int
+    reduce_in_workers: bool
+    fan_in: int
 
 
-def call_map_fn(args):
-    map_fn, item, requirements = args
-    return map_fn(item, requirements)
+_WORKER_PAYLOAD: Optional[tuple[str, AbstractMapReduceTask, Any]] = None
+"""The task and requirements installed in the current worker, with their token."""
 
+_RELEASE_BARRIER: Optional[Any] = None
+"""Barrier shared by the workers of a pool, see :func:`release_payload`."""
+
+
+def install_release_barrier(barrier):
+    """Initializer of the workers of a pool. Forked workers do not keep a payload
+    inherited from the parent process."""
+    global _RELEASE_BARRIER, _WORKER_PAYLOAD
+    _RELEASE_BARRIER = barrier
+    _WORKER_PAYLOAD = None
+
+
+def installed_payload(token: str, path: str) -> tuple[AbstractMapReduceTask, Any]:
+    """Return the task and requirements broadcasted with `token`. They are read from
+    `path` the first time a worker sees the token, and reused for the following
+    items. A worker keeps the last payload it loaded until it receives another one."""
+    global _WORKER_PAYLOAD
+
+    if _WORKER_PAYLOAD is None or _WORKER_PAYLOAD[0] != token:
+        # Release the previous payload before loading the next one.
+        _WORKER_PAYLOAD = None
+        with open(path, "rb") as f:
+            task, requirements = cloudpickle.load(f)
+        _WORKER_PAYLOAD = (token, task, requirements)
+
+    _, task, requirements = _WORKER_PAYLOAD
+    return task, requirements
+
+
+def release_payload(token: str):
+    """Drop the payload of `token` from the current worker. When the pool was created
+    with a release barrier, the call then waits until every worker of the pool has
+    received a call, so that one call per worker reaches every worker."""
+    global _WORKER_PAYLOAD
+
+    if _WORKER_PAYLOAD is not None and _WORKER_PAYLOAD[0] == token:
+        _WORKER_PAYLOAD = None
+
+    if _RELEASE_BARRIER is not None:
+        _RELEASE_BARRIER.wait()
+
+
+def installed_payload_token() -> Optional[str]:
+    return None if _WORKER_PAYLOAD is None else _WORKER_PAYLOAD[0]
+
+
+def release_payload_in_workers(pool, token: str):
+    """Drop the payload of `token` from the workers of a pool, so that they do not
+    keep the task and its requirements alive once the task is done."""
+    n_processes = getattr(pool, "_processes", None) or 1
+    for _ in range(n_processes):
+        pool.apply_async(release_payload, (token,))
+
+
+def call_map_fn_on_chunk(token: str, path: str, chunk: list) -> list:
+    task, requirements = installed_payload(token, path)
+    return [task.map(item, requirements) for item in chunk]
+
+
+def call_map_reduce_fn_on_chunk(token: str, path: str, chunk: list) -> Any:
+    """Map the items of a chunk and reduce them into a partial accumulator."""
+    task, requirements = installed_payload(token, path)
 
-def execute_parallel_task(pool, task: AbstractMapReduceTask, requirements=None):
     accumulator = task.accumulator(requirements)
-    for mapped_item in pool.imap_unordered(
-        call_map_fn, [(task.map, item, requirements) for item in task.items()]
-    ):
+    for item in chunk:
+        mapped_item = task.map(item, requirements)
         accumulator = task.reduce(mapped_item, accumulator, requirements)
 
+    return accumulator
+
+
+def combine_accumulators(
+    task: AbstractMapReduceTask, accumulators: list, requirements=None
+) -> Any:
+    """Reduce partial accumulators together. Like for the reduction tree of the
+    :class:`DaskBackend`, `task.reduce` must accept two accumulators."""
+    accumulator = accumulators[0]
+    for other in accumulators[1:]:
+        accumulator = task.reduce(other, accumulator, requirements)
+
+    return accumulator
+
+
+def call_combine_fn(token: str, path: str, accumulators: list) -> Any:
+    task, requirements = installed_payload(token, path)
+    return combine_accumulators(task, accumulators, requirements)
+
+
+def execute_parallel_task(
+    pool,
+    task: AbstractMapReduceTask,
+    requirements=None,
+    chunk_size: int = 1,
+    max_in_flight: Optional[int] = None,
+    reduce_in_workers: bool = False,
+    fan_in: int = 2,
+):
+    """Map the items of a task in a pool of workers, and reduce them in the current
+    process.
+
+    The task and its requirements are serialized once, to a file that every worker
+    reads when it receives its first item. Only the items are sent with each call.
+
+    `task.items()` is consumed lazily: items are sent to the pool in chunks of
+    `chunk_size`, and at most `max_in_flight` chunks are submitted and not yet reduced
+    at any time. Memory usage therefore depends on the size of this window rather than
+    on the number of items. `max_in_flight` defaults to twice the number of workers.
+
+    If `reduce_in_workers` is `True`, each worker reduces its chunk into a partial
+    accumulator, and partial accumulators are combined `fan_in` at a time by the
+    workers, as a tree. The current process only combines the last partial
+    accumulators. `task.reduce` must then accept two accumulators."""
+    if fan_in < 2:
+        raise ValueError("Reduction trees need a fan-in of at least 2.")
+
+    if max_in_flight is None:
+        max_in_flight = 2 * (getattr(pool, "_processes", None) or os.cpu_count() or 1)
+
+    accumulator = task.accumulator(requirements)
+
+    fd, path = tempfile.mkstemp(prefix="aqueduct_", suffix=".pkl")
+    token = uuid.uuid4().hex
+    try:
+        with os.fdopen(fd, "wb") as f:
+            cloudpickle.dump((task, requirements), f)
+
+        items = iter(task.items())
+        completed: queue.SimpleQueue = queue.SimpleQueue()
+        if reduce_in_workers:
+            chunk_fn = call_map_reduce_fn_on_chunk
+        else:
+            chunk_fn = call_map_fn_on_chunk
+
+        def submit(fn, payload):
+            pool.apply_async(
+                fn,
+                (token, path, payload),
+                callback=lambda result: completed.put((True, result)),
+                error_callback=lambda e: completed.put((False, e)),
+            )
+
+        def submit_next_chunk() -> bool:
+            chunk = list(itertools.islice(items, chunk_size))
+            if not chunk:
+                return False
+
+            submit(chunk_fn, chunk)
+            return True
+
+        n_in_flight = 0
+        try:
+            while n_in_flight < max_in_flight and submit_next_chunk():
+                n_in_flight += 1
+
+            partial_accumulators = []
+            while n_in_flight > 0:
+                success, result = completed.get()
+                n_in_flight -= 1
+
+                if not success:
+                    raise result
+
+                if reduce_in_workers:
+                    partial_accumulators.append(result)
+                    while len(partial_accumulators) >= fan_in:
+                        submit(call_combine_fn, partial_accumulators[:fan_in])
+                        partial_accumulators = partial_accumulators[fan_in:]
+                        n_in_flight += 1
+
+                # Refill the window before reducing, so that workers stay busy.
+                if n_in_flight < max_in_flight and submit_next_chunk():
+                    n_in_flight += 1
+
+                if not reduce_in_workers:
+                    for mapped_item in result:
+                        accumulator = task.reduce(
+                            mapped_item, accumulator, requirements
+                        )
+        except Exception:
+            # The pool cannot cancel the chunks in flight, and the workers read the
+            # payload file when they start them. Wait for them before the file is
+            # deleted, and drop their results.
+            for _ in range(n_in_flight):
+                completed.get()
+            raise
+
+        if partial_accumulators:
+            accumulator = combine_accumulators(task, partial_accumulators, requirements)
+    finally:
+        release_payload_in_workers(pool, token)
+        os.unlink(path)
+
     return task.post(accumulator, requirements)
 
 
@@ -42,19 +235,64 @@ def execution_dispatch(pool, task: AbstractTask, requirements=None):
 class MultiprocessingBackend(ImmediateBackend):
     """Computing backend based on the `multiprocessing` module. It only parallelizes
     execution of :class:`ParallelTask` instances. For other tasks, it behaves like the
-    :class:`ImmediateBackend`."""
+    :class:`ImmediateBackend`.
+
+    Arguments:
+        n_workers: Number of worker processes. Defaults to the number of CPUs.
+        chunk_size: Number of items sent to a worker at once.
+        max_in_flight: Maximum number of chunks that are being mapped at any time.
+            Defaults to twice the number of workers.
+        reduce_in_workers: Reduce the chunks and combine the partial accumulators
+            in the workers, as a tree, instead of reducing every mapped item in the
+            main process. The `reduce` method of tasks must accept two accumulators.
+        fan_in: Number of partial accumulators combined at once by a worker."""
 
-    def __init__(self, n_workers=None):
+    def __init__(
+        self,
+        n_workers=None,
+        chunk_size: int = 1,
+        max_in_flight: Optional[int] = None,
+        reduce_in_workers: bool = False,
+        fan_in: int = 2,
+    ):
         self.n_workers = n_workers
-        self.pool = multiprocessing.Pool(processes=self.n_workers)
+        self.chunk_size = chunk_size
+        self.max_in_flight = max_in_flight
+        self.reduce_in_workers = reduce_in_workers
+        self.fan_in = fan_in
+
+        n_processes = self.n_workers or os.cpu_count() or 1
+        self.pool = multiprocessing.Pool(
+            processes=n_processes,
+            initializer=install_release_barrier,
+            initargs=(multiprocessing.Barrier(n_processes),),
+        )
 
     def execute_map_reduce_task(
         self, task: AbstractMapReduceTask[Any, Any, _T], requirements=None
     ) -> _T:
-        return execute_parallel_task(self.pool, task, requirements)
+        return execute_parallel_task(
+            self.pool,
+            task,
+            requirements,
+            chunk_size=self.chunk_size,
+            max_in_flight=self.max_in_flight,
+            reduce_in_workers=self.reduce_in_workers,
+            fan_in=self.fan_in,
+        )
 
     def _spec(self):
-        return {"type": "multiprocessing", "n_workers": self.n_workers}
+        spec = {
+            "type": "multiprocessing",
+            "n_workers": self.n_workers,
+            "chunk_size": self.chunk_size,
+            "reduce_in_workers": self.reduce_in_workers,
+            "fan_in": self.fan_in,
+        }
+        if self.max_in_flight is not None:
+            spec["max_in_flight"] = self.max_in_flight
+
+        return spec
 
     def close(self):
         self.pool.close()
@@ -0,0 +1,111 @@
+"""Futures of task trees submitted to a backend without waiting for their result. See
+:meth:`aqueduct.backend.Backend.submit`."""
+
+from concurrent.futures import Future
+from typing import Any, Callable, Generator, Optional
+
+import asyncio
+import threading
+
+from ..task import AbstractTask
+from ..task_tree import TaskTree, gather_tasks_in_tree
+
+
+class Submission:
+    """Futures of a task tree that is being computed by a backend.
+
+    Await the submission, or call :meth:`result`, to get the result of the whole tree.
+    :meth:`future` returns the future of a single task of the tree, which is resolved
+    as soon as that task is computed, before the rest of the tree is done.
+
+    Tasks that are not computed because a task that requires them was loaded from its
+    artifact have their future cancelled when the submission completes.
+
+    Arguments:
+        work: The submitted task tree.
+        watch: Tasks whose results are exposed by :meth:`future`, in addition to the
+            root tasks of `work`. Defaults to all the tasks of the tree. Restricting it
+            avoids transferring intermediate results from remote workers."""
+
+    def __init__(self, work: TaskTree, watch: Optional[TaskTree] = None):
+        self.work = work
+        self._future: Future = Future()
+        self._task_futures: dict[str, Future] = {}
+        # Reentrant, because callbacks of the futures run while it is held.
+        self._lock = threading.RLock()
+
+        if watch is None:
+            self._watched_keys = None
+        else:
+            self._watched_keys = set(
+                t._unique_key() for t in gather_tasks_in_tree([work, watch])
+            )
+
+    def wants(self, task: AbstractTask) -> bool:
+        """Whether the result of a task is exposed by the submission."""
+        return self._watched_keys is None or task._unique_key() in self._watched_keys
+
+    def future(self, task: AbstractTask) -> Future:
+        """Future of the result of one task of the tree."""
+        if not self.wants(task):
+            raise KeyError(f"Task {task} is not watched by this submission.")
+
+        return self._task_future(task._unique_key())
+
+    def _task_future(self, key: str) -> Future:
+        with self._lock:
+            future = self._task_futures.get(key)
+
+            if future is None:
+                future = self._task_futures[key] = Future()
+
+                # The task was not computed, and will never be.
+                if self._future.done():
+                    future.cancel()
+
+            return future
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        """Wait for the whole tree to be computed and return its result."""
+        return self._future.result(timeout)
+
+    def exception(self, timeout: Optional[float] = None) -> Optional[BaseException]:
+        return self._future.exception(timeout)
+
+    def done(self) -> bool:
+        return self._future.done()
+
+    def add_done_callback(self, fn: Callable[[Future], Any]):
+        self._future.add_done_callback(fn)
+
+    def __await__(self) -> Generator[Any, None, Any]:
+        return asyncio.wrap_future(self._future).__await__()
+
+    def _set_task_result(self, task: AbstractTask, result: Any):
+        """Called by backends, from any thread, when a task is computed."""
+        if not self.wants(task):
+            return
+
+        future = self._task_future(task._unique_key())
+        with self._lock:
+            if not future.done():
+                future.set_result(result)
+
+    def _set_result(self, result: Any):
+        with self._lock:
+            for future in self._task_futures.values():
+                future.cancel()
+
+            self._future.set_result(result)
+
+    def _set_exception(self, exception: BaseException):
+        with self._lock:
+            for future in self._task_futures.values():
+                if not future.done():
+                    future.set_exception(exception)
+
+            self._future.set_exception(exception)
+
+    def __repr__(self):
+        state = "done" if self.done() else "running"
+        return f"Submission({state}, {len(self._task_futures)} task futures)"
@@ -0,0 +1,162 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Literal, Mapping, Optional, Type, TypedDict, TypeVar
+
+import itertools
+import logging
+import os
+import queue
+
+from ..context import bind_context
+from ..task import AbstractTask
+from ..task.mapreduce import AbstractMapReduceTask
+from ..task_tree import (
+    TaskNode,
+    TaskTree,
+    _map_tasks_in_tree,
+    build_task_graph,
+    gather_tasks_in_tree,
+)
+from .base import TaskError
+from .concurrent import map_requirements, schedule_task_graph
+from .immediate import ImmediateBackend
+from .submission import Submission
+
+_T = TypeVar("_T")
+
+_logger = logging.getLogger(__name__)
+
+
+class ThreadBackendDictSpec(TypedDict):
+    type: Literal["thread"]
+    n_workers: int
+
+
+def execute_parallel_task_in_threads(
+    executor: ThreadPoolExecutor,
+    task: AbstractMapReduceTask[Any, Any, _T],
+    requirements=None,
+    max_in_flight: Optional[int] = None,
+    n_workers: Optional[int] = None,
+) -> _T:
+    """Map the items of a task in a thread pool, and reduce them in the current thread
+    as they are mapped. Items and requirements are shared with the threads, nothing is
+    serialized.
+
+    `task.items()` is consumed lazily, at most `max_in_flight` items are mapped and not
+    yet reduced at any time. Defaults to twice `n_workers`, the number of threads of
+    the pool, which defaults to the number of CPUs.
+
+    If an item fails, the items that did not start yet are cancelled."""
+    if max_in_flight is None:
+        max_in_flight = 2 * (n_workers or os.cpu_count() or 1)
+
+    accumulator = task.accumulator(requirements)
+    items = iter(task.items())
+    completed: queue.SimpleQueue[Future] = queue.SimpleQueue()
+    in_flight: set[Future] = set()
+    map_fn = bind_context(task.map)
+
+    def submit_next_item() -> bool:
+        for item in itertools.islice(items, 1):
+            future = executor.submit(map_fn, item, requirements)
+            in_flight.add(future)
+            future.add_done_callback(completed.put)
+            return True
+
+        return False
+
+    try:
+        while len(in_flight) < max_in_flight and submit_next_item():
+            pass
+
+        while in_flight:
+            future = completed.get()
+            in_flight.discard(future)
+            submit_next_item()
+
+            accumulator = task.reduce(future.result(), accumulator, requirements)
+    except Exception:
+        # The pool is shared with the other map-reduce tasks, don't leave it busy with
+        # the items of a task that failed.
+        for future in in_flight:
+            future.cancel()
+        raise
+
+    return task.post(accumulator, requirements)
+
+
+class ThreadBackend(ImmediateBackend):
+    """Execute tasks in a pool of threads of the current process. Every task is started
+    as soon as its requirements are computed, and the items of map-reduce tasks are
+    mapped in parallel.
+
+    Results are shared in memory and never serialized. This suits tasks that are
+    I/O-bound, or that spend their time in code that releases the GIL, like numpy or
+    pyarrow.
+
+    Arguments:
+        n_workers: Number of threads that execute tasks, and number of threads that
+            map items. Defaults to the number of CPUs."""
+
+    def __init__(self, n_workers: Optional[int] = None):
+        self.n_workers = n_workers or os.cpu_count() or 1
+
+        # Map-reduce tasks wait on the map phase, which has its own pool so that it
+        # can't be starved by the tasks that wait on it.
+        self.executor = ThreadPoolExecutor(
+            self.n_workers, thread_name_prefix="aqueduct_task"
+        )
+        self.map_executor = ThreadPoolExecutor(
+            self.n_workers, thread_name_prefix="aqueduct_map"
+        )
+
+    def _run(
+        self,
+        work: TaskTree,
+        force_tasks: Optional[set[Type[AbstractTask]]] = None,
+        submission: Optional[Submission] = None,
+    ) -> Any:
+        self._plan(work, force_tasks=force_tasks)
+        graph = build_task_graph(work, force_tasks=force_tasks)
+        _logger.info(f"Task graph has {len(graph)} unique tasks.")
+
+        root_keys = set(t._unique_key() for t in gather_tasks_in_tree(work))
+        execute = bind_context(self.check_artifact_and_execute)
+
+        def submit(node: TaskNode, results: Mapping[str, Any]) -> Future:
+            return self.executor.submit(
+                execute,
+                node.task,
+                map_requirements(node.requirements, results),
+                force_tasks=force_tasks or set(),
+            )
+
+        def on_result(node: TaskNode, result: Any):
+            if submission is not None:
+                submission._set_task_result(node.task, result)
+
+        results = schedule_task_graph(
+            graph, submit, keep=root_keys, on_result=on_result
+        )
+
+        return _map_tasks_in_tree(work, lambda t: results[t._unique_key()])
+
+    def execute_map_reduce_task(
+        self, task: AbstractMapReduceTask[Any, Any, _T], requirements=None
+    ) -> _T:
+        try:
+            return execute_parallel_task_in_threads(
+                self.map_executor, task, requirements, n_workers=self.n_workers
+            )
+        except Exception as e:
+            raise TaskError(f"Error while executing task {task}") from e
+
+    def _spec(self) -> ThreadBackendDictSpec:
+        return {"type": "thread", "n_workers": self.n_workers}
+
+    def __str__(self):
+        return f"ThreadBackend({self.n_workers})"
+
+    def close(self):
+        self.executor.shutdown()
+        self.map_executor.shutdown()
@@ -2,19 +2,16 @@ import argparse
 
 from ..artifact import LocalFilesystemArtifact
 from .base import (
-    resolve_source_modules,
+    resolve_task_index,
     build_task_from_cli_spec,
     accumulate_artifacts_of_tree,
 )
-from ..taskresolve import create_task_index
 
 
 def artifact_ls_cli(ns: argparse.Namespace):
-    project_name_to_module_names = resolve_source_modules(ns)
-
-    name2task, name2config_provider, task_class2module_name = create_task_index(
-        project_name_to_module_names
-    )
+    name2task, name2config_provider, task_class2module_name = resolve_task_index(
+        ns
+    ).mappings()
 
     root_task = build_task_from_cli_spec(ns.task, name2task, name2config_provider)
 
@@ -11,16 +11,32 @@ from ..artifact import Artifact, CompositeArtifact, resolve_artifact_from_spec
 from ..config.configsource import ConfigSource, DotListConfigSource
 from ..config.aqueduct import DefaultAqueductConfigSource
 from ..task import AbstractTask
-from ..taskresolve import get_modules_from_extensions
+from ..taskresolve import TaskIndex, cached_task_index, get_modules_from_extensions
 from ..task_tree import reduce_type_in_tree
 
 
-def resolve_source_modules(ns: argparse.Namespace) -> Mapping[str, Iterable[str]]:
+def resolve_module_option(
+    ns: argparse.Namespace,
+) -> Optional[Mapping[str, Iterable[str]]]:
+    """Module given with `--module`, importable from the working directory. `None` if
+    the modules of the extensions are used."""
     if ns.module is not None:
         sys.path.insert(0, "")
         return {"default": [ns.module]}
     else:
-        return get_modules_from_extensions()
+        return None
+
+
+def resolve_source_modules(ns: argparse.Namespace) -> Mapping[str, Iterable[str]]:
+    modules = resolve_module_option(ns)
+    return get_modules_from_extensions() if modules is None else modules
+
+
+def resolve_task_index(ns: argparse.Namespace) -> TaskIndex:
+    """Task index of the modules selected on the command line. The index is persisted
+    between invocations, see :func:`aqueduct.taskresolve.cached_task_index`."""
+    # The modules of the extensions are only listed if the index must be built.
+    return cached_task_index(resolve_module_option(ns), rebuild=ns.reindex)
 
 
 def get_config_sources(
@@ -163,34 +179,36 @@ class TaskTreeVisitor(Generic[_T]):
         max_depth: Optional[int] = None,
         min_depth: Optional[int] = None,
     ) -> _T:
-        if isinstance(work, list):
-            acc = self.on_list(work, acc)
-
-            for item in work:
-                self.visit(item, acc, max_depth=max_depth, min_depth=min_depth)
-        elif isinstance(work, tuple):
-            acc = self.on_tuple(work, acc)
-
-            for item in work:
-                self.visit(item, acc, max_depth=max_depth, min_depth=min_depth)
-        elif isinstance(work, dict):
-            acc = self.on_dict(work, acc)
-
-            for item in work:
-                self.visit(work[item], acc, max_depth=max_depth, min_depth=min_depth)
-        elif isinstance(work, AbstractTask):
-            if min_depth is None or min_depth <= 0:
-                acc = self.on_task(work, acc)
+        # Pre-order traversal with an explicit stack, so that long chains of tasks do
+        # not hit the recursion limit. Children are pushed in reverse order so that
+        # they are visited from left to right.
+        stack = [(work, max_depth, min_depth)]
+
+        while stack:
+            work, max_depth, min_depth = stack.pop()
+
+            if isinstance(work, list):
+                acc = self.on_list(work, acc)
+                stack.extend((x, max_depth, min_depth) for x in reversed(work))
+            elif isinstance(work, tuple):
+                acc = self.on_tuple(work, acc)
+                stack.extend((x, max_depth, min_depth) for x in reversed(work))
+            elif isinstance(work, dict):
+                acc = self.on_dict(work, acc)
+                stack.extend(
+                    (work[k], max_depth, min_depth) for k in reversed(list(work))
+                )
+            elif isinstance(work, AbstractTask):
+                if min_depth is None or min_depth <= 0:
+                    acc = self.on_task(work, acc)
 
-            new_min_depth = min_depth - 1 if min_depth else None
+                new_min_depth = min_depth - 1 if min_depth else None
 
-            if max_depth is None or max_depth > 0:
-                new_max_depth = max_depth - 1 if max_depth else None
+                if max_depth is None or max_depth > 0:
+                    new_max_depth = max_depth - 1 if max_depth else None
 
-                reqs = work._resolve_requirements(ignore_cache=True)
-                acc = self.visit(
-                    reqs, acc, max_depth=new_max_depth, min_depth=new_min_depth
-                )
+                    reqs = work._resolve_requirements(ignore_cache=True)
+                    stack.append((reqs, new_max_depth, new_min_depth))
 
         return acc
 
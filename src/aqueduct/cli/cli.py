@@ -9,10 +9,10 @@ import sys
 from aqueduct.cli.ls_cli import add_ls_cli_to_parser
 from aqueduct.cli.run_cli import add_run_cli_to_parser
 
-from .base import get_config_sources, resolve_config, resolve_source_modules
+from .base import get_config_sources, resolve_config, resolve_task_index
 from .del_cli import add_del_cli_to_parser
 from .artifact_cli import add_artifact_cli_to_parser
-from ..taskresolve import create_task_index
+from .cluster_cli import add_cluster_cli_to_parser
 
 OmegaConfig: TypeAlias = omegaconf.DictConfig | omegaconf.ListConfig
 
@@ -20,8 +20,7 @@ logger = logging.getLogger(__name__)
 
 
 def config_cli(ns):
-    source_modules = resolve_source_modules(ns)
-    name2task, name2config_source, _ = create_task_index(source_modules)
+    name2task, name2config_source, _ = resolve_task_index(ns).mappings()
 
     config_sources = get_config_sources(
         ns.parameters,
@@ -58,6 +57,14 @@ def cli():
         ),
         default=None,
     )
+    parser.add_argument(
+        "--reindex",
+        action="store_true",
+        help=(
+            "Rebuild the index of tasks instead of using the one persisted by a "
+            "previous invocation."
+        ),
+    )
     parser.set_defaults(func=lambda ns: parser.print_usage())
 
     subparsers = parser.add_subparsers(title="Actions", dest="action")
@@ -108,6 +115,11 @@ def cli():
     artifact_parser = subparsers.add_parser("artifact")
     add_artifact_cli_to_parser(artifact_parser)
 
+    cluster_parser = subparsers.add_parser(
+        "cluster", help="Manage the local Dask cluster shared between invocations."
+    )
+    add_cluster_cli_to_parser(cluster_parser)
+
     ns = parser.parse_args()
 
     level = "DEBUG" if ns.verbose else "INFO"
@@ -0,0 +1,87 @@
+import argparse
+
+from ..backend.dask_cluster import (
+    cluster_file,
+    running_cluster,
+    start_local_cluster,
+    stop_local_cluster,
+)
+
+
+def cluster_start_cli(ns: argparse.Namespace):
+    cluster = running_cluster()
+
+    if cluster is not None:
+        print(f"Local Dask cluster already running at {cluster.address}.")
+        return
+
+    cluster = start_local_cluster(
+        n_workers=ns.n_workers,
+        threads_per_worker=ns.threads_per_worker,
+        memory_limit=ns.memory_limit,
+    )
+    print(f"Started local Dask cluster at {cluster.address}.")
+    print(f"    Workers: {cluster.n_workers}")
+    print(f"    Dashboard: {cluster.dashboard_link}")
+
+
+def cluster_stop_cli(ns: argparse.Namespace):
+    cluster = stop_local_cluster()
+
+    if cluster is None:
+        print("No local Dask cluster is running.")
+    else:
+        print(f"Stopped local Dask cluster at {cluster.address}.")
+
+
+def cluster_status_cli(ns: argparse.Namespace):
+    cluster = running_cluster()
+
+    if cluster is None:
+        print("No local Dask cluster is running.")
+        return
+
+    from dask.distributed import Client
+
+    with Client(cluster.address) as client:
+        workers = client.scheduler_info()["workers"]
+
+    print(f"Local Dask cluster running at {cluster.address}.")
+    print(f"    Workers: {len(workers)}")
+    print(f"    Threads: {sum(w['nthreads'] for w in workers.values())}")
+    print(f"    Dashboard: {cluster.dashboard_link}")
+    print(f"    Process: {cluster.pid}")
+    print(f"    Runtime file: {cluster_file()}")
+
+
+def add_cluster_cli_to_parser(parser: argparse.ArgumentParser):
+    parser.set_defaults(func=lambda ns: parser.print_usage())
+    subparsers = parser.add_subparsers(title="cluster")
+
+    start_parser = subparsers.add_parser(
+        "start", help="Start the local Dask cluster used by `aq run --dask-cluster`."
+    )
+    start_parser.add_argument(
+        "--n-workers",
+        type=int,
+        default=None,
+        help="Number of worker processes. Defaults to one per group of cores.",
+    )
+    start_parser.add_argument(
+        "--threads-per-worker", type=int, default=None, help="Threads of each worker."
+    )
+    start_parser.add_argument(
+        "--memory-limit",
+        type=str,
+        default=None,
+        help="Memory limit of each worker, i.e. `4GB`.",
+    )
+    start_parser.set_defaults(func=cluster_start_cli)
+
+    stop_parser = subparsers.add_parser("stop", help="Stop the local Dask cluster.")
+    stop_parser.set_defaults(func=cluster_stop_cli)
+
+    status_parser = subparsers.add_parser(
+        "status", help="Show the local Dask cluster, if it is running."
+    )
+    status_parser.set_defaults(func=cluster_status_cli)
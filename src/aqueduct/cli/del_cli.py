@@ -2,24 +2,21 @@ import argparse
 import os
 import re
 
-from ..taskresolve import create_task_index, resolve_task_class
 from .base import (
     build_task_from_cli_spec,
-    resolve_source_modules,
+    resolve_task_index,
     accumulate_artifacts_of_tree,
 )
 
 
 def del_cli(ns):
-    project_name_to_module_names = resolve_source_modules(ns)
-
-    name2task, name2config_provider, task_class2module_name = create_task_index(
-        project_name_to_module_names
-    )
+    name2task, name2config_provider, task_class2module_name = resolve_task_index(
+        ns
+    ).mappings()
 
     root_task = build_task_from_cli_spec(ns.task, name2task, name2config_provider)
 
-    BelowClass = resolve_task_class(ns.below) if ns.below is not None else None
+    BelowClass = name2task[ns.below] if ns.below is not None else None
 
     artifacts = accumulate_artifacts_of_tree(
         root_task, [], below=BelowClass, max_depth=ns.max_depth
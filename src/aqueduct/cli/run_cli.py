@@ -1,9 +1,7 @@
 import argparse
 import logging
 import omegaconf
-import pandas as pd
-import xarray as xr
-import numpy as np
+import sys
 from aqueduct.artifact.artifact import Artifact
 from aqueduct.backend import resolve_backend_from_spec
 from aqueduct.backend.base import TaskError
@@ -13,13 +11,12 @@ from .base import (
     downstream_of,
     get_config_sources,
     resolve_config,
-    resolve_source_modules,
+    resolve_task_index,
 )
 from .tasklang import parse_task_spec
 from aqueduct.config import set_config
 from aqueduct.task.abstract_task import AbstractTask
 from aqueduct.task_tree import _map_tasks_in_tree
-from aqueduct.taskresolve import create_task_index
 
 
 logger = logging.getLogger(__name__)
@@ -44,11 +41,9 @@ def print_task_tree(task: AbstractTask, ignore_cache=False):
 
 
 def run_cli(ns: argparse.Namespace):
-    project_name_to_module_names = resolve_source_modules(ns)
-
-    name2task, name2config_provider, task_class2module_name = create_task_index(
-        project_name_to_module_names
-    )
+    name2task, name2config_provider, task_class2module_name = resolve_task_index(
+        ns
+    ).mappings()
 
     root_task = build_task_from_cli_spec(ns.task, name2task, name2config_provider)
     task_class = root_task.__class__
@@ -67,6 +62,12 @@ def run_cli(ns: argparse.Namespace):
         cfg["aqueduct"]["backend"]["type"] = "dask"
         cfg["aqueduct"]["backend"]["address"] = ns.dask_url
 
+    elif ns.dask_cluster is not None:
+        cfg["aqueduct"]["backend"]["type"] = "dask"
+        cfg["aqueduct"]["backend"]["cluster"] = "local"
+        if ns.dask_cluster > 0:
+            cfg["aqueduct"]["backend"]["n_workers"] = ns.dask_cluster
+
     elif ns.dask is not None:
         cfg["aqueduct"]["backend"]["type"] = "dask"
         cfg["aqueduct"]["backend"]["n_workers"] = ns.dask
@@ -75,6 +76,10 @@ def run_cli(ns: argparse.Namespace):
         cfg["aqueduct"]["backend"]["type"] = "multiprocessing"
         cfg["aqueduct"]["backend"]["n_workers"] = ns.multiprocessing
 
+    elif ns.threads is not None:
+        cfg["aqueduct"]["backend"]["type"] = "thread"
+        cfg["aqueduct"]["backend"]["n_workers"] = ns.threads
+
     if ns.cfg:
         print(omegaconf.OmegaConf.to_yaml(cfg, resolve=ns.resolve))
         return
@@ -115,7 +120,7 @@ def run_cli(ns: argparse.Namespace):
             )
             IPython.embed(header=header)
         else:
-            if isinstance(result, (pd.DataFrame, xr.Dataset, Artifact)):
+            if isinstance(result, printable_result_types()):
                 print(result)
     except TaskError as e:
         logger.exception(e)
@@ -123,6 +128,20 @@ def run_cli(ns: argparse.Namespace):
         backend.close()
 
 
+def printable_result_types() -> tuple[type, ...]:
+    """Types of results that are printed after a run. Data frames and datasets can
+    only be returned if pandas or xarray were imported by the task, so these libraries
+    are not imported here."""
+    types: list[type] = [Artifact]
+
+    if "pandas" in sys.modules:
+        types.append(sys.modules["pandas"].DataFrame)
+    if "xarray" in sys.modules:
+        types.append(sys.modules["xarray"].Dataset)
+
+    return tuple(types)
+
+
 def add_run_cli_to_parser(parser: argparse.ArgumentParser):
     parser.add_argument("task", type=str, nargs="+", help="Task specification")
     parser.add_argument(
@@ -163,6 +182,19 @@ def add_run_cli_to_parser(parser: argparse.ArgumentParser):
     backend_group.add_argument("--concurrent", type=int, default=None)
     backend_group.add_argument("--dask-url", type=str, default=None)
     backend_group.add_argument("--dask", type=int, default=None)
+    backend_group.add_argument(
+        "--dask-cluster",
+        type=int,
+        nargs="?",
+        const=0,
+        default=None,
+        metavar="N_WORKERS",
+        help=(
+            "Use the local Dask cluster that is shared between invocations. It is "
+            "started with N_WORKERS workers if it is not running. See `aq cluster`."
+        ),
+    )
     backend_group.add_argument("--multiprocessing", type=int, default=None)
+    backend_group.add_argument("--threads", type=int, default=None)
 
     parser.set_defaults(func=run_cli)
@@ -1,4 +1,19 @@
-from typing import Any, TypeAlias, TypeVar, TYPE_CHECKING, Type, Dict, Mapping
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    Mapping,
+    Optional,
+    TYPE_CHECKING,
+    Type,
+    TypeAlias,
+    TypeVar,
+)
+
+import contextlib
+import contextvars
+import os
+import pathlib
 
 import omegaconf as oc
 
@@ -6,24 +21,57 @@ if TYPE_CHECKING:
     from ..task import AbstractTask
 
 OmegaConfig: TypeAlias = oc.DictConfig | oc.ListConfig
-config: oc.DictConfig = oc.OmegaConf.create()
 
+_process_config: oc.DictConfig = oc.OmegaConf.create()
+
+AQ_CONFIG: contextvars.ContextVar[Optional[oc.DictConfig]] = contextvars.ContextVar(
+    "AQ_CONFIG", default=None
+)
+"""Configuration of the current context, set by :func:`use_config`. When it is
+`None`, the configuration of the process is used."""
 
-def set_config(cfg: OmegaConfig | Dict[Any, Any]):
-    global config
 
+def _as_dict_config(cfg: OmegaConfig | Dict[Any, Any]) -> oc.DictConfig:
     if isinstance(cfg, oc.DictConfig):
-        config = cfg
+        return cfg
     elif isinstance(cfg, oc.ListConfig):
         raise ValueError("Root config must be a DictConfig")
     else:
-        user_config = oc.OmegaConf.create(cfg)
-        config = user_config
+        return oc.OmegaConf.create(cfg)
+
+
+def set_config(cfg: OmegaConfig | Dict[Any, Any]):
+    """Set the configuration. Inside a :func:`use_config` context, only the
+    configuration of that context is replaced. Otherwise, the configuration of the
+    whole process is."""
+    global _process_config
+
+    _section_of_class.clear()
+
+    dict_cfg = _as_dict_config(cfg)
+    if AQ_CONFIG.get() is None:
+        _process_config = dict_cfg
+    else:
+        AQ_CONFIG.set(dict_cfg)
+
+
+@contextlib.contextmanager
+def use_config(cfg: OmegaConfig | Dict[Any, Any]) -> Iterator[oc.DictConfig]:
+    """Use a configuration for the duration of the context. It only applies to the
+    current thread or `asyncio` task, so that pipelines that run concurrently in the
+    same process can each use their own configuration."""
+    dict_cfg = _as_dict_config(cfg)
+
+    token = AQ_CONFIG.set(dict_cfg)
+    try:
+        yield dict_cfg
+    finally:
+        AQ_CONFIG.reset(token)
 
 
 def get_config() -> oc.DictConfig:
-    global config
-    return config
+    cfg = AQ_CONFIG.get()
+    return _process_config if cfg is None else cfg
 
 
 AqueductConfig: TypeAlias = oc.DictConfig
@@ -80,6 +128,64 @@ def resolve_config_from_spec(
         return oc.OmegaConf.create({})
 
 
+_section_of_class: Dict[type, AqueductConfig | tuple[str, bool]] = {}
+"""Where the configuration of task classes is found, by class. Either a configuration
+given by `CONFIG`, or the key of a section of the global configuration, and whether
+that section must exist as a whole."""
+
+
+_empty_class_config: AqueductConfig = oc.OmegaConf.create({}, flags={"readonly": True})
+
+
+def _class_config_section(
+    task_class: Type["AbstractTask"],
+) -> AqueductConfig | tuple[str, bool]:
+    spec = task_class.CONFIG
+
+    if isinstance(spec, oc.DictConfig):
+        return spec
+    elif isinstance(spec, dict):
+        return oc.OmegaConf.create(spec)  # type: ignore
+    elif isinstance(spec, str) and len(spec) > 0:
+        return (spec, False)
+    elif spec is None:
+        return (task_class._fully_qualified_name(), True)
+    else:
+        return oc.OmegaConf.create({})
+
+
+def resolve_class_config(task_class: Type["AbstractTask"]) -> AqueductConfig:
+    """Resolve the configuration of a task class, as specified by its `CONFIG`
+    attribute, like :func:`resolve_config_from_spec`. Where the section lies in the
+    global configuration is computed once per class, but the section is read from the
+    current configuration at every call, so that changes made to the configuration in
+    place are seen."""
+    section = _section_of_class.get(task_class)
+    if section is None:
+        section = _class_config_section(task_class)
+        _section_of_class[task_class] = section
+
+    if not isinstance(section, tuple):
+        return section
+
+    key, whole = section
+    global_cfg = get_config()
+
+    # Walk the keys once, each lookup in a DictConfig is comparatively slow.
+    cursor: Any = global_cfg
+    for k in key.split("."):
+        cursor = cursor.get(k) if isinstance(cursor, oc.DictConfig) else None
+        if cursor is None:
+            break
+
+    if isinstance(cursor, oc.DictConfig):
+        return cursor
+    elif not whole:
+        return get_deep_key(global_cfg, key, {})
+    else:
+        return _empty_class_config
+
+
 def get_aqueduct_config() -> dict:
     cfg = get_config()
 
@@ -87,3 +193,13 @@ def get_aqueduct_config() -> dict:
         return cfg["aqueduct"]
     else:
         return {}
+
+
+def aqueduct_cache_dir() -> pathlib.Path:
+    """Directory where aqueduct persists its caches. Set by the `AQ_CACHE_DIR`
+    environment variable, defaults to `$XDG_CACHE_HOME/aqueduct`."""
+    if "AQ_CACHE_DIR" in os.environ:
+        return pathlib.Path(os.environ["AQ_CACHE_DIR"])
+
+    xdg_cache_home = os.environ.get("XDG_CACHE_HOME", "~/.cache")
+    return pathlib.Path(xdg_cache_home).expanduser() / "aqueduct"
@@ -1,4 +1,3 @@
-import hydra
 import omegaconf
 
 
@@ -8,6 +7,8 @@ class HydraModuleConfigSource:
         self.config_name = config_name
 
     def __call__(self) -> omegaconf.DictConfig:
+        import hydra
+
         with hydra.initialize_config_module(self.module_name, job_name="Aqueduct"):
             cfg = hydra.compose(self.config_name)
 
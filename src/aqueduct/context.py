@@ -0,0 +1,26 @@
+"""The runtime state of aqueduct (configuration, current backend, artifact cache, hash
+memo) is held in context variables, so that pipelines that run concurrently in the
+same process, in different threads or `asyncio` tasks, do not see each other's state.
+
+New threads do not inherit context variables. Functions that are handed to a pool of
+threads must be wrapped with :func:`bind_context`."""
+
+from typing import Callable, TypeVar
+
+import contextvars
+import functools
+
+_T = TypeVar("_T")
+
+
+def bind_context(fn: Callable[..., _T]) -> Callable[..., _T]:
+    """Wrap `fn` so that it runs in a copy of the current context, from whichever
+    thread it is called. Every call gets its own copy, so the wrapper can be called
+    from several threads at the same time."""
+    context = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def run_in_context(*args, **kwargs) -> _T:
+        return context.copy().run(fn, *args, **kwargs)
+
+    return run_in_context
@@ -55,6 +55,23 @@ class AbstractTask(Generic[_T], metaclass=WrapInitMeta):
     """If set, sent through `pd.to_datetime`. Any artifacts older than the resulting
     date are considered stale and recomputed."""
 
+    AQ_PRIORITY: Optional[int] = None
+    """Priority of the task on a :class:`DaskBackend`. Among the tasks that are ready
+    to run, the ones with the highest priority are scheduled first."""
+
+    AQ_RETRIES: Optional[int] = None
+    """Number of times a :class:`DaskBackend` runs the task again if it fails, for
+    instance because its worker died."""
+
+    AQ_RESOURCES: Optional[dict[str, float]] = None
+    """Resources, such as `{"memory": 32e9}`, that a worker of a :class:`DaskBackend`
+    must have available to run the task. Workers declare their resources when they
+    are started, and a worker that declares none never runs the task."""
+
+    AQ_WORKERS: Optional[list[str]] = None
+    """Addresses or names of the workers of a :class:`DaskBackend` that may run the
+    task."""
+
     def __init__(self):
         """The __init__ method of a :class:`Task` automatically retrieves the value of
         its arguments from the configuration if they are not provided. See
@@ -1,41 +1,71 @@
-import dask.base
 import functools
 import inspect
-from typing import cast, Type, Callable, Any, TYPE_CHECKING, Mapping, Tuple
-
-from ..config import AqueductConfig, resolve_config_from_spec
+import itertools
+from typing import (
+    cast,
+    Type,
+    Callable,
+    Any,
+    TYPE_CHECKING,
+    Iterable,
+    Mapping,
+    Sequence,
+    Tuple,
+)
+
+from ..config import AqueductConfig, resolve_class_config
+from .hashing import hash_task_arguments
 
 if TYPE_CHECKING:
     from .abstract_task import AbstractTask
 
 
-def fetch_bind_from_config(
-    cfg: Mapping[str, Any], fn: Callable, *args, **kwargs: Mapping[str, Any]
+def configurable_parameters(signature: inspect.Signature) -> list[str]:
+    """Names of the parameters of a signature that can be fetched from config."""
+    return [
+        p for p in signature.parameters if p not in ["self", "args", "kwargs", "*", "/"]
+    ]
+
+
+def bind_from_config(
+    cfg: Mapping[str, Any],
+    signature: inspect.Signature,
+    parameters: list[str],
+    args: tuple,
+    kwargs: Mapping[str, Any],
+    fallback_cfgs: Iterable[Mapping[str, Any]] = (),
 ) -> inspect.BoundArguments:
-    signature = inspect.signature(fn)
+    """Same as `fetch_bind_from_config`, for a signature and a list of configurable
+    parameters that were computed beforehand. Parameters that are not in `cfg` are
+    looked up in `fallback_cfgs`, in order."""
     bind = signature.bind_partial(*args, **kwargs)
 
-    for p in signature.parameters:
-        # Find all arguments which do not have a defined value.
-        was_specified_by_user = p in bind.arguments
-        # has_no_default_value = signature.parameters[p].default != inspect._empty
+    # Here I do not check if the parameters have a default value, I'm still undecided
+    # as to if we should fetch args from config even if they are positional.
+    for c in itertools.chain([cfg], fallback_cfgs):
+        if all(p in bind.arguments for p in parameters):
+            break
 
-        # Here I commented out `has_no_default_value`, I'm still undecided as to if
-        # we should fetch args from config even if they are positional.
-
-        if (
-            p not in ["self", "args", "kwargs", "*", "/"]
-            and not was_specified_by_user
-            # and has_no_default_value
-        ):
-            if p in cfg:
-                bind.arguments[p] = cfg[p]
+        if len(c) > 0:
+            for p in parameters:
+                # Find all arguments which do not have a defined value.
+                if p not in bind.arguments and p in c:
+                    bind.arguments[p] = c[p]
 
     bind.apply_defaults()
 
     return bind
 
 
+def fetch_bind_from_config(
+    cfg: Mapping[str, Any], fn: Callable, *args, **kwargs: Mapping[str, Any]
+) -> inspect.BoundArguments:
+    signature = inspect.signature(fn)
+    return bind_from_config(
+        cfg, signature, configurable_parameters(signature), args, kwargs
+    )
+
+
 def fetch_args_from_config(
     cfg: Mapping[str, Any], fn: Callable, *args, **kwargs: Mapping[str, Any]
 ) -> Tuple[Tuple, Mapping[str, Any]]:
@@ -58,34 +88,74 @@ def fetch_args_from_config(
     return bind.args, bind.kwargs
 
 
-def init_wrapper(task_class: Type["AbstractTask"], fn):
+def init_wrapper(
+    task_class: Type["AbstractTask"],
+    fn,
+    parent_classes: Sequence[Type["AbstractTask"]] = (),
+):
+    """Wrap the `__init__` of a task class so that missing arguments are fetched from
+    the configuration of the class. When `__init__` is inherited, the configuration of
+    the classes in `parent_classes`, up to the one that defines it, is used for the
+    arguments that the configuration of `task_class` does not provide."""
+    # The signature only depends on the class, compute it once.
+    signature = inspect.signature(fn)
+    parameters = configurable_parameters(signature)
+
     @functools.wraps(fn)
     def wrapped_init(self, *args, **kwargs):
-        cfg = resolve_config_from_spec(task_class.CONFIG, task_class)
-
-        bind = fetch_bind_from_config(cfg, fn, self, *args, **kwargs)
+        cfg = resolve_class_config(task_class)
+        fallback_cfgs = (resolve_class_config(c) for c in parent_classes)
 
-        if hasattr(self, "AQ_HASH_EXCLUDE"):
-            for arg in self.AQ_HASH_EXCLUDE:
-                if arg in bind.arguments:
-                    del bind.arguments[arg]
+        bind = bind_from_config(
+            cfg, signature, parameters, (self, *args), kwargs, fallback_cfgs
+        )
 
         new_args, new_kwargs = bind.args, bind.kwargs
 
-        # Remove self from new_args
-        self._args_hash = dask.base.tokenize(
-            self._fully_qualified_name(), *new_args[1:], **new_kwargs
+        if hasattr(self, "AQ_HASH_EXCLUDE"):
+            # Hash a copy of the arguments, the task still receives all of them.
+            hash_bind = inspect.BoundArguments(signature, bind.arguments.copy())
+            for arg in self.AQ_HASH_EXCLUDE:
+                if arg in hash_bind.arguments:
+                    del hash_bind.arguments[arg]
+            hash_args, hash_kwargs = hash_bind.args, hash_bind.kwargs
+        else:
+            hash_args, hash_kwargs = new_args, new_kwargs
+
+        # Remove self from the hashed args.
+        self._args_hash = hash_task_arguments(
+            type(self), self._fully_qualified_name(), hash_args[1:], hash_kwargs
         )
         self._args = new_args
         self._kwargs = new_kwargs
 
         return fn(*new_args, **new_kwargs)
 
+    wrapped_init._aq_init_wrapper = True  # type: ignore
     return wrapped_init
 
 
 class WrapInitMeta(type):
     def __new__(cls, name, bases, dct, **kwds):
         x = super().__new__(cls, name, bases, dct, **kwds)
-        x.__init__ = init_wrapper(x, x.__init__)  # type: ignore
+
+        # If the __init__ is inherited, wrap the original function rather than the
+        # wrapper of the parent class, so that arguments are resolved only once. The
+        # configuration of the parents that inherit it, and of the class that defines
+        # it, still provides the arguments missing from the configuration of `x`.
+        init = x.__init__  # type: ignore
+        parent_classes = []
+        if "__init__" not in dct and getattr(init, "_aq_init_wrapper", False):
+            init = init.__wrapped__
+
+            for parent in x.__mro__[1:]:
+                parent_init = vars(parent).get("__init__")
+                if parent_init is None:
+                    continue
+                if getattr(parent_init, "__wrapped__", None) is not init:
+                    break
+
+                parent_classes.append(parent)
+
+        x.__init__ = init_wrapper(x, init, parent_classes)  # type: ignore
         return x
@@ -1,10 +1,9 @@
-from typing import Any, Callable, TypeVar, Type
+from typing import Any, Callable, TypeVar, Type, TYPE_CHECKING
 
 import logging
-import pandas as pd
-import xarray as xr
 import pathlib
 import pickle
+import sys
 
 from ..artifact import (
     Artifact,
@@ -12,38 +11,80 @@ from ..artifact import (
     InMemoryArtifact,
     CompositeArtifact,
 )
+from ..artifact.cache import invalidate_artifact
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import xarray as xr
 
 _T = TypeVar("_T")
 
 _logger = logging.getLogger(__name__)
 
 
-def write_to_parquet(df: pd.DataFrame, path: str):
+def write_to_parquet(df: "pd.DataFrame", path: str):
     df.to_parquet(path)
 
 
-def write_to_netcdf(array: xr.Dataset | xr.DataArray, path: str):
+def write_to_netcdf(array: "xr.Dataset | xr.DataArray", path: str):
     array.to_netcdf(path)
     array.close()
 
 
-READER_OF_TYPE = {
-    pd.DataFrame: pd.read_parquet,
-    xr.Dataset: xr.open_dataset,
-    xr.DataArray: xr.open_dataarray,
-}
+def read_parquet(path: str) -> "pd.DataFrame":
+    import pandas as pd
+
+    return pd.read_parquet(path)
+
+
+def open_netcdf_dataset(path: str) -> "xr.Dataset":
+    import xarray as xr
+
+    return xr.open_dataset(path)
+
+
+def open_netcdf_dataarray(path: str) -> "xr.DataArray":
+    import xarray as xr
+
+    return xr.open_dataarray(path)
+
+
+READER_OF_TYPE: dict[type, Callable[[str], Any]] = {}
 
 READER_OF_SUFFIX = {
-    ".parquet": pd.read_parquet,
-    ".nc": xr.open_dataset,
+    ".parquet": read_parquet,
+    ".nc": open_netcdf_dataset,
 }
 
 
-WRITERS = {
-    pd.DataFrame: write_to_parquet,
-    xr.Dataset: write_to_netcdf,
-    xr.DataArray: write_to_netcdf,
+WRITERS: dict[type, Callable[[Any, str], None]] = {}
+
+
+def register_pandas_io(pd):
+    READER_OF_TYPE[pd.DataFrame] = read_parquet
+    WRITERS[pd.DataFrame] = write_to_parquet
+
+
+def register_xarray_io(xr):
+    READER_OF_TYPE[xr.Dataset] = open_netcdf_dataset
+    READER_OF_TYPE[xr.DataArray] = open_netcdf_dataarray
+    WRITERS[xr.Dataset] = write_to_netcdf
+    WRITERS[xr.DataArray] = write_to_netcdf
+
+
+LIBRARY_IO = {
+    "pandas": register_pandas_io,
+    "xarray": register_xarray_io,
 }
+"""Functions that register the readers and writers of the types of a library. Objects
+of these types can only exist once their library was imported, so the library is not
+imported by aqueduct. Its IO is registered the first time a reader or writer is
+resolved after it was imported."""
+
+
+def register_library_io():
+    for name in [n for n in LIBRARY_IO if n in sys.modules]:
+        LIBRARY_IO.pop(name)(sys.modules[name])
 
 
 def pickle_write_to_file(object: Any, path: str):
@@ -61,6 +102,8 @@ DEFAULT_WRITER = pickle_write_to_file
 
 
 def resolve_writer(t: Type[_T] | None) -> Callable[[_T, str], None]:
+    register_library_io()
+
     if t is not None and t in WRITERS:
         return WRITERS[t]
     else:
@@ -69,6 +112,7 @@ def resolve_writer(t: Type[_T] | None) -> Callable[[_T, str], None]:
 
 def resolve_reader(t: Type[_T] | None, filename: pathlib.Path) -> Callable[[str], _T]:
     suffix = filename.suffix
+    register_library_io()
 
     if t is not None and t in READER_OF_TYPE:
         return READER_OF_TYPE[t]
@@ -86,6 +130,8 @@ def store_artifact(artifact: Artifact, object: Any):
     else:
         raise ValueError(f"Artifact {artifact} not supported for automatic storage.")
 
+    invalidate_artifact(artifact)
+
 
 def store_artifact_filesystem(
     artifact: LocalFilesystemArtifact,
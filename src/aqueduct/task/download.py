@@ -1,6 +1,4 @@
 import logging
-import requests
-import tqdm
 import pathlib
 
 from ..artifact import LocalStoreArtifact
@@ -17,6 +15,9 @@ class DownloadFile(Task):
         self.target = pathlib.Path(target)
 
     def run(self):
+        import requests
+        import tqdm
+
         head_response = requests.head(self.url)
 
         size = int(head_response.headers["content-length"])
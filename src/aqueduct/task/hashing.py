@@ -0,0 +1,364 @@
+"""Hashing of task arguments, used to build the `_unique_key` of tasks.
+
+Arguments are serialized to a canonical byte representation, which is fed to a hash
+function. The representation only depends on the value of the arguments, so that keys
+are stable across processes and interpreter sessions. Builtin types, numpy arrays and
+pandas objects are handled directly. Other types can be registered with
+:func:`register_hasher`, and fall back to `dask.base.tokenize` otherwise.
+
+The hash algorithm is set by the `aqueduct.hash_algorithm` configuration option. It
+can be any algorithm supported by `hashlib`, and defaults to `blake2b`."""
+
+from typing import Any, Callable, Iterator, Optional, Type
+
+import contextlib
+import contextvars
+import dataclasses
+import datetime
+import enum
+import hashlib
+import logging
+import pathlib
+import struct
+import sys
+import threading
+import time
+import weakref
+
+from ..config import get_aqueduct_config, get_config
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_HASH_ALGORITHM = "blake2b"
+
+HASHERS: dict[type, Callable[[Any], bytes]] = {}
+"""Functions that serialize objects of a given type to bytes, for the purpose of
+hashing them. See :func:`register_hasher`."""
+
+
+def register_hasher(t: type, fn: Callable[[Any], bytes]):
+    """Register a function that produces the bytes that identify objects of type `t`.
+    Two objects that should be considered as the same task argument must produce the
+    same bytes, in any process."""
+    HASHERS[t] = fn
+
+
+_algorithm_of_config: tuple[Any, str] = (None, DEFAULT_HASH_ALGORITHM)
+
+
+def resolve_hash_algorithm() -> str:
+    """Name of the hash algorithm specified in the configuration. The configuration is
+    only read again when another configuration object is in use."""
+    global _algorithm_of_config
+
+    cfg = get_config()
+    cached_cfg, algorithm = _algorithm_of_config
+
+    if cached_cfg is not cfg:
+        algorithm = get_aqueduct_config().get("hash_algorithm", DEFAULT_HASH_ALGORITHM)
+        _algorithm_of_config = (cfg, algorithm)
+
+    return algorithm
+
+
+def new_hash(algorithm: str):
+    if algorithm == "blake2b":
+        # Same length as the md5 digests dask uses to tokenize.
+        return hashlib.blake2b(digest_size=16)
+    else:
+        return hashlib.new(algorithm)
+
+
+MEMO_MIN_LENGTH = 64
+"""Containers with at least this many elements are hashed separately, and their digest
+is written in the representation of the object that contains them."""
+
+MEMO_MIN_NBYTES = 4096
+"""Read-only arrays with at least this many bytes are memoized."""
+
+AQ_HASH_MEMO: contextvars.ContextVar[
+    Optional[dict[int, tuple[weakref.ref, bytes]]]
+] = contextvars.ContextVar("AQ_HASH_MEMO", default=None)
+_memo_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def hash_memo() -> Iterator[dict]:
+    """Memoize the digest of large read-only numpy arrays by object identity for the
+    duration of the context. Backends activate it for the duration of a run.
+
+    Only arrays whose content cannot change are memoized: neither the array nor the
+    arrays it is a view of are writeable. Set `array.flags.writeable = False` on large
+    arrays that are passed to many tasks. The memo only holds weak references to the
+    arrays, and forgets them once they are garbage collected."""
+    active = AQ_HASH_MEMO.get()
+    if active is not None:
+        yield active
+        return
+
+    memo: dict[int, tuple[weakref.ref, bytes]] = {}
+    token = AQ_HASH_MEMO.set(memo)
+    try:
+        yield memo
+    finally:
+        AQ_HASH_MEMO.reset(token)
+
+
+def _write(h, tag: bytes, payload: bytes):
+    h.update(tag)
+    h.update(struct.pack("<Q", len(payload)))
+    h.update(payload)
+
+
+def _qualified_name(t: type) -> bytes:
+    return f"{t.__module__}.{t.__qualname__}".encode()
+
+
+def _write_object(h, o: Any, algorithm: str):
+    t = type(o)
+
+    if o is None:
+        h.update(b"N")
+    elif t is bool:
+        h.update(b"T" if o else b"F")
+    elif t is int:
+        _write(h, b"i", str(o).encode())
+    elif t is float:
+        _write(h, b"f", struct.pack("<d", o))
+    elif t is str:
+        _write(h, b"s", o.encode("utf-8", "surrogatepass"))
+    elif t is bytes:
+        _write(h, b"b", o)
+    elif t in (list, tuple, dict, set, frozenset):
+        # Containers are mutable, or may hold mutable objects, so they are not
+        # memoized. Large ones keep their own digest in the representation.
+        if len(o) >= MEMO_MIN_LENGTH:
+            _write(h, b"m", _digest(o, algorithm, _write_container))
+        else:
+            _write_container(h, o, algorithm)
+    else:
+        _write_other(h, o, algorithm)
+
+
+def _write_container(h, o: Any, algorithm: str):
+    t = type(o)
+
+    if t is list or t is tuple:
+        h.update(b"l" if t is list else b"t")
+        h.update(struct.pack("<Q", len(o)))
+        for x in o:
+            _write_object(h, x, algorithm)
+    elif t is dict and all(type(k) is str for k in o):
+        # Dictionaries are identified by their content, regardless of insertion order.
+        h.update(b"D")
+        h.update(struct.pack("<Q", len(o)))
+        for k in sorted(o):
+            _write(h, b"s", k.encode("utf-8", "surrogatepass"))
+            _write_object(h, o[k], algorithm)
+    elif t is dict:
+        items = sorted(
+            (hash_object(k, algorithm), hash_object(v, algorithm)) for k, v in o.items()
+        )
+        h.update(b"d")
+        h.update(struct.pack("<Q", len(items)))
+        for k, v in items:
+            h.update(k)
+            h.update(v)
+    else:
+        digests = sorted(hash_object(x, algorithm) for x in o)
+        h.update(b"S")
+        h.update(struct.pack("<Q", len(digests)))
+        for d in digests:
+            h.update(d)
+
+
+def _write_other(h, o: Any, algorithm: str):
+    from .abstract_task import AbstractTask
+
+    t = type(o)
+
+    hasher = HASHERS.get(t)
+    if hasher is None:
+        for registered_type in HASHERS:
+            if isinstance(o, registered_type):
+                hasher = HASHERS[registered_type]
+                break
+
+    if hasher is not None:
+        _write(h, b"r", _qualified_name(t))
+        _write(h, b"p", hasher(o))
+        return
+
+    # Only look for numpy and pandas objects if these libraries were imported.
+    np = sys.modules.get("numpy")
+    pd = sys.modules.get("pandas")
+
+    if isinstance(o, AbstractTask):
+        _write(h, b"k", o._unique_key().encode())
+    elif isinstance(o, type):
+        _write(h, b"c", _qualified_name(o))
+    elif isinstance(o, enum.Enum):
+        _write(h, b"e", _qualified_name(t))
+        _write_object(h, o.value, algorithm)
+    elif isinstance(o, (pathlib.PurePath, datetime.date, datetime.time)):
+        _write(h, b"o", _qualified_name(t))
+        _write(h, b"v", str(o).encode())
+    elif np is not None and isinstance(o, np.ndarray) and o.dtype != object:
+        if o.nbytes < MEMO_MIN_NBYTES:
+            _write_numpy_array(h, o, algorithm)
+        elif _is_read_only_array(o):
+            _write(h, b"A", _memoized_digest(o, algorithm, _write_numpy_array))
+        else:
+            _write(h, b"A", _digest(o, algorithm, _write_numpy_array))
+    elif np is not None and isinstance(o, np.generic):
+        _write(h, b"g", o.dtype.str.encode())
+        _write(h, b"v", o.tobytes())
+    elif pd is not None and isinstance(o, (pd.DataFrame, pd.Series, pd.Index)):
+        _write(h, b"P", _digest(o, algorithm, _write_pandas_object))
+    elif _is_omegaconf_container(o):
+        import omegaconf
+
+        _write_object(h, omegaconf.OmegaConf.to_container(o, resolve=True), algorithm)
+    else:
+        import dask.base
+
+        _write(h, b"?", dask.base.tokenize(o).encode())
+
+
+def _is_omegaconf_container(o: Any) -> bool:
+    omegaconf = sys.modules.get("omegaconf")
+    return omegaconf is not None and isinstance(o, omegaconf.Container)
+
+
+def _is_read_only_array(a: Any) -> bool:
+    """Whether the content of an array cannot change. Its data must not be writeable
+    through the array nor through the arrays it is a view of, and must not belong to
+    a mutable buffer."""
+    import numpy as np
+
+    while isinstance(a, np.ndarray):
+        if a.flags.writeable:
+            return False
+        a = a.base
+
+    return a is None or isinstance(a, bytes)
+
+
+def _write_numpy_array(h, a: Any, algorithm: str):
+    import numpy as np
+
+    h.update(b"a")
+    _write(h, b"d", a.dtype.str.encode())
+    _write(h, b"s", str(a.shape).encode())
+    h.update(np.ascontiguousarray(a).data)
+
+
+def _write_pandas_object(h, o: Any, algorithm: str):
+    import pandas as pd
+
+    _write(h, b"t", _qualified_name(type(o)))
+
+    if isinstance(o, pd.DataFrame):
+        _write_object(h, [str(c) for c in o.columns], algorithm)
+        _write_object(h, [str(d) for d in o.dtypes], algorithm)
+    elif isinstance(o, pd.Series):
+        _write_object(h, [str(o.name), str(o.dtype)], algorithm)
+    else:
+        _write_object(h, str(o.dtype), algorithm)
+
+    _write_numpy_array(h, pd.util.hash_pandas_object(o).to_numpy(), algorithm)
+
+
+def _digest(o: Any, algorithm: str, write_fn: Callable) -> bytes:
+    h = new_hash(algorithm)
+    write_fn(h, o, algorithm)
+    return h.digest()
+
+
+def _memoized_digest(o: Any, algorithm: str, write_fn: Callable) -> bytes:
+    """Digest of an object that cannot change, memoized by identity while a memo is
+    active. The object must support weak references."""
+    memo = AQ_HASH_MEMO.get()
+    if memo is None:
+        return _digest(o, algorithm, write_fn)
+
+    key = id(o)
+    cached = memo.get(key)
+    if cached is not None and cached[0]() is o:
+        return cached[1]
+
+    digest = _digest(o, algorithm, write_fn)
+
+    def forget(ref: weakref.ref):
+        with _memo_lock:
+            if memo.get(key, (None,))[0] is ref:
+                del memo[key]
+
+    with _memo_lock:
+        memo[key] = (weakref.ref(o, forget), digest)
+
+    return digest
+
+
+def hash_object(o: Any, algorithm: Optional[str] = None) -> bytes:
+    """Compute the digest of an object."""
+    if algorithm is None:
+        algorithm = resolve_hash_algorithm()
+
+    h = new_hash(algorithm)
+    _write_object(h, o, algorithm)
+    return h.digest()
+
+
+@dataclasses.dataclass
+class HashingStatistics:
+    count: int = 0
+    elapsed: float = 0.0
+
+
+HASHING_STATISTICS: dict[Type, HashingStatistics] = {}
+_statistics_lock = threading.Lock()
+
+
+def hash_task_arguments(
+    task_class: Type, fully_qualified_name: str, args: tuple, kwargs: dict
+) -> str:
+    """Compute the hash that identifies a task from its arguments. The time spent is
+    accumulated in `HASHING_STATISTICS`."""
+    start = time.perf_counter()
+
+    algorithm = resolve_hash_algorithm()
+    h = new_hash(algorithm)
+    _write(h, b"n", fully_qualified_name.encode())
+    _write_object(h, args, algorithm)
+    _write_object(h, kwargs, algorithm)
+    digest = h.hexdigest()
+    elapsed = time.perf_counter() - start
+
+    # Tasks are instantiated from several threads by the thread and asyncio backends.
+    with _statistics_lock:
+        statistics = HASHING_STATISTICS.get(task_class)
+        if statistics is None:
+            statistics = HASHING_STATISTICS[task_class] = HashingStatistics()
+        statistics.count += 1
+        statistics.elapsed += elapsed
+
+    return digest
+
+
+def hashing_report() -> list[tuple[str, HashingStatistics]]:
+    """Time spent hashing task arguments, by task class, most expensive first."""
+    with _statistics_lock:
+        report = [
+            (t.__qualname__, dataclasses.replace(s))
+            for t, s in HASHING_STATISTICS.items()
+        ]
+    return sorted(report, key=lambda x: x[1].elapsed, reverse=True)
+
+
+def log_hashing_report(n_classes: int = 5):
+    for name, statistics in hashing_report()[:n_classes]:
+        _logger.debug(
+            f"Hashed {statistics.count} {name} in {statistics.elapsed:.3f}s "
+            f"({1e6 * statistics.elapsed / statistics.count:.1f}us per task)."
+        )
@@ -1,4 +1,4 @@
-from typing import Iterable, TYPE_CHECKING, Generic, TypeVar
+from typing import Iterable, Literal, Optional, TYPE_CHECKING, Generic, TypeVar
 
 from .abstract_task import AbstractTask
 
@@ -13,6 +13,17 @@ _U = TypeVar("_U")
 class AbstractMapReduceTask(AbstractTask, Generic[_T, _A, _U]):
     """"""
 
+    AQ_BATCH_SIZE: int | Literal["auto"] | None = None
+    """Number of items mapped and reduced by each task of a :class:`DaskBackend` graph.
+    If `"auto"`, it is chosen from the time per item measured in previous runs, see
+    :mod:`aqueduct.backend.map_statistics`. If `None`, the options of the backend
+    apply."""
+
+    AQ_FAN_IN: Optional[int] = None
+    """Number of partial accumulators that are combined by each task of the reduction
+    tree of a :class:`DaskBackend` graph. If `None`, the options of the backend
+    apply."""
+
     def items(self) -> Iterable:
         """The list of input items to be processed in parallel."""
         raise NotImplementedError()
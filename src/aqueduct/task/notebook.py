@@ -5,14 +5,8 @@ import base64
 from aqueduct.artifact import Artifact
 import cloudpickle
 import importlib.util
-import jupyter_client
 import logging
-import nbclient.client
-import nbclient.exceptions
-import nbconvert
-import nbformat
 import pathlib
-import tqdm
 
 from ..artifact import (
     TextStreamArtifactSpec,
@@ -29,8 +23,14 @@ from ..task import Task
 import aqueduct.backend.backend
 
 if TYPE_CHECKING:
+    import nbconvert
+    import nbformat
+
     from ..backend import BackendSpec
 
+# The Jupyter libraries (nbclient, nbconvert, nbformat, jupyter_client) are slow to
+# import. They are only imported when a notebook is executed or exported.
+
 
 class FullNotebookExportSpec(TypedDict):
     format: str
@@ -57,8 +57,8 @@ def object_to_payload_program(object: Optional[Any] = None) -> str:
 
 def export_notebook(
     artifact: TextStreamArtifact,
-    exporter: nbconvert.Exporter,
-    notebook: nbformat.NotebookNode,
+    exporter: "nbconvert.Exporter",
+    notebook: "nbformat.NotebookNode",
 ):
     exported, _ = exporter.from_notebook_node(notebook)
     artifact.dump_text(exported)
@@ -75,7 +75,9 @@ EXTENSION_OF_EXPORTER_NAME = {
 
 def resolve_notebook_export_spec(
     spec: NotebookExportSpec,
-) -> Callable[[nbformat.NotebookNode], None]:
+) -> Callable[["nbformat.NotebookNode"], None]:
+    import nbconvert
+
     if isinstance(spec, (str, pathlib.Path)):
         path = pathlib.Path(spec)
 
@@ -144,6 +146,12 @@ class NotebookTask(Task):
             return super()._resolve_requirements(ignore_cache=ignore_cache)
 
     def run(self, requirements=None):
+        import jupyter_client.manager
+        import nbclient.client
+        import nbclient.exceptions
+        import nbformat
+        import tqdm
+
         notebook_path = self._resolve_notebook()
 
         with open(notebook_path) as f:
@@ -199,12 +207,11 @@ class NotebookTask(Task):
         config_load_program = object_to_payload_program(cfg)
 
         _logger.info("Serializing backend...")
-        if aqueduct.backend.backend.AQ_CURRENT_BACKEND is None:
+        backend = aqueduct.backend.backend.get_current_backend()
+        if backend is None:
             raise RuntimeError("Inside task but not backend is defined.")
 
-        backend_load_program = object_to_payload_program(
-            aqueduct.backend.backend.AQ_CURRENT_BACKEND._spec()
-        )
+        backend_load_program = object_to_payload_program(backend._spec())
 
         injected_code = ";\n".join(
             [
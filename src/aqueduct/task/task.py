@@ -2,10 +2,6 @@ from typing import Generic, Type, TypeVar, Optional
 
 import logging
 
-
-import pandas as pd
-import xarray as xr
-
 from aqueduct.task.mapreduce import MapReduceTask
 
 from .abstract_task import AbstractTask
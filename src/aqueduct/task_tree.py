@@ -1,6 +1,7 @@
 """New task tree resolution module, with more options. Should gradually replace the 
 functions in .util."""
 
+import dataclasses
 from typing import (
     Any,
     Callable,
@@ -34,20 +35,25 @@ def reduce_type_in_tree(
     reduce_fn: Callable[[_T, _A], _A],
     acc: _A,
 ) -> _A:
-    if isinstance(tree, (list, tuple)):
-        for x in tree:
-            acc = reduce_type_in_tree(x, type, reduce_fn, acc)
-        return acc
-    elif isinstance(tree, dict):
-        for v in tree.values():
-            acc = reduce_type_in_tree(v, type, reduce_fn, acc)
-        return acc
-    elif isinstance(tree, type):
-        return reduce_fn(tree, acc)
-    elif tree is None:
-        return acc
-    else:
-        raise ValueError(f"Could not handle tree node {tree}.")
+    # The tree is explored with an explicit stack rather than recursively, so that
+    # deeply nested trees do not hit the recursion limit. Children are pushed in
+    # reverse order so that they are reduced from left to right.
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+
+        if isinstance(node, (list, tuple)):
+            stack.extend(reversed(node))
+        elif isinstance(node, dict):
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, type):
+            acc = reduce_fn(node, acc)
+        elif node is None:
+            continue
+        else:
+            raise ValueError(f"Could not handle tree node {node}.")
+
+    return acc
 
 
 def gather_tasks_in_tree(tree: TypeTree["AbstractTask"]) -> list["AbstractTask"]:
@@ -63,6 +69,22 @@ def gather_tasks_in_tree(tree: TypeTree["AbstractTask"]) -> list["AbstractTask"]
 OneExpandCallback: TypeAlias = Callable[[list | tuple | dict], None]
 
 
+def _children_of_container(container: list | tuple | dict) -> list:
+    if isinstance(container, dict):
+        return list(container.values())
+    else:
+        return list(container)
+
+
+def _rebuild_container(container: list | tuple | dict, mapped: list) -> Any:
+    if isinstance(container, list):
+        return mapped
+    elif isinstance(container, tuple):
+        return tuple(mapped)
+    else:
+        return {k: v for k, v in zip(container.keys(), mapped)}
+
+
 @overload
 def _map_type_in_tree(
     tree: list,
@@ -126,32 +148,47 @@ def _map_type_in_tree(
     before_map: Optional[Callable[[_T], None]] = None,
     after_map: Optional[Callable[[_U], None]] = None,
 ) -> Any:
-    if isinstance(tree, (list, tuple, dict)):
-        if on_expand is not None:
-            on_expand(tree)
-
-        kwargs = {
-            "on_expand": on_expand,
-            "before_map": before_map,
-            "after_map": after_map,
-        }
-
-        if isinstance(tree, list):
-            return [_map_type_in_tree(x, type, map_fn, **kwargs) for x in tree]
-        elif isinstance(tree, tuple):
-            return tuple([_map_type_in_tree(x, type, map_fn, **kwargs) for x in tree])
-        elif isinstance(tree, dict):
-            return {k: _map_type_in_tree(tree[k], type, map_fn, **kwargs) for k in tree}
-    elif isinstance(tree, type):
-        if before_map:
-            before_map(tree)
-        mapped = map_fn(tree)
-        if after_map:
-            after_map(mapped)
+    def map_leaf(leaf: Any) -> Any:
+        if isinstance(leaf, type):
+            if before_map:
+                before_map(leaf)
+            mapped = map_fn(leaf)
+            if after_map:
+                after_map(mapped)
+
+            return mapped
+        else:
+            raise ValueError(f"Could not handle tree node {leaf}.")
 
-        return mapped
-    else:
-        raise ValueError(f"Could not handle tree node {tree}.")
+    if not isinstance(tree, (list, tuple, dict)):
+        return map_leaf(tree)
+
+    if on_expand is not None:
+        on_expand(tree)
+
+    # Explicit stack of (container, children, mapped children) frames. A container
+    # is rebuilt once all its children have been mapped.
+    stack = [(tree, _children_of_container(tree), [])]
+    while True:
+        container, children, mapped = stack[-1]
+
+        if len(mapped) < len(children):
+            child = children[len(mapped)]
+
+            if isinstance(child, (list, tuple, dict)):
+                if on_expand is not None:
+                    on_expand(child)
+                stack.append((child, _children_of_container(child), []))
+            else:
+                mapped.append(map_leaf(child))
+        else:
+            stack.pop()
+            rebuilt = _rebuild_container(container, mapped)
+
+            if stack:
+                stack[-1][2].append(rebuilt)
+            else:
+                return rebuilt
 
 
 def _map_tasks_in_tree(
@@ -164,29 +201,177 @@ def _map_tasks_in_tree(
     return _map_type_in_tree(tree, AbstractTask, map_fn, **kwargs)
 
 
+@dataclasses.dataclass
+class TaskNode:
+    """A node of a :class:`TaskGraph`. Holds one task, along with the requirements
+    tree it was expanded into and the keys of the tasks it depends on."""
+
+    task: "AbstractTask"
+    requirements: TaskTree = None
+    dependencies: list[str] = dataclasses.field(default_factory=list)
+
+
+TaskGraph: TypeAlias = dict[str, TaskNode]
+"""Mapping of task unique keys to nodes. The insertion order of the dict is a
+topological order of the graph: a node always comes after all its dependencies."""
+
+
+def _is_forced(task: "AbstractTask", force_tasks) -> bool:
+    if force_tasks:
+        return any([issubclass(task.__class__, c) for c in force_tasks])
+    else:
+        return False
+
+
+def build_task_graph(
+    work: TaskTree,
+    ignore_cache=False,
+    force_tasks: Optional[set[Type["AbstractTask"]]] = None,
+) -> TaskGraph:
+    """Expand a task tree into a DAG where every task appears exactly once, no
+    matter how many tasks require it. Tasks are identified by their
+    `_unique_key`.
+
+    Arguments:
+        work: The task tree to expand.
+        ignore_cache: If `True`, expand the requirements of cached tasks too.
+        force_tasks: Expand the requirements of these task classes even if they are
+            cached.
+
+    Returns:
+        The graph, in topological order."""
+    graph: TaskGraph = {}
+
+    def expand(task: "AbstractTask", key: str) -> tuple:
+        requirements = task._resolve_requirements(
+            ignore_cache=ignore_cache or _is_forced(task, force_tasks)
+        )
+        children = [(t, t._unique_key()) for t in gather_tasks_in_tree(requirements)]
+
+        return task, key, requirements, children, [0]
+
+    # Depth-first traversal with an explicit stack, so that long chains of tasks do
+    # not hit the recursion limit. A node is inserted in the graph once all its
+    # dependencies have been, which keeps the graph topologically sorted.
+    in_progress = set()
+    for root in gather_tasks_in_tree(work):
+        root_key = root._unique_key()
+        if root_key in graph:
+            continue
+
+        stack = [expand(root, root_key)]
+        in_progress.add(root_key)
+
+        while stack:
+            task, key, requirements, children, cursor = stack[-1]
+
+            if cursor[0] < len(children):
+                child, child_key = children[cursor[0]]
+                cursor[0] += 1
+
+                if child_key in in_progress:
+                    raise ValueError(f"Task {child} depends on itself.")
+                elif child_key not in graph:
+                    stack.append(expand(child, child_key))
+                    in_progress.add(child_key)
+            else:
+                stack.pop()
+                in_progress.remove(key)
+
+                dependencies = list(dict.fromkeys(k for _, k in children))
+                graph[key] = TaskNode(task, requirements, dependencies)
+
+    return graph
+
+
 def _resolve_task_tree(
     work: TaskTree,
     fn: Callable,
     ignore_cache=False,
     force_tasks: Optional[set[Type["AbstractTask"]]] = None,
+    deduplicate=True,
     **kwargs,
 ) -> Any:
-    def mapper(task: "AbstractTask") -> Any:
-        if force_tasks:
-            is_forced = any([issubclass(task.__class__, c) for c in force_tasks])
+    """Call `fn` on every task of a tree, children first, and replace the tasks in
+    `work` by the value returned by `fn`. `fn` is called as `fn(task)` if the task has
+    no requirements, and as `fn(task, mapped_requirements)` otherwise.
+
+    Arguments:
+        work: The task tree to resolve.
+        fn: The function to call on every task.
+        ignore_cache: If `True`, expand the requirements of cached tasks too.
+        force_tasks: Expand the requirements of these task classes even if they are
+            cached.
+        deduplicate: If `True`, tasks that share the same `_unique_key` are expanded
+            and passed to `fn` only once, and the result is reused by every task that
+            requires them. If `False`, `fn` is called once per occurrence of a task in
+            the tree."""
+    if not deduplicate:
+        return _resolve_task_tree_without_deduplication(
+            work, fn, ignore_cache=ignore_cache, force_tasks=force_tasks, **kwargs
+        )
+
+    graph = build_task_graph(work, ignore_cache=ignore_cache, force_tasks=force_tasks)
+
+    results = {}
+
+    def lookup_result(task: "AbstractTask") -> Any:
+        return results[task._unique_key()]
+
+    for key, node in graph.items():
+        if node.requirements is None:
+            results[key] = fn(node.task)
         else:
-            is_forced = False
+            mapped_requirements = _map_tasks_in_tree(
+                node.requirements, lookup_result, **kwargs
+            )
+            results[key] = fn(node.task, mapped_requirements)
 
+    return _map_tasks_in_tree(work, lookup_result, **kwargs)
+
+
+def _resolve_task_tree_without_deduplication(
+    work: TaskTree,
+    fn: Callable,
+    ignore_cache=False,
+    force_tasks: Optional[set[Type["AbstractTask"]]] = None,
+    **kwargs,
+) -> Any:
+    def expand(task: "AbstractTask") -> tuple:
         requirements = task._resolve_requirements(
-            ignore_cache=ignore_cache or is_forced
+            ignore_cache=ignore_cache or _is_forced(task, force_tasks)
         )
+        return task, requirements, gather_tasks_in_tree(requirements), []
 
+    def call_fn(task, requirements, results) -> Any:
         if requirements is None:
-            to_return = fn(task)
-        else:
-            mapped_requirements = _map_tasks_in_tree(requirements, mapper, **kwargs)
-            to_return = fn(task, mapped_requirements)
-
-        return to_return
+            return fn(task)
 
-    return _map_tasks_in_tree(work, mapper, **kwargs)
+        results_iterator = iter(results)
+        mapped_requirements = _map_tasks_in_tree(
+            requirements, lambda _: next(results_iterator), **kwargs
+        )
+        return fn(task, mapped_requirements)
+
+    # Every occurrence of a task is expanded separately. Same traversal as
+    # `build_task_graph`, except that results are handed back to the parent frame.
+    root_results = []
+    for root in gather_tasks_in_tree(work):
+        stack = [expand(root)]
+
+        while stack:
+            task, requirements, children, results = stack[-1]
+
+            if len(results) < len(children):
+                stack.append(expand(children[len(results)]))
+            else:
+                stack.pop()
+                result = call_fn(task, requirements, results)
+
+                if stack:
+                    stack[-1][3].append(result)
+                else:
+                    root_results.append(result)
+
+    root_results_iterator = iter(root_results)
+    return _map_tasks_in_tree(work, lambda _: next(root_results_iterator), **kwargs)
@@ -1,12 +1,20 @@
 """Set of tools to resolve the name of a task to the task class. Also contains utilities
 to figure out the configuration."""
 
-from typing import Any, Mapping, Sequence, Type, Optional, Iterable
+from typing import Any, Iterator, Mapping, Sequence, Type, Optional, Iterable
+import dataclasses
+import hashlib
+import importlib
 import importlib.metadata
+import json
 import logging
+import os
+import pathlib
+import sys
 
 from .task import AbstractTask
 from .util import tasks_in_module
+from .config import aqueduct_cache_dir
 from .config.configsource import ConfigSource
 
 _logger = logging.getLogger(__name__)
@@ -20,92 +28,330 @@ def create_task_index(
     Mapping[Type[AbstractTask], str],
 ]:
     """Build various indexes for extension modules so that we can recover tasks and
-    their configurations."""
-    project_of_module_name = {
-        module_name: p
-        for p in project_name_to_module_names
-        for module_name in project_name_to_module_names[p]
-    }
-
-    module_name_of_task_class: Mapping[Type[AbstractTask], Any] = {}
-    for project in project_name_to_module_names:
-        for module_name in project_name_to_module_names[project]:
-            task_classes = tasks_in_module(module_name)
-            for t in task_classes:
+    their configurations. Every module is imported, see :func:`cached_task_index` for
+    an index that is persisted between processes."""
+    return TaskIndex.build(project_name_to_module_names).mappings()
+
+
+TASK_INDEX_VERSION = 1
+
+MODULES_ENTRY_POINT_GROUP = "aqueduct_modules"
+CONFIG_ENTRY_POINT_GROUP = "aqueduct_config"
+
+
+@dataclasses.dataclass
+class TaskIndexEntry:
+    """Where to find a task class without importing every extension module.
+
+    Attributes:
+        project: Name of the project that declares the module.
+        module_name: Name of the extension module in which the task was found.
+        defining_module: Name of the module where the task class is defined.
+        qualname: Qualified name of the class inside `defining_module`."""
+
+    project: str
+    module_name: str
+    defining_module: str
+    qualname: str
+
+
+def task_index_cache_dir() -> pathlib.Path:
+    """Directory where task indexes are persisted. See :func:`aqueduct_cache_dir`."""
+    return aqueduct_cache_dir()
+
+
+def _entry_points_metadata() -> list[list[str]]:
+    """Describe the aqueduct entry points of the installed distributions, without
+    loading them."""
+    metadata = []
+    for group in (MODULES_ENTRY_POINT_GROUP, CONFIG_ENTRY_POINT_GROUP):
+        for ep in importlib.metadata.entry_points(group=group):
+            dist = ep.dist
+            dist_version = f"{dist.name}=={dist.version}" if dist is not None else ""
+            metadata.append([group, ep.name, ep.value, dist_version])
+
+    return sorted(metadata)
+
+
+def _task_index_key(
+    project_name_to_module_names: Optional[Mapping[str, Iterable[str]]]
+) -> dict:
+    if project_name_to_module_names is None:
+        return {"entry_points": _entry_points_metadata()}
+    else:
+        # Explicit modules are resolved relative to the working directory.
+        return {
+            "entry_points": _entry_points_metadata(),
+            "modules": {p: list(m) for p, m in project_name_to_module_names.items()},
+            "cwd": os.getcwd(),
+        }
+
+
+def _task_index_path(key: dict) -> pathlib.Path:
+    digest = hashlib.sha1(json.dumps(key, sort_keys=True).encode()).hexdigest()
+    return task_index_cache_dir() / f"task_index_{digest[:16]}.json"
+
+
+def _file_of_module(module_name: str) -> Optional[str]:
+    module = sys.modules.get(module_name)
+    return getattr(module, "__file__", None)
+
+
+def _mtime_of_files(files: Iterable[str]) -> dict[str, int]:
+    return {f: os.stat(f).st_mtime_ns for f in files}
+
+
+class TaskIndex:
+    """Index of the tasks declared by extension modules, that can be persisted to disk.
+
+    The index is keyed by the metadata of the aqueduct entry points, and is valid as
+    long as the files of the indexed modules are not modified. Task classes are only
+    imported when they are looked up, so that the CLI only imports the module that
+    contains the requested task."""
+
+    def __init__(
+        self,
+        entries: Mapping[str, TaskIndexEntry],
+        projects_with_config: Iterable[str],
+        files: Mapping[str, int],
+    ):
+        self.entries = dict(entries)
+        self.projects_with_config = set(projects_with_config)
+        self.files = dict(files)
+
+    @classmethod
+    def build(
+        cls, project_name_to_module_names: Mapping[str, Iterable[str]]
+    ) -> "TaskIndex":
+        """Import every module and scan it for tasks."""
+        project_of_module_name = {
+            module_name: p
+            for p in project_name_to_module_names
+            for module_name in project_name_to_module_names[p]
+        }
+
+        module_name_of_task_class: dict[Type[AbstractTask], str] = {}
+        for module_name in project_of_module_name:
+            for t in tasks_in_module(module_name):
                 module_name_of_task_class[t] = module_name
 
-    task_class_of_name = {}
-    for t in module_name_of_task_class:
-        if t.task_name() in task_class_of_name:
-            _logger.warn(
-                f"Found two tasks with non unique names: {t._fully_qualified_name()} "
-                f"and {task_class_of_name[t.__qualname__]._fully_qualified_name()}"
+        entries: dict[str, TaskIndexEntry] = {}
+        for t, module_name in module_name_of_task_class.items():
+            if t.task_name() in entries:
+                _logger.warning(
+                    f"Found two tasks with non unique names: {t._fully_qualified_name()} "
+                    f"and {entries[t.task_name()].defining_module}.{t.task_name()}"
+                )
+
+            entries[t.task_name()] = TaskIndexEntry(
+                project_of_module_name[module_name],
+                module_name,
+                t.__module__,
+                t.__qualname__,
             )
 
-        task_class_of_name[t.task_name()] = t
+        config_projects = [
+            ep.name
+            for ep in importlib.metadata.entry_points(group=CONFIG_ENTRY_POINT_GROUP)
+        ]
+
+        # Besides the indexed modules, watch the modules that declare the entry points,
+        # since they list the modules to index.
+        module_names = set(project_of_module_name)
+        module_names.update(e.defining_module for e in entries.values())
+        module_names.update(
+            ep.module
+            for ep in importlib.metadata.entry_points(group=MODULES_ENTRY_POINT_GROUP)
+        )
+        files = [f for m in module_names if (f := _file_of_module(m)) is not None]
+
+        return TaskIndex(entries, config_projects, _mtime_of_files(files))
+
+    def is_stale(self) -> bool:
+        try:
+            return _mtime_of_files(self.files) != self.files
+        except OSError:
+            return True
+
+    def dump(self, path: pathlib.Path):
+        content = {
+            "version": TASK_INDEX_VERSION,
+            "entries": {n: dataclasses.astuple(e) for n, e in self.entries.items()},
+            "projects_with_config": sorted(self.projects_with_config),
+            "files": self.files,
+        }
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(content))
+        tmp_path.rename(path)
+
+    @classmethod
+    def load(cls, path: pathlib.Path) -> Optional["TaskIndex"]:
+        """Load an index from disk. Return `None` if there is no index at that path, or
+        if the index can't be read."""
+        try:
+            content = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+
+        if content.get("version") != TASK_INDEX_VERSION:
+            return None
+
+        entries = {n: TaskIndexEntry(*e) for n, e in content["entries"].items()}
+        return TaskIndex(entries, content["projects_with_config"], content["files"])
+
+    def task_class(self, name: str) -> Type[AbstractTask]:
+        entry = self.entries[name]
+        o: Any = importlib.import_module(entry.defining_module)
+        for attribute in entry.qualname.split("."):
+            o = getattr(o, attribute)
 
-    config_entry_points = importlib.metadata.entry_points(group="aqueduct_config")
-    config_provider_of_project = {ep.name: ep.load() for ep in config_entry_points}
+        return o
 
-    config_provider_of_name = {}
-    for n in task_class_of_name:
-        project = project_of_module_name[
-            module_name_of_task_class[task_class_of_name[n]]
+    def mappings(
+        self,
+    ) -> tuple[
+        Mapping[str, Type[AbstractTask]],
+        Mapping[str, ConfigSource],
+        Mapping[Type[AbstractTask], str],
+    ]:
+        """Same mappings as :func:`create_task_index`, resolved lazily."""
+        return (
+            LazyTaskClassMapping(self),
+            LazyConfigProviderMapping(self),
+            LazyModuleNameMapping(self),
+        )
+
+
+class LazyTaskClassMapping(Mapping[str, Type[AbstractTask]]):
+    """Task classes by task name, imported when first looked up."""
+
+    def __init__(self, index: TaskIndex):
+        self.index = index
+        self._classes: dict[str, Type[AbstractTask]] = {}
+
+    def __getitem__(self, name: str) -> Type[AbstractTask]:
+        if name not in self._classes:
+            self._classes[name] = self.index.task_class(name)
+
+        return self._classes[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.index.entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.index.entries)
+
+    def __len__(self) -> int:
+        return len(self.index.entries)
+
+
+class LazyConfigProviderMapping(Mapping[str, ConfigSource]):
+    """Config providers by task name. The entry point of a project is only loaded when
+    the config of one of its tasks is looked up."""
+
+    def __init__(self, index: TaskIndex):
+        self.index = index
+        self._provider_of_project: dict[str, ConfigSource] = {}
+
+    def _names(self) -> list[str]:
+        return [
+            n
+            for n, e in self.index.entries.items()
+            if e.project in self.index.projects_with_config
         ]
 
-        if project in config_provider_of_project:
-            config_provider_of_name[n] = config_provider_of_project[project]
-        else:
-            pass
+    def __getitem__(self, name: str) -> ConfigSource:
+        if name not in self.index.entries:
+            raise KeyError(name)
 
-    return task_class_of_name, config_provider_of_name, module_name_of_task_class
+        project = self.index.entries[name].project
+        if project not in self.index.projects_with_config:
+            raise KeyError(name)
 
+        if project not in self._provider_of_project:
+            (ep,) = importlib.metadata.entry_points(
+                group=CONFIG_ENTRY_POINT_GROUP, name=project
+            )
+            self._provider_of_project[project] = ep.load()
 
-def get_modules_from_extensions() -> Mapping[str, Sequence[str]]:
-    module_entry_points = importlib.metadata.entry_points(group="aqueduct_modules")
-    modules = {}
-    for ep in module_entry_points:
-        project_name = ep.name
-        module_fn = ep.load()
-        modules[project_name] = module_fn()
+        return self._provider_of_project[project]
 
-    return modules
+    def __contains__(self, name: object) -> bool:
+        return (
+            name in self.index.entries
+            and self.index.entries[name].project in self.index.projects_with_config
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names())
+
+    def __len__(self) -> int:
+        return len(self._names())
+
+
+class LazyModuleNameMapping(Mapping[Type[AbstractTask], str]):
+    """Name of the extension module in which each task class was found."""
+
+    def __init__(self, index: TaskIndex):
+        self.index = index
+
+    def __getitem__(self, task_class: Type[AbstractTask]) -> str:
+        name = task_class.task_name()
+        entry = self.index.entries.get(name)
+        if entry is None or self.index.task_class(name) is not task_class:
+            raise KeyError(task_class)
+
+        return entry.module_name
 
+    def __iter__(self) -> Iterator[Type[AbstractTask]]:
+        return (self.index.task_class(n) for n in self.index.entries)
 
-def _resolve_task_class_from_modules_dict(
-    modules_dict: Mapping[str, Sequence[Type[AbstractTask]]], task_name: str
-) -> Type[AbstractTask]:
-    for module_name in modules_dict:
-        for task in modules_dict[module_name]:
-            if task.__qualname__ == task_name:
-                return task
+    def __len__(self) -> int:
+        return len(self.index.entries)
 
-    raise KeyError(f"Could not find task with name {task_name}")
 
+def cached_task_index(
+    project_name_to_module_names: Optional[Mapping[str, Iterable[str]]] = None,
+    rebuild: bool = False,
+) -> TaskIndex:
+    """Load the task index from disk, or build it and persist it if it is missing or
+    stale.
 
-def resolve_task_class(task_name: str) -> Type[AbstractTask]:
-    modules_per_project = get_modules_from_extensions()
-    tasks_per_module = {
-        m: tasks_in_module(m)
-        for p in modules_per_project
-        for m in modules_per_project[p]
-    }
-    TaskClass = _resolve_task_class_from_modules_dict(tasks_per_module, task_name)
+    Args:
+        project_name_to_module_names: Modules to index, by project. If `None`, index
+            the modules declared by the `aqueduct_modules` entry points.
+        rebuild: Rebuild the index even if a valid one was persisted."""
+    path = _task_index_path(_task_index_key(project_name_to_module_names))
 
-    return TaskClass
+    index = None if rebuild else TaskIndex.load(path)
+    if index is not None and not index.is_stale():
+        _logger.debug(f"Using task index {path}.")
+        return index
 
+    _logger.debug(f"Building task index {path}.")
+    if project_name_to_module_names is None:
+        project_name_to_module_names = get_modules_from_extensions()
 
-def resolve_task_and_project_config_source(
-    task_name: str,
-) -> tuple[Type[AbstractTask], Optional[ConfigSource]]:
-    modules_per_project = get_modules_from_extensions()
+    index = TaskIndex.build(project_name_to_module_names)
 
-    tasks_per_module = {
-        m: tasks_in_module(m)
-        for p in modules_per_project
-        for m in modules_per_project[p]
-    }
+    try:
+        index.dump(path)
+    except OSError as e:
+        _logger.warning(f"Could not persist task index to {path}: {e}")
 
-    TaskClass = _resolve_task_class_from_modules_dict(tasks_per_module, task_name)
+    return index
 
-    return (TaskClass, None)
+
+def get_modules_from_extensions() -> Mapping[str, Sequence[str]]:
+    module_entry_points = importlib.metadata.entry_points(
+        group=MODULES_ENTRY_POINT_GROUP
+    )
+    modules = {}
+    for ep in module_entry_points:
+        project_name = ep.name
+        module_fn = ep.load()
+        modules[project_name] = module_fn()
+
+    return modules
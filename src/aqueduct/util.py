@@ -81,7 +81,12 @@ def count_tasks_to_run(
 
         return task
 
-    _resolve_task_tree(task, handle_one_task, ignore_cache=ignore_cache)
+    _resolve_task_tree(
+        task,
+        handle_one_task,
+        ignore_cache=ignore_cache,
+        deduplicate=remove_duplicates,
+    )
 
     if remove_duplicates:
         counts = {
@@ -1,11 +1,40 @@
+import asyncio
+import cloudpickle
+import functools
 import numpy as np
+import os
+import pathlib
+import tempfile
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
 from aqueduct import Task, MapReduceTask
-from aqueduct.artifact import InMemoryArtifact
+from aqueduct.artifact import InMemoryArtifact, LocalFilesystemArtifact
+from aqueduct.backend import resolve_backend_from_spec
+from aqueduct.backend.asyncio import AsyncioBackend
+from aqueduct.backend.backend import get_current_backend
+from aqueduct.backend.base import TaskError
+from aqueduct.backend.concurrent import (
+    ArtifactReference,
+    ConcurrentBackend,
+    execute_serialized_task,
+)
 from aqueduct.backend.dask import DaskBackend
 from aqueduct.backend.immediate import ImmediateBackend
-from aqueduct.backend.multiprocessing import MultiprocessingBackend
+from aqueduct.backend.map_statistics import MapStatistics, task_class_name
+from aqueduct.backend.multiprocessing import (
+    MultiprocessingBackend,
+    call_map_fn_on_chunk,
+    execute_parallel_task,
+    installed_payload_token,
+    release_payload,
+)
+from aqueduct.config import get_config, use_config
+from aqueduct.backend.thread import ThreadBackend, execute_parallel_task_in_threads
+
+from benchmarks.deep_chain import ChainTask
 
 
 ARTIFACT_STORE = {}
@@ -51,11 +80,59 @@ class OneItemTask(TaskB):
         return [1]
     
 
+class StreamingTask(TaskB):
+    """Measures how far the consumption of items gets ahead of the reduction."""
+
+    def __init__(self, n_items):
+        self.n_items = n_items
+        self.n_yielded = 0
+        self.n_reduced = 0
+        self.max_pending = 0
+
+    def items(self):
+        for i in range(self.n_items):
+            self.n_yielded += 1
+            self.max_pending = max(self.max_pending, self.n_yielded - self.n_reduced)
+            yield i
+
+    def map(self, x, requirements=None):
+        return x
+
+    def reduce(self, lhs, rhs, requirements=None):
+        self.n_reduced += 1
+        return lhs + rhs
+
+
 class TaskWithPost(TaskB):
     def post(self, acc, requirements=None):
         return f"{acc}"
 
 
+class AutoBatchedTask(TaskB):
+    AQ_BATCH_SIZE = "auto"
+
+    def items(self):
+        return range(100)
+
+
+class FailingMapTask(TaskB):
+    """The first item fails at once, the others mark a file once they are mapped."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def items(self):
+        return range(4)
+
+    def map(self, x, requirements=None):
+        if x == 0:
+            raise ValueError("Failing item.")
+
+        time.sleep(0.2)
+        pathlib.Path(self.directory, str(x)).touch()
+        return x
+
+
 class TaskWithArtifact(Task):
     def run(self, requirements=None):
         return np.random.random((10,10))
@@ -64,6 +141,152 @@ class TaskWithArtifact(Task):
         return InMemoryArtifact('backend_artifact', ARTIFACT_STORE)
 
 
+class SleepTask(Task):
+    def __init__(self, value, duration=0.5):
+        self.value = value
+        self.duration = duration
+
+    def run(self, requirements=None):
+        time.sleep(self.duration)
+        return self.value if requirements is None else requirements + self.value
+
+
+class ChainedSleepTask(SleepTask):
+    def requirements(self):
+        return SleepTask(self.value, self.duration)
+
+
+class AnnotatedTask(Task):
+    AQ_PRIORITY = 5
+    AQ_RETRIES = 2
+
+    def requirements(self):
+        return TaskA(1)
+
+    def run(self, requirements=None):
+        from distributed import get_worker
+        from distributed.worker import thread_state
+
+        return get_worker().state.tasks[thread_state.key].annotations
+
+
+class RandomArrayTask(Task):
+    def __init__(self, index):
+        self.index = index
+
+    def run(self, requirements=None):
+        return np.random.random(1000)
+
+
+class SumOfArraysTask(Task):
+    def requirements(self):
+        return [RandomArrayTask(1), RandomArrayTask(2)]
+
+    def run(self, requirements=None):
+        return requirements[0] + requirements[1]
+
+
+class FanOutTask(Task):
+    def requirements(self):
+        return [ChainedSleepTask(i) for i in range(4)] + [SleepTask(10)]
+
+    def run(self, requirements):
+        return sum(requirements)
+
+
+class FileTask(Task):
+    def __init__(self, directory, value):
+        self.directory = directory
+        self.value = value
+
+    def run(self):
+        return self.value
+
+    def artifact(self):
+        return LocalFilesystemArtifact(pathlib.Path(self.directory) / f"{self.value}.pkl")
+
+
+class SumOfFilesTask(Task):
+    def __init__(self, directory):
+        self.directory = directory
+
+    def requirements(self):
+        return [FileTask(self.directory, i) for i in range(3)]
+
+    def run(self, requirements):
+        return sum(requirements)
+
+
+class SlowRootTask(Task):
+    def requirements(self):
+        return TaskA(1)
+
+    def run(self, requirements):
+        time.sleep(1.0)
+        return requirements + 1
+
+
+class ConfigTask(Task):
+    def run(self, requirements=None):
+        return get_config()["value"]
+
+
+class WorkerBackendTask(Task):
+    """Identifies the backend that the worker that runs the task resolved."""
+
+    def __init__(self, i):
+        self.i = i
+
+    def run(self, requirements=None):
+        from dask.distributed import get_client
+
+        backend = get_current_backend()
+        return os.getpid(), id(backend), backend.client is get_client()
+
+
+class FailingTask(Task):
+    def run(self):
+        raise ValueError("Failing on purpose.")
+
+
+class AsyncSleepTask(Task):
+    running = 0
+    max_running = 0
+
+    def __init__(self, value, duration=0.2):
+        self.value = value
+        self.duration = duration
+
+    async def run(self, requirements=None):
+        AsyncSleepTask.running += 1
+        AsyncSleepTask.max_running = max(
+            AsyncSleepTask.max_running, AsyncSleepTask.running
+        )
+        await asyncio.sleep(self.duration)
+        AsyncSleepTask.running -= 1
+        return self.value
+
+
+class AsyncFanOutTask(Task):
+    def requirements(self):
+        return [AsyncSleepTask(i) for i in range(20)]
+
+    def run(self, requirements):
+        return sum(requirements)
+
+
+class AsyncMapTask(TaskB):
+    async def map(self, x, requirements=None):
+        await asyncio.sleep(0.1)
+        return x * x
+
+
+def config_keys_of_worker() -> list[str]:
+    from aqueduct.backend.dask import AQ_DASK_CONFIGS
+
+    return sorted(AQ_DASK_CONFIGS)
+
+
 class TestImmediateBackend(unittest.TestCase):
     BACKEND_CLASS = ImmediateBackend
 
@@ -120,6 +343,54 @@ class TestImmediateBackend(unittest.TestCase):
         result = self.backend.run(task)
         self.assertEqual(result, "14") 
 
+    def test_submit(self):
+        task = TaskC()
+        submission = self.backend.submit(task)
+
+        self.assertEqual(7, submission.result(timeout=30))
+        self.assertEqual(7, submission.future(task).result())
+        self.assertEqual(4, submission.future(TaskA(4)).result())
+
+    def test_intermediate_result_before_root(self):
+        submission = self.backend.submit(SlowRootTask())
+
+        self.assertEqual(1, submission.future(TaskA(1)).result(timeout=30))
+        self.assertFalse(submission.done())
+        self.assertEqual(2, submission.result(timeout=30))
+
+    def test_submit_watch(self):
+        submission = self.backend.submit(TaskC(), watch=[])
+
+        self.assertEqual(7, submission.result(timeout=30))
+        with self.assertRaises(KeyError):
+            submission.future(TaskA(4))
+
+    def test_submit_error(self):
+        submission = self.backend.submit(FailingTask())
+
+        with self.assertRaises(Exception):
+            submission.result(timeout=30)
+
+    def test_run_async(self):
+        async def main():
+            return await asyncio.gather(
+                self.backend.run_async(TaskA(1)), self.backend.run_async(TaskC())
+            )
+
+        self.assertEqual([1, 7], asyncio.run(main()))
+
+
+class LegacyBackend(ImmediateBackend):
+    """Backend whose `_run` predates submissions."""
+
+    def _run(self, work, force_tasks=None):
+        return super()._run(work, force_tasks=force_tasks)
+
+
+class TestLegacyBackend(unittest.TestCase):
+    def test_run_without_submission(self):
+        self.assertEqual(7, LegacyBackend().run(TaskC()))
+
 
 class TestMultiprocessingBackend(TestImmediateBackend):
     BACKEND_CLASS = MultiprocessingBackend
@@ -133,15 +404,360 @@ class TestMultiprocessingBackend(TestImmediateBackend):
         finally:
             backend.close()
 
+    def test_bounded_window(self):
+        task = StreamingTask(1000)
+        result = execute_parallel_task(
+            self.backend.pool, task, chunk_size=5, max_in_flight=3
+        )
+
+        self.assertEqual(sum(range(1000)), result)
+        self.assertLessEqual(task.max_pending, 5 * 4)
+
+    def test_reduce_in_workers(self):
+        for fan_in in [2, 3]:
+            task = StreamingTask(100)
+            result = execute_parallel_task(
+                self.backend.pool,
+                task,
+                chunk_size=3,
+                reduce_in_workers=True,
+                fan_in=fan_in,
+            )
+
+            self.assertEqual(sum(range(100)), result)
+            # Only the final combine happens in this process.
+            self.assertLess(task.n_reduced, fan_in - 1)
+
+    def test_reduce_in_workers_backend(self):
+        backend = MultiprocessingBackend(n_workers=2, reduce_in_workers=True)
+        try:
+            self.assertEqual(14, backend.run(TaskB()))
+            self.assertEqual(0, backend.run(NoItemsTask()))
+        finally:
+            backend.close()
+
+    def test_spec_boolean_strings(self):
+        for value, expected in [("false", False), ("True", True), (False, False)]:
+            backend = resolve_backend_from_spec(
+                {"type": "multiprocessing", "n_workers": 1, "reduce_in_workers": value}
+            )
+            try:
+                self.assertIs(expected, backend.reduce_in_workers)
+            finally:
+                backend.close()
+
+        with self.assertRaises(ValueError):
+            resolve_backend_from_spec(
+                {"type": "multiprocessing", "n_workers": 1, "reduce_in_workers": "nah"}
+            )
+
+    def test_payload_released(self):
+        backend = MultiprocessingBackend(n_workers=2)
+        try:
+            self.assertEqual(14, backend.run(TaskB()))
+
+            # Every worker dropped the task and its requirements.
+            tokens = [backend.pool.apply(installed_payload_token) for _ in range(4)]
+            self.assertEqual([None] * 4, tokens)
+        finally:
+            backend.close()
+
+    def test_map_error_waits_for_chunks(self):
+        backend = MultiprocessingBackend(n_workers=2)
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                with self.assertRaises(ValueError):
+                    execute_parallel_task(backend.pool, FailingMapTask(directory))
+
+                # The chunks in flight were mapped before the payload was deleted.
+                self.assertEqual(["1", "2", "3"], sorted(os.listdir(directory)))
+        finally:
+            backend.close()
+
+    def test_payload_installed_once(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory) / "payload.pkl"
+            path.write_bytes(cloudpickle.dumps((TaskB(), None)))
+            self.addCleanup(release_payload, "token")
+
+            self.assertEqual([4], call_map_fn_on_chunk("token", str(path), [2]))
+
+            # The payload is not read again for the same token.
+            path.unlink()
+            self.assertEqual([9, 1], call_map_fn_on_chunk("token", str(path), [3, 1]))
+
+
+class TestConcurrentBackend(TestImmediateBackend):
+    BACKEND_CLASS = ConcurrentBackend
+
+    def test_store_artifact(self):
+        # This cannot be tested with in memory store because the storage happens in
+        # worker processes.
+        pass
+
+    def test_file_artifacts(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertEqual(3, self.backend.run(SumOfFilesTask(directory)))
+            self.assertTrue(FileTask(directory, 2).artifact().exists())
+
+            # The requirements are loaded from their artifacts.
+            FileTask(directory, 2).save(10)
+            self.assertEqual(11, self.backend.run(SumOfFilesTask(directory)))
+
+    def test_return_reference(self):
+        with tempfile.TemporaryDirectory() as directory:
+            task = FileTask(directory, 2)
+            serialized_task = cloudpickle.dumps(task)
+
+            reference = execute_serialized_task(serialized_task, return_reference=True)
+            self.assertIsInstance(reference, ArtifactReference)
+            self.assertEqual(2, reference.load())
+
+            self.assertEqual(2, execute_serialized_task(serialized_task))
+
+    def test_independent_subtrees_in_parallel(self):
+        backend = ConcurrentBackend(n_workers=5)
+
+        start = time.perf_counter()
+        result = backend.run(FanOutTask())
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(22, result)
+        # The longest chain has two tasks, running the tree sequentially takes 4.5s.
+        self.assertLess(elapsed, 2.5)
+
+    def test_task_error(self):
+        with self.assertRaises(TaskError):
+            self.backend.run([FailingTask(), SleepTask(1, duration=0.0)])
+
+
+class TestThreadBackend(TestImmediateBackend):
+    BACKEND_CLASS = ThreadBackend
+
+    def test_independent_subtrees_in_parallel(self):
+        backend = ThreadBackend(n_workers=5)
+        try:
+            start = time.perf_counter()
+            result = backend.run(FanOutTask())
+            elapsed = time.perf_counter() - start
+        finally:
+            backend.close()
+
+        self.assertEqual(22, result)
+        self.assertLess(elapsed, 2.5)
+
+    def test_bounded_window(self):
+        task = StreamingTask(1000)
+        result = execute_parallel_task_in_threads(
+            self.backend.map_executor, task, max_in_flight=3
+        )
+
+        self.assertEqual(sum(range(1000)), result)
+        self.assertLessEqual(task.max_pending, 4)
+
+    def test_map_error_cancels_items(self):
+        executor = ThreadPoolExecutor(1)
+        self.addCleanup(executor.shutdown)
+
+        with tempfile.TemporaryDirectory() as directory:
+            with self.assertRaises(ValueError):
+                execute_parallel_task_in_threads(
+                    executor, FailingMapTask(directory), n_workers=1
+                )
+
+            executor.shutdown()
+            # At most the item that started while the first one failed is mapped.
+            self.assertLessEqual(len(os.listdir(directory)), 1)
+
+    def test_task_error(self):
+        with self.assertRaises(TaskError):
+            self.backend.run([FailingTask(), SleepTask(1, duration=0.0)])
+
+
+class TestAsyncioBackend(TestImmediateBackend):
+    BACKEND_CLASS = AsyncioBackend
+
+    def setUp(self):
+        super().setUp()
+        AsyncSleepTask.running = 0
+        AsyncSleepTask.max_running = 0
+
+    def test_coroutine_tasks(self):
+        start = time.perf_counter()
+        result = self.backend.run(AsyncFanOutTask())
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(sum(range(20)), result)
+        # The 20 tasks wait at the same time.
+        self.assertLess(elapsed, 2.0)
+        self.assertEqual(20, AsyncSleepTask.max_running)
+
+    def test_max_concurrency(self):
+        backend = AsyncioBackend(max_concurrency=3)
+        self.assertEqual(sum(range(20)), backend.run(AsyncFanOutTask()))
+        self.assertEqual(3, AsyncSleepTask.max_running)
+
+    def test_coroutine_map(self):
+        start = time.perf_counter()
+        result = self.backend.run(AsyncMapTask())
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(14, result)
+        self.assertLess(elapsed, 0.25)
+
+    def test_sync_tasks_in_parallel(self):
+        backend = AsyncioBackend(n_workers=5)
+        start = time.perf_counter()
+        result = backend.run(FanOutTask())
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(22, result)
+        self.assertLess(elapsed, 2.5)
+
+    def test_running_event_loop(self):
+        async def main():
+            return self.backend.run(AsyncSleepTask(3))
+
+        self.assertEqual(3, asyncio.run(main()))
+
+    def test_task_error(self):
+        with self.assertRaises(TaskError):
+            self.backend.run([FailingTask(), AsyncSleepTask(1)])
 
 
 class TestDaskBackend(TestImmediateBackend):
     BACKEND_CLASS = DaskBackend
 
+    def test_config_installed_on_workers(self):
+        for value in [1, 2]:
+            with use_config({"value": value}):
+                self.assertEqual(value, self.backend.run(ConfigTask()))
+
+        # The plugin of the second configuration replaced the plugin of the first.
+        plugins = self.backend.client.run_on_scheduler(
+            lambda dask_scheduler: [
+                name
+                for name in dask_scheduler.worker_plugins
+                if name.startswith("aqueduct-config-")
+            ]
+        )
+        self.assertEqual([self.backend._config_plugin_name], plugins)
+
+        # So the workers dropped the first configuration.
+        for keys in self.backend.client.run(config_keys_of_worker).values():
+            self.assertEqual([self.backend._installed_config_key], keys)
+
+    def test_config_edited_in_place(self):
+        with use_config({"value": 1}) as cfg:
+            self.assertEqual(1, self.backend.run(ConfigTask()))
+
+            cfg.value = 2
+            self.assertEqual(2, self.backend.run(ConfigTask()))
+
+    def test_config_plugin_removed_on_close(self):
+        from dask.distributed import Client
+
+        backend = DaskBackend(Client(self.backend.client.scheduler.address))
+        with use_config({"value": 3}):
+            self.assertEqual(3, backend.run(ConfigTask()))
+        backend.close()
+
+        plugins = self.backend.client.run_on_scheduler(
+            lambda dask_scheduler: [
+                name
+                for name in dask_scheduler.worker_plugins
+                if name.startswith("aqueduct-config-")
+            ]
+        )
+        self.assertEqual([], plugins)
+
+    def test_partitions_without_optimization(self):
+        backend = DaskBackend(
+            self.backend.client, n_partitions=2, optimize_graph=False
+        )
+        self.assertEqual(14, backend.run(TaskB()))
+        self.assertEqual(0, backend.run(NoItemsTask()))
+        self.assertEqual(2, backend._spec()["n_partitions"])
+
+    def test_fan_in(self):
+        backend = DaskBackend(self.backend.client, fan_in=3)
+        self.assertEqual(14, backend.run(TaskB()))
+        self.assertEqual(1, backend.run(OneItemTask()))
+        self.assertEqual(0, backend.run(NoItemsTask()))
+        self.assertEqual(3, backend._spec()["fan_in"])
+
+        with self.assertRaises(ValueError):
+            DaskBackend(self.backend.client, fan_in=1)
+
+    def test_auto_batch_size(self):
+        expected = sum(x**2 for x in range(100))
+
+        with tempfile.TemporaryDirectory() as directory, mock.patch.dict(
+            os.environ, {"AQ_CACHE_DIR": directory}
+        ):
+            self.assertEqual(expected, self.backend.run(AutoBatchedTask()))
+
+            # The workers measured the map, the next graph is batched accordingly.
+            statistics = MapStatistics.load()
+            self.assertIn(task_class_name(AutoBatchedTask), statistics.time_per_item)
+            self.assertEqual(expected, self.backend.run(AutoBatchedTask()))
+
+    def test_annotations(self):
+        annotations = self.backend.run(AnnotatedTask())
+        self.assertEqual(5, annotations["priority"])
+        self.assertEqual(2, annotations["retries"])
+
+    def test_result_cache(self):
+        backend = DaskBackend(self.backend.client, result_cache="1MB")
+        total = backend.run(SumOfArraysTask())
+
+        # The requirements are still in the cluster, and so is the root.
+        np.testing.assert_allclose(
+            total - backend.run(RandomArrayTask(1)), backend.run(RandomArrayTask(2))
+        )
+        np.testing.assert_array_equal(total, backend.run(SumOfArraysTask()))
+        self.assertEqual(3, len(backend.result_cache))
+
+        # Forced tasks are computed again.
+        first = backend.run(RandomArrayTask(1))
+        forced = backend.run(RandomArrayTask(1), force_tasks={RandomArrayTask})
+        self.assertFalse(np.array_equal(first, forced))
+
+        backend.result_cache.clear()
+        self.assertEqual(0, backend.result_cache.n_bytes)
+
+    def test_result_cache_eviction(self):
+        backend = DaskBackend(self.backend.client, result_cache=20_000)
+        results = [backend.run(RandomArrayTask(i)) for i in range(4)]
+
+        # Each result takes about 8kB, the least recently used ones were released.
+        self.assertEqual(2, len(backend.result_cache))
+        self.assertLessEqual(backend.result_cache.n_bytes, 20_000)
+        np.testing.assert_array_equal(results[3], backend.run(RandomArrayTask(3)))
+        self.assertFalse(
+            np.array_equal(results[0], backend.run(RandomArrayTask(0)))
+        )
+
+    def test_backend_resolved_once_per_worker(self):
+        results = self.backend.run([WorkerBackendTask(i) for i in range(20)])
+
+        backend_of_worker = {}
+        for pid, backend_id, uses_worker_client in results:
+            self.assertEqual(backend_id, backend_of_worker.setdefault(pid, backend_id))
+            self.assertTrue(uses_worker_client)
+
     def test_store_artifact(self):
         # This cannot be tested with in memory store because the storage happens in
         # worker processes.
         pass
 
     def test_load_artifact(self):
-        pass
\ No newline at end of file
+        pass
+
+
+class TestIncrementalDaskBackend(TestDaskBackend):
+    BACKEND_CLASS = functools.partial(DaskBackend, incremental=2)
+
+    def test_long_chain(self):
+        self.assertEqual(50, self.backend.run(ChainTask(50)))
+        self.assertEqual(2, self.backend._spec()["incremental"])
@@ -1,7 +1,43 @@
+import cloudpickle
+import omegaconf
+import os
+import sys
+import tempfile
 import unittest
+from unittest import mock
+
+from aqueduct import MapReduceTask, Task
+from aqueduct.backend.dask import (
+    AQ_DASK_CONFIGS,
+    IncrementalDaskGraph,
+    add_work_to_dask_graph,
+    annotate_dask_graph,
+    config_key,
+    dask_backend_options,
+    map_reduce_chunk,
+    release_config,
+    resolve_client_from_dict_spec,
+    retain_config,
+    wrap_in_context,
+)
+from aqueduct.backend.dask_cluster import (
+    ManagedCluster,
+    cluster_file,
+    running_cluster,
+    start_local_cluster,
+    stop_local_cluster,
+    write_cluster_file,
+)
+from aqueduct.backend.map_statistics import (
+    MapStatistics,
+    collect_map_statistics,
+    drain_recorded_map_times,
+    task_class_name,
+)
+from aqueduct.config import get_config, use_config
+
+from benchmarks.deep_chain import ChainTask
 
-from aqueduct import Task
-from aqueduct.backend.dask import add_work_to_dask_graph
 
 class TaskB(Task):
     def __init__(self, value):
@@ -18,6 +54,82 @@ class TaskA(Task):
     def run(self, reqs):
         return sum(reqs) + 2
 
+
+class SumTask(MapReduceTask):
+    def items(self):
+        return (i for i in range(10))
+
+    def map(self, x, requirements=None):
+        return x
+
+    def accumulator(self, requirements=None):
+        return 0
+
+    def reduce(self, lhs, rhs, requirements=None):
+        return lhs + rhs
+
+    def post(self, acc, requirements=None):
+        return acc
+
+
+class RangeSumTask(SumTask):
+    def __init__(self, n_items):
+        self.n_items = n_items
+
+    def items(self):
+        return range(self.n_items)
+
+
+class BatchedSumTask(RangeSumTask):
+    AQ_BATCH_SIZE = 25
+
+
+class AutoBatchedSumTask(RangeSumTask):
+    AQ_BATCH_SIZE = "auto"
+
+
+class MemoryHungryTask(TaskB):
+    AQ_PRIORITY = 10
+    AQ_RESOURCES = {"memory": 32e9}
+
+
+class MemoryHungrySumTask(RangeSumTask):
+    AQ_RETRIES = 2
+
+    def requirements(self):
+        return MemoryHungryTask(self.n_items)
+
+
+def reduce_children(graph, key):
+    """Keys of the children of a node of a reduction tree."""
+    # Entries are (wrap_in_context, cfg_key, spec, map_reduce_chunk, task, chunk,
+    # children, requirements).
+    return graph[key][6]
+
+
+class RecordingClient:
+    """Stands for a Dask client, records the graphs it is given."""
+
+    def __init__(self):
+        self.graphs = []
+
+    def get(self, graph, keys, sync=True):
+        self.graphs.append(dict(graph))
+        return [f"future_of_{k}" for k in keys]
+
+
+class ResidentFuture:
+    def __init__(self, key):
+        self.key = key
+
+
+class Resident(dict):
+    """Stands for a result cache."""
+
+    def discard(self, key):
+        self.pop(key, None)
+
+
 class TestDaskUtils(unittest.TestCase):
     def test_add_task(self):
         work = TaskB(2)
@@ -44,3 +156,259 @@ class TestDaskUtils(unittest.TestCase):
 
         self.assertEqual(work._unique_key(), computation)
         self.assertEqual(len(graph), 3)
+
+    def test_long_chain(self):
+        length = sys.getrecursionlimit() * 2
+        work = ChainTask(length)
+        computation, graph = add_work_to_dask_graph(work, {}, {})
+
+        self.assertEqual(work._unique_key(), computation)
+        self.assertEqual(length + 1, len(graph))
+
+    def test_chunked_items(self):
+        work = SumTask()
+        computation, graph = add_work_to_dask_graph(work, {}, {"chunk_size": 3})
+
+        # Accumulator, 4 chunks and post.
+        self.assertEqual(6, len(graph))
+
+    def test_partitions(self):
+        for n_items in [10, 10000]:
+            work = RangeSumTask(n_items)
+            computation, graph = add_work_to_dask_graph(
+                work, {}, {"chunk_size": 1, "n_partitions": 4}
+            )
+
+            # Accumulator, 4 partitions and post.
+            self.assertEqual(6, len(graph))
+
+        # The items of generators are counted before they are split.
+        _, graph = add_work_to_dask_graph(SumTask(), {}, {"n_partitions": 4})
+        self.assertEqual(6, len(graph))
+
+    def test_fan_in(self):
+        work = RangeSumTask(13)
+        computation, graph = add_work_to_dask_graph(work, {}, {"fan_in": 3})
+        key = work._unique_key()
+
+        self.assertEqual(
+            [f"{key}_reduce_{i}" for i in [1, 2, 3]],
+            reduce_children(graph, f"{key}_reduce_0"),
+        )
+        self.assertEqual(
+            [f"{key}_reduce_{i}" for i in [10, 11, 12]],
+            reduce_children(graph, f"{key}_reduce_3"),
+        )
+        self.assertEqual(
+            [f"{key}_accumulator"], reduce_children(graph, f"{key}_reduce_4")
+        )
+
+    def test_batch_size_of_task(self):
+        work = BatchedSumTask(100)
+        computation, graph = add_work_to_dask_graph(
+            work, {}, {"chunk_size": 1, "n_partitions": 2}
+        )
+
+        # Accumulator, 4 batches and post.
+        self.assertEqual(6, len(graph))
+
+    def test_map_reduce_chunk(self):
+        task = RangeSumTask(0)
+        self.assertEqual(6, map_reduce_chunk(task, [1, 2, 3], [0], None))
+        self.assertEqual(16, map_reduce_chunk(task, [1, 2, 3], [1, 3, 6], None))
+
+    def test_auto_batch_size(self):
+        drain_recorded_map_times()
+        name = task_class_name(AutoBatchedSumTask)
+
+        with tempfile.TemporaryDirectory() as directory, mock.patch.dict(
+            os.environ, {"AQ_CACHE_DIR": directory}
+        ):
+            # Never measured, the options of the backend apply.
+            _, graph = add_work_to_dask_graph(
+                AutoBatchedSumTask(100), {}, {"chunk_size": 10}
+            )
+            self.assertEqual(12, len(graph))
+
+            map_reduce_chunk(AutoBatchedSumTask(0), list(range(10)), [0], None)
+            recorded = drain_recorded_map_times()
+            self.assertEqual(10, recorded[name][0])
+
+            # 10ms per item, with a target of 0.2s per batch.
+            collect_map_statistics([{name: [10, 0.1]}, {name: [10, 0.1]}])
+            self.assertAlmostEqual(0.01, MapStatistics.load().time_per_item[name])
+
+            _, graph = add_work_to_dask_graph(
+                AutoBatchedSumTask(100), {}, {"chunk_size": 10}
+            )
+            self.assertEqual(7, len(graph))
+
+            with use_config({"aqueduct": {"target_batch_duration": 0.5}}):
+                _, graph = add_work_to_dask_graph(
+                    AutoBatchedSumTask(100), {}, {"chunk_size": 10}
+                )
+            self.assertEqual(4, len(graph))
+
+            # The statistics are read once for the whole tree.
+            with mock.patch.object(
+                MapStatistics, "load", side_effect=MapStatistics.load
+            ) as load:
+                add_work_to_dask_graph(
+                    [AutoBatchedSumTask(100), AutoBatchedSumTask(50)], {}, {}
+                )
+            load.assert_called_once()
+
+    def test_incremental_graph(self):
+        client = RecordingClient()
+        graph = IncrementalDaskGraph(client, optimize=False)
+        tasks = {}
+
+        def on_task_added(key):
+            graph.request(key)
+            if len(graph.requested) >= 2:
+                graph.flush()
+
+        work = ChainTask(4)
+        computation, _ = add_work_to_dask_graph(
+            work, graph, {}, tasks=tasks, on_task_added=on_task_added
+        )
+        graph.flush()
+
+        self.assertEqual(work._unique_key(), computation)
+        self.assertEqual([2, 3, 2], [len(g) for g in client.graphs])
+        self.assertEqual(5, len(graph.futures))
+
+        # Later batches refer to the entries of previous batches by their futures.
+        key_1 = ChainTask(1)._unique_key()
+        self.assertEqual(f"future_of_{key_1}", client.graphs[1][key_1])
+        self.assertIn(key_1, graph)
+
+        with self.assertRaises(KeyError):
+            graph[key_1] = None
+
+    def test_annotations(self):
+        work = MemoryHungrySumTask(3)
+        annotations = {}
+        computation, graph = add_work_to_dask_graph(
+            work, {}, {}, annotations=annotations
+        )
+
+        requirement_key = MemoryHungryTask(3)._unique_key()
+        self.assertEqual(
+            {"priority": 10, "resources": {"memory": 32e9}},
+            annotations[requirement_key],
+        )
+
+        # Accumulator, 3 chunks and post.
+        key = work._unique_key()
+        self.assertEqual(5, len([k for k in annotations if k.startswith(key)]))
+        self.assertEqual({"retries": 2}, annotations[f"{key}_reduce_2"])
+
+        hlg = annotate_dask_graph(graph, annotations)
+        self.assertEqual(len(graph), len(dict(hlg)))
+        self.assertEqual(
+            [None, {"priority": 10, "resources": {"memory": 32e9}}, {"retries": 2}],
+            [layer.annotations for layer in hlg.layers.values()],
+        )
+
+        self.assertIs(graph, annotate_dask_graph(graph, {}))
+
+    def test_resident_results(self):
+        key = TaskB(2)._unique_key()
+        future = ResidentFuture(f"{key}_resident")
+        computation, graph = add_work_to_dask_graph(
+            TaskA(), {}, {}, resident=Resident({key: future})
+        )
+
+        # The cached result is used once, its task is not in the graph.
+        self.assertEqual(3, len(graph))
+        self.assertIs(future, graph[future.key])
+        self.assertNotIn(key, graph)
+        self.assertIn(future.key, graph[TaskA()._unique_key()][4])
+
+        # Forced tasks are computed again, and dropped from the cache.
+        resident = Resident({key: future})
+        computation, graph = add_work_to_dask_graph(
+            TaskA(), {}, {}, resident=resident, force_tasks={TaskB}
+        )
+        self.assertIn(key, graph)
+        self.assertEqual({}, resident)
+
+    def test_config_by_key(self):
+        with use_config({"large": list(range(10000))}):
+            computation, graph = add_work_to_dask_graph(
+                SumTask(), {}, {"chunk_size": 1}
+            )
+            key = config_key(get_config())
+
+        for entry in graph.values():
+            self.assertNotIsInstance(entry[1], omegaconf.DictConfig)
+
+        # The graph does not grow with the size of the configuration.
+        self.assertLess(len(cloudpickle.dumps(graph)), 20000)
+
+        self.assertEqual(9999, AQ_DASK_CONFIGS[key].large[-1])
+
+    def test_config_key_depends_on_content(self):
+        key_a = config_key(omegaconf.OmegaConf.create({"a": 1}))
+        self.assertEqual(key_a, config_key(omegaconf.OmegaConf.create({"a": 1})))
+        self.assertNotEqual(key_a, config_key(omegaconf.OmegaConf.create({"a": 2})))
+
+    def test_release_config(self):
+        cfg = omegaconf.OmegaConf.create({"released": True})
+
+        # Two plugins installed the same configuration.
+        retain_config("released", cfg)
+        retain_config("released", cfg)
+        release_config("released")
+        self.assertIs(cfg, AQ_DASK_CONFIGS["released"])
+
+        release_config("released")
+        self.assertNotIn("released", AQ_DASK_CONFIGS)
+
+    def test_missing_config(self):
+        with self.assertRaises(RuntimeError):
+            wrap_in_context("missing", {}, lambda: None)
+
+    def test_backend_options_boolean_strings(self):
+        options = dask_backend_options({"type": "dask", "optimize_graph": "false"})
+        self.assertIs(False, options["optimize_graph"])
+        self.assertIs(True, dask_backend_options({"type": "dask"})["optimize_graph"])
+
+        with self.assertRaises(ValueError):
+            dask_backend_options({"type": "dask", "optimize_graph": "maybe"})
+
+
+class TestLocalDaskCluster(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+
+        patch = mock.patch.dict(os.environ, {"AQ_CACHE_DIR": directory.name})
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_local_cluster(self):
+        self.assertIsNone(running_cluster())
+
+        cluster = start_local_cluster(n_workers=1, threads_per_worker=1)
+        self.addCleanup(stop_local_cluster)
+        self.assertEqual(1, cluster.n_workers)
+        self.assertEqual(cluster, running_cluster())
+
+        # Later starts and backend specs reuse the running cluster.
+        self.assertEqual(cluster, start_local_cluster(n_workers=2))
+        client = resolve_client_from_dict_spec({"type": "dask", "cluster": "local"})
+        with client:
+            self.assertEqual(cluster.address, client.scheduler.address)
+            self.assertEqual(4, client.submit(lambda x: x * 2, 2).result())
+
+        self.assertEqual(cluster, stop_local_cluster())
+        self.assertFalse(cluster_file().exists())
+        self.assertIsNone(stop_local_cluster())
+
+    def test_stale_record(self):
+        write_cluster_file(ManagedCluster("tcp://127.0.0.1:1", 2**22 + 1, 1))
+
+        self.assertIsNone(running_cluster())
+        self.assertFalse(cluster_file().exists())
@@ -1,6 +1,7 @@
 from typing import Optional, cast
 
 import pathlib
+import tempfile
 import unittest
 
 from aqueduct.artifact import (
@@ -8,7 +9,11 @@ from aqueduct.artifact import (
     resolve_artifact_from_spec,
     LocalFilesystemArtifact,
     LocalStoreArtifact,
+    artifact_cache,
+    get_artifact_cache,
 )
+from aqueduct.artifact.util import prefetch_artifact_probes
+from aqueduct.backend import ImmediateBackend
 
 import aqueduct as aq
 from aqueduct.task_tree import TaskTree
@@ -97,3 +102,134 @@ class TestHeadArtifact(unittest.TestCase):
         self.assertEqual(2, len(head))
         for a in head:
             self.assertIsInstance(a, InMemoryArtifact)
+
+
+class CountingArtifact(aq.Artifact):
+    n_probes = 0
+
+    def __init__(self, key):
+        self.key = key
+
+    def _cache_key(self):
+        return ("counting", self.key)
+
+    def exists(self):
+        CountingArtifact.n_probes += 1
+        return self.key in STORE
+
+    def size(self):
+        return 0
+
+
+class CachedArtifactTask(aq.Task):
+    def artifact(self):
+        return CountingArtifact("cached")
+
+    def run(self):
+        return 12
+
+    def save(self, object):
+        STORE["cached"] = object
+
+    def load(self):
+        return STORE["cached"]
+
+
+class TestArtifactCache(unittest.TestCase):
+    def setUp(self):
+        STORE.clear()
+        CountingArtifact.n_probes = 0
+
+    def test_no_cache_outside_run(self):
+        artifact = CountingArtifact("a")
+        artifact.exists()
+        artifact.exists()
+
+        self.assertIsNone(get_artifact_cache())
+        self.assertEqual(2, CountingArtifact.n_probes)
+
+    def test_hits_and_misses(self):
+        with artifact_cache() as cache:
+            self.assertFalse(CountingArtifact("a").exists())
+            self.assertFalse(CountingArtifact("a").exists())
+            self.assertFalse(CountingArtifact("b").exists())
+
+        self.assertEqual(2, CountingArtifact.n_probes)
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(2, cache.misses)
+
+    def test_nested_contexts_share_cache(self):
+        with artifact_cache() as outer:
+            with artifact_cache() as inner:
+                self.assertIs(outer, inner)
+
+            self.assertIs(outer, get_artifact_cache())
+
+    def test_invalidate_on_save(self):
+        task = CachedArtifactTask()
+
+        with artifact_cache():
+            self.assertFalse(task.is_cached())
+            self.assertEqual(12, ImmediateBackend().run(task))
+            self.assertTrue(task.is_cached())
+
+    def test_filesystem_artifact(self):
+        with tempfile.TemporaryDirectory() as d:
+            artifact = LocalFilesystemArtifact(pathlib.Path(d) / "a.txt")
+
+            with artifact_cache() as cache:
+                self.assertFalse(artifact.exists())
+                artifact.dump_text("hello")
+                self.assertTrue(artifact.exists())
+                self.assertEqual(5, artifact.size())
+                self.assertEqual(5, artifact.size())
+
+            self.assertEqual(1, cache.hits)
+
+
+class ProbedTask(aq.Task):
+    def __init__(self, index):
+        self.index = index
+
+    def artifact(self):
+        return CountingArtifact(f"probed-{self.index}")
+
+    def requirements(self):
+        if self.index > 0:
+            return [ProbedTask(self.index - 1), ProbedTask(self.index - 1)]
+
+    def run(self, reqs=None):
+        return self.index
+
+
+class TestPrefetchArtifactProbes(unittest.TestCase):
+    def setUp(self):
+        STORE.clear()
+        CountingArtifact.n_probes = 0
+
+    def test_no_cache(self):
+        statistics = prefetch_artifact_probes(ProbedTask(3))
+
+        self.assertEqual(0, statistics.n_artifacts)
+        self.assertEqual(0, CountingArtifact.n_probes)
+
+    def test_prefetch(self):
+        with artifact_cache() as cache:
+            statistics = prefetch_artifact_probes(ProbedTask(3), max_workers=4)
+
+            self.assertEqual(4, statistics.n_tasks)
+            self.assertEqual(4, statistics.n_artifacts)
+            self.assertEqual(4, CountingArtifact.n_probes)
+
+            hits = cache.hits
+            self.assertFalse(ProbedTask(0).is_cached())
+            self.assertEqual(hits + 1, cache.hits)
+            self.assertEqual(4, CountingArtifact.n_probes)
+
+    def test_do_not_expand_cached(self):
+        STORE["probed-2"] = 2
+
+        with artifact_cache():
+            statistics = prefetch_artifact_probes(ProbedTask(3))
+
+        self.assertEqual(2, statistics.n_tasks)
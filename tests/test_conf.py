@@ -1,7 +1,19 @@
+import asyncio
 import omegaconf
+import threading
 import unittest
 
-from aqueduct.config import get_deep_key, has_deep_key
+from aqueduct import Task
+from aqueduct.backend.backend import get_current_backend
+from aqueduct.backend.immediate import ImmediateBackend
+from aqueduct.backend.thread import ThreadBackend
+from aqueduct.config import (
+    get_config,
+    get_deep_key,
+    has_deep_key,
+    set_config,
+    use_config,
+)
 
 
 class TestDeepDict(unittest.TestCase):
@@ -21,3 +33,79 @@ class TestDeepDict(unittest.TestCase):
         conf = omegaconf.DictConfig({"a": {"b": 3}})
 
         self.assertEqual(get_deep_key(conf, "a.b"), 3)
+
+
+class ConfigValueTask(Task):
+    """Returns a value of the configuration, and the backend that computes it."""
+
+    def __init__(self, name, barrier=None):
+        self.name = name
+        self.barrier = barrier
+
+    def run(self):
+        if self.barrier is not None:
+            self.barrier.wait(timeout=10)
+
+        return get_config()["value"], get_current_backend()
+
+
+class TestConfigContext(unittest.TestCase):
+    def setUp(self):
+        set_config({"value": "process"})
+
+    def tearDown(self):
+        set_config({})
+
+    def test_use_config(self):
+        with use_config({"value": "scoped"}):
+            self.assertEqual("scoped", get_config()["value"])
+
+            set_config({"value": "replaced"})
+            self.assertEqual("replaced", get_config()["value"])
+
+        self.assertEqual("process", get_config()["value"])
+
+    def test_concurrent_pipelines(self):
+        barrier = threading.Barrier(2)
+        results = {}
+
+        def pipeline(value):
+            backend = ImmediateBackend()
+            with use_config({"value": value}):
+                results[value] = backend.run(ConfigValueTask(value, barrier)), backend
+
+        threads = [threading.Thread(target=pipeline, args=(v,)) for v in "ab"]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        for value, ((seen_value, seen_backend), backend) in results.items():
+            self.assertEqual(value, seen_value)
+            self.assertIs(backend, seen_backend)
+
+        self.assertIsNone(get_current_backend())
+
+    def test_thread_backend_workers(self):
+        backend = ThreadBackend(n_workers=2)
+        try:
+            with use_config({"value": "scoped"}):
+                value, seen_backend = backend.run(ConfigValueTask("a"))
+        finally:
+            backend.close()
+
+        self.assertEqual("scoped", value)
+        self.assertIs(backend, seen_backend)
+
+    def test_run_async(self):
+        backend = ImmediateBackend()
+
+        async def pipeline(value):
+            with use_config({"value": value}):
+                result, _ = await backend.run_async(ConfigValueTask(value))
+                return result
+
+        async def main():
+            return await asyncio.gather(pipeline("a"), pipeline("b"))
+
+        self.assertEqual(["a", "b"], asyncio.run(main()))
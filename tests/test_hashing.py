@@ -0,0 +1,186 @@
+import gc
+import os
+import subprocess
+import sys
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import omegaconf as oc
+import pandas as pd
+
+from aqueduct.config import set_config
+from aqueduct.task import Task
+from aqueduct.task.hashing import (
+    HASHERS,
+    HASHING_STATISTICS,
+    hash_memo,
+    hash_object,
+    hash_task_arguments,
+    register_hasher,
+)
+
+
+class ArrayTask(Task):
+    def __init__(self, array, name="array"):
+        self.array = array
+        self.name = name
+
+    def run(self):
+        return self.array.sum()
+
+
+class ExcludedTask(Task):
+    AQ_HASH_EXCLUDE = ["verbose"]
+
+    def __init__(self, value, verbose=False):
+        self.value = value
+        self.verbose = verbose
+
+    def run(self):
+        return self.value
+
+
+class Point:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+class TestHashObject(unittest.TestCase):
+    def tearDown(self):
+        set_config(oc.OmegaConf.create({}))
+
+    def test_dict_order(self):
+        self.assertEqual(hash_object({"a": 1, "b": 2}), hash_object({"b": 2, "a": 1}))
+        self.assertEqual(hash_object({1: "a", 2: "b"}), hash_object({2: "b", 1: "a"}))
+
+    def test_types_are_distinguished(self):
+        self.assertNotEqual(hash_object(1), hash_object("1"))
+        self.assertNotEqual(hash_object(1), hash_object(True))
+        self.assertNotEqual(hash_object([1, 2]), hash_object((1, 2)))
+        self.assertNotEqual(hash_object(["ab"]), hash_object(["a", "b"]))
+
+    def test_array_content(self):
+        a = np.arange(10_000)
+        self.assertEqual(hash_object(a), hash_object(a.copy()))
+        self.assertNotEqual(hash_object(a), hash_object(a.astype(float)))
+        self.assertNotEqual(hash_object(a), hash_object(a.reshape(100, 100)))
+
+        b = a.copy()
+        b[-1] = 0
+        self.assertNotEqual(hash_object(a), hash_object(b))
+
+    def test_non_contiguous_array(self):
+        a = np.arange(100).reshape(10, 10)
+        self.assertEqual(hash_object(a.T), hash_object(np.ascontiguousarray(a.T)))
+
+    def test_dataframe(self):
+        df = pd.DataFrame({"a": range(100), "b": [str(i) for i in range(100)]})
+        self.assertEqual(hash_object(df), hash_object(df.copy()))
+        self.assertNotEqual(hash_object(df), hash_object(df.rename(columns={"b": "c"})))
+
+    def test_memo(self):
+        a = np.arange(10_000)
+        a.flags.writeable = False
+
+        with hash_memo() as memo:
+            digest = hash_object(a)
+            self.assertEqual(1, len(memo))
+            self.assertEqual(digest, hash_object(a))
+
+            # The memo does not keep the array alive.
+            del a
+            gc.collect()
+            self.assertEqual(0, len(memo))
+
+        self.assertEqual(digest, hash_object(np.arange(10_000)))
+
+    def test_memo_mutable_arguments(self):
+        values = list(range(1000))
+        a = np.arange(10_000)
+        view = a[:]
+        view.flags.writeable = False
+
+        with hash_memo() as memo:
+            list_digest = hash_object([values])
+            array_digest = hash_object(view)
+
+            values.append(1000)
+            a[0] = -1
+
+            self.assertNotEqual(list_digest, hash_object([values]))
+            self.assertNotEqual(array_digest, hash_object(view))
+            self.assertEqual(0, len(memo))
+
+    def test_memoized_container(self):
+        values = list(range(1000))
+
+        with hash_memo():
+            memoized = hash_object([values])
+
+        self.assertEqual(memoized, hash_object([values]))
+
+    def test_register_hasher(self):
+        register_hasher(Point, lambda p: f"{p.x},{p.y}".encode())
+        self.addCleanup(HASHERS.pop, Point)
+
+        self.assertEqual(hash_object(Point(1, 2)), hash_object(Point(1, 2)))
+        self.assertNotEqual(hash_object(Point(1, 2)), hash_object(Point(2, 1)))
+
+    def test_algorithm(self):
+        blake = hash_object([1, 2, 3])
+
+        set_config(oc.OmegaConf.create({"aqueduct": {"hash_algorithm": "sha256"}}))
+        sha = hash_object([1, 2, 3])
+
+        self.assertEqual(32, len(sha))
+        self.assertNotEqual(blake, sha)
+
+
+class TestTaskHash(unittest.TestCase):
+    def test_stable_across_processes(self):
+        script = (
+            "import numpy as np\n"
+            "from tests.test_hashing import ArrayTask\n"
+            "print(ArrayTask(np.arange(100), name='a')._unique_key())\n"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True,
+            text=True,
+            check=True,
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        )
+
+        key = ArrayTask(np.arange(100), name="a")._unique_key()
+        self.assertEqual(key, output.stdout.strip())
+
+    def test_array_argument(self):
+        a = ArrayTask(np.arange(100))
+        self.assertEqual(a._unique_key(), ArrayTask(np.arange(100))._unique_key())
+        self.assertNotEqual(a._unique_key(), ArrayTask(np.arange(101))._unique_key())
+
+    def test_hash_exclude(self):
+        t = ExcludedTask(1, verbose=True)
+
+        self.assertTrue(t.verbose)
+        self.assertEqual(t._unique_key(), ExcludedTask(1)._unique_key())
+        self.assertNotEqual(t._unique_key(), ExcludedTask(2)._unique_key())
+
+    def test_statistics(self):
+        ArrayTask(np.arange(10))
+        self.assertGreater(HASHING_STATISTICS[ArrayTask].count, 0)
+
+    def test_statistics_from_threads(self):
+        class ThreadedTask:
+            pass
+
+        def hash_arguments(i):
+            for j in range(1000):
+                hash_task_arguments(ThreadedTask, "ThreadedTask", (i, j), {})
+
+        with ThreadPoolExecutor(8) as executor:
+            list(executor.map(hash_arguments, range(8)))
+
+        self.assertEqual(8000, HASHING_STATISTICS.pop(ThreadedTask).count)
@@ -12,7 +12,7 @@ from aqueduct.artifact import (
     CompositeArtifact,
     resolve_artifact_from_spec,
 )
-from aqueduct.config import set_config, resolve_config_from_spec
+from aqueduct.config import get_config, set_config, resolve_config_from_spec
 from aqueduct.task import (
     Task,
     AggregateTask,
@@ -123,6 +123,74 @@ class TestFetchArgsOnCall(unittest.TestCase):
         t = PretenseTask(3)
         self.assertEqual(18, run(t))
 
+    def test_config_changes(self):
+        set_config({"tests": {"test_task": {"PretenseTask": {"b": 3}}}})
+        self.assertEqual(3, PretenseTask(1).b)
+
+        set_config({"tests": {"test_task": {"PretenseTask": {"b": 4}}}})
+        self.assertEqual(4, PretenseTask(1).b)
+
+    def test_config_edited_in_place(self):
+        set_config({"tests": {"test_task": {"PretenseTask": {"b": 3}}}})
+        self.assertEqual(3, PretenseTask(1).b)
+
+        get_config().tests.test_task.PretenseTask.b = 4
+        self.assertEqual(4, PretenseTask(1).b)
+
+        get_config().tests.test_task.PretenseTask = {"b": 5}
+        self.assertEqual(5, PretenseTask(1).b)
+
+        get_config().merge_with({"tests": {"test_task": {"PretenseTask": {"b": 6}}}})
+        self.assertEqual(6, PretenseTask(1).b)
+
+        del get_config().tests.test_task["PretenseTask"]
+        self.assertIsNone(PretenseTask(1).b)
+
+    def test_inherited_init(self):
+        set_config(
+            {
+                "tests": {
+                    "test_task": {
+                        "PretenseTask": {"b": 3},
+                        "InheritedPretenseTask": {"b": 5},
+                    }
+                }
+            }
+        )
+
+        self.assertEqual(5, InheritedPretenseTask(1).b)
+
+        # The __init__ of the parent is wrapped only once.
+        inner_init = InheritedPretenseTask.__init__.__wrapped__
+        self.assertFalse(getattr(inner_init, "_aq_init_wrapper", False))
+
+    def test_inherited_init_parent_config(self):
+        set_config({"tests": {"test_task": {"PretenseTask": {"b": 3}}}})
+        self.assertEqual(3, InheritedPretenseTask(1).b)
+
+        set_config(
+            {
+                "tests": {
+                    "test_task": {
+                        "PretenseTask": {"b": 3, "c": 4},
+                        "InheritedPretenseTask": {"b": 5},
+                    }
+                }
+            }
+        )
+
+        # Arguments missing from the section of the class come from its parents.
+        t = TwiceInheritedPretenseTask(1)
+        self.assertEqual((5, 4), (t.b, t.c))
+
+
+class InheritedPretenseTask(PretenseTask):
+    pass
+
+
+class TwiceInheritedPretenseTask(InheritedPretenseTask):
+    pass
+
 
 store = {}
 
@@ -0,0 +1,84 @@
+import os
+import pathlib
+import sys
+import tempfile
+import textwrap
+import unittest
+
+from aqueduct.taskresolve import TaskIndex, cached_task_index, create_task_index
+
+MODULE_SOURCE = textwrap.dedent(
+    """
+    from aqueduct import Task
+
+    class IndexedTask(Task):
+        def run(self):
+            return {value}
+    """
+)
+
+
+class TestTaskIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.tmp_dir.name)
+        self.module_name = f"indexed_module_{id(self)}"
+        self.module_path = self.root / f"{self.module_name}.py"
+        self.write_module(1)
+
+        sys.path.insert(0, str(self.root))
+        self.environ = dict(os.environ)
+        os.environ["AQ_CACHE_DIR"] = str(self.root / "cache")
+
+    def tearDown(self):
+        sys.path.remove(str(self.root))
+        sys.modules.pop(self.module_name, None)
+        os.environ.clear()
+        os.environ.update(self.environ)
+        self.tmp_dir.cleanup()
+
+    def write_module(self, value):
+        self.module_path.write_text(MODULE_SOURCE.format(value=value))
+
+    def modules(self):
+        return {"default": [self.module_name]}
+
+    def test_build(self):
+        index = cached_task_index(self.modules())
+        name2task, name2config, class2module = index.mappings()
+
+        self.assertIn("IndexedTask", name2task)
+        self.assertNotIn("IndexedTask", name2config)
+        self.assertEqual(1, name2task["IndexedTask"]().run())
+        self.assertEqual(self.module_name, class2module[name2task["IndexedTask"]])
+
+    def test_create_task_index(self):
+        name2task, name2config, class2module = create_task_index(self.modules())
+
+        self.assertIn("IndexedTask", list(name2task))
+        self.assertNotIn("IndexedTask", name2config)
+        self.assertEqual(self.module_name, class2module[name2task["IndexedTask"]])
+
+    def test_persisted_index_is_lazy(self):
+        cached_task_index(self.modules())
+        sys.modules.pop(self.module_name)
+
+        index = cached_task_index(self.modules())
+        self.assertNotIn(self.module_name, sys.modules)
+
+        name2task, _, _ = index.mappings()
+        self.assertIn("IndexedTask", list(name2task))
+        self.assertNotIn(self.module_name, sys.modules)
+
+        name2task["IndexedTask"]
+        self.assertIn(self.module_name, sys.modules)
+
+    def test_stale_index(self):
+        index = cached_task_index(self.modules())
+        self.assertFalse(index.is_stale())
+
+        self.write_module(2)
+        stat = self.module_path.stat()
+        os.utime(self.module_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        self.assertTrue(TaskIndex(index.entries, [], index.files).is_stale())
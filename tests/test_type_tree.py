@@ -1,6 +1,15 @@
+import sys
 import unittest
 
-from aqueduct.task_tree import _map_type_in_tree, reduce_type_in_tree
+from aqueduct import run, Task
+from aqueduct.task_tree import (
+    _map_type_in_tree,
+    _resolve_task_tree,
+    build_task_graph,
+    reduce_type_in_tree,
+)
+
+from benchmarks.deep_chain import ChainTask
 
 
 class TestTypeTree(unittest.TestCase):
@@ -19,3 +28,96 @@ class TestTypeTree(unittest.TestCase):
         self.assertEqual(result[1], 4)
 
         self.assertEqual(result[2]["a"]["b"], 10)  # type: ignore
+
+
+EXECUTIONS = []
+
+
+class LeafTask(Task):
+    def __init__(self, value):
+        self.value = value
+
+    def run(self):
+        EXECUTIONS.append(self.value)
+        return self.value
+
+
+class DiamondTask(Task):
+    def __init__(self, level):
+        self.level = level
+
+    def requirements(self):
+        if self.level == 0:
+            return LeafTask(1)
+        else:
+            return [DiamondTask(self.level - 1), DiamondTask(self.level - 1)]
+
+    def run(self, reqs):
+        if self.level == 0:
+            return reqs
+        else:
+            return reqs[0] + reqs[1]
+
+
+class TestResolveTaskTree(unittest.TestCase):
+    def setUp(self):
+        EXECUTIONS.clear()
+
+    def test_build_graph(self):
+        graph = build_task_graph(DiamondTask(3))
+
+        # One node per level, plus the leaf.
+        self.assertEqual(5, len(graph))
+        self.assertEqual(DiamondTask(3)._unique_key(), list(graph.keys())[-1])
+        self.assertEqual(LeafTask(1)._unique_key(), list(graph.keys())[0])
+
+    def test_shared_task_executed_once(self):
+        result = run(DiamondTask(10))
+
+        self.assertEqual(2**10, result)
+        self.assertListEqual([1], EXECUTIONS)
+
+    def test_without_deduplication(self):
+        keys = []
+
+        def fn(task, requirements=None):
+            keys.append(task._unique_key())
+
+        _resolve_task_tree(DiamondTask(2), fn, deduplicate=False)
+        # 1 + 2 + 4 diamond tasks, and one leaf under each of the 4 bottom ones.
+        self.assertEqual(11, len(keys))
+
+
+class TestDeepTrees(unittest.TestCase):
+    def setUp(self):
+        self.length = sys.getrecursionlimit() * 2
+
+    def test_reduce_nested_lists(self):
+        tree = 1
+        for _ in range(self.length):
+            tree = [tree, 1]
+
+        self.assertEqual(
+            self.length + 1, reduce_type_in_tree(tree, int, int.__add__, 0)
+        )
+
+    def test_map_nested_dicts(self):
+        tree = 1
+        for _ in range(self.length):
+            tree = {"a": tree}
+
+        result = _map_type_in_tree(tree, int, lambda x: 2 * x)
+        for _ in range(self.length):
+            result = result["a"]
+
+        self.assertEqual(2, result)
+
+    def test_long_chain(self):
+        self.assertEqual(self.length, run(ChainTask(self.length)))
+
+    def test_long_chain_without_deduplication(self):
+        result = _resolve_task_tree(
+            ChainTask(self.length), lambda t, r=None: t.run(r), deduplicate=False
+        )
+
+        self.assertEqual(self.length, result)
@@ -1,5 +1,8 @@
 from typing import TypeVar
 
+import os
+import subprocess
+import sys
 import unittest
 
 import aqueduct as aq
@@ -98,3 +101,21 @@ class TestFindTasks(unittest.TestCase):
         tasks = aq.tasks_in_module(__name__)
 
         self.assertSetEqual(set(tasks), set([TaskA, TaskB, TaskC, TaskD, TaskE]))
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_import_aqueduct(self):
+        heavy_modules = ["dask", "hydra", "nbclient", "nbconvert", "pandas", "xarray"]
+        program = (
+            "import sys; import aqueduct.cli.cli; "
+            f"print([m for m in {heavy_modules} if m in sys.modules])"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", program],
+            capture_output=True,
+            text=True,
+            check=True,
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        )
+
+        self.assertEqual("[]", output.stdout.strip())